@@ -1,17 +1,29 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Callable, Dict, List, Optional, Tuple
+from array import array
+from collections.abc import MutableMapping
+from dataclasses import dataclass, field, fields
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import heapq
-import pandas as pd
+import threading
+import time
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .arc_flags import ArcFlags
+    from .reachability import ReachabilityIndex
+
+
+Adjacency = Dict[str, List[Tuple[str, float]]]
 
 
 # =========================================================
 # Utilidades comunes
 # =========================================================
-def build_adjacency(distance_df: pd.DataFrame) -> Dict[str, List[Tuple[str, float]]]:
+def build_adjacency(distance_df: pd.DataFrame) -> Adjacency:
     """Adjacency list con coste real (dist_km * FCC)."""
-    adj: Dict[str, List[Tuple[str, float]]] = {}
+    adj: Adjacency = {}
     nodes = set(distance_df["start_node"]).union(set(distance_df["end_node"]))
     for n in nodes:
         adj[n] = []
@@ -33,26 +45,298 @@ def reconstruct_path(came_from: Dict[str, Optional[str]], goal: str) -> List[str
     return path
 
 
+def _unreachable(reach: Optional["ReachabilityIndex"], start: str, goal: str) -> bool:
+    """True si el índice de alcanzabilidad garantiza que no hay camino (respuesta O(1))."""
+    return reach is not None and not reach.reachable(start, goal)
+
+
+def _reaches(adj: Adjacency, start: str, goal: str) -> bool:
+    """DFS O(V+E) desde start: ¿hay camino a goal? (motores sin índice de alcanzabilidad)."""
+    if start == goal:
+        return True
+    seen = {start}
+    stack = [start]
+    while stack:
+        for v, _ in adj.get(stack.pop(), ()):
+            if v == goal:
+                return True
+            if v not in seen:
+                seen.add(v)
+                stack.append(v)
+    return False
+
+
+def _hops_to(adj: Adjacency, goal: str) -> Dict[str, int]:
+    """Mínimo nº de aristas de cada nodo hasta goal (BFS hacia atrás, O(V+E)); sin camino = ausente."""
+    rev: Dict[str, List[str]] = {}
+    for u, lst in adj.items():
+        for v, _ in lst:
+            rev.setdefault(v, []).append(u)
+    hops = {goal: 0}
+    frontier = [goal]
+    d = 0
+    while frontier:
+        d += 1
+        nxt = []
+        for v in frontier:
+            for u in rev.get(v, ()):
+                if u not in hops:
+                    hops[u] = d
+                    nxt.append(u)
+        frontier = nxt
+    return hops
+
+
+def _empty_stats() -> "SearchStats":
+    return SearchStats()
+
+
+# =========================================================
+# Resultados compactos: stats con campos fijos y caminos como array de enteros
+# =========================================================
+class SearchStats(MutableMapping):
+    """
+    Contadores de una búsqueda en campos fijos (__slots__), con acceso tipo dict para el código
+    existente: stats["expanded_nodes"], stats.get(...), dict(stats) y {**stats} siguen valiendo.
+    Las claves propias de algunos motores (suboptimality_bound, peak_frontier, depart, ...)
+    van a `extra`, que solo se crea si hace falta.
+    """
+    FIELDS = ("expanded_nodes", "generated_nodes", "max_frontier", "reopen_updates")
+    __slots__ = FIELDS + ("extra",)
+
+    def __init__(
+        self,
+        expanded_nodes: int = 0,
+        generated_nodes: int = 0,
+        max_frontier: int = 0,
+        reopen_updates: int = 0,
+        **extra: float | int,
+    ):
+        self.expanded_nodes = expanded_nodes
+        self.generated_nodes = generated_nodes
+        self.max_frontier = max_frontier
+        self.reopen_updates = reopen_updates
+        self.extra: Optional[Dict[str, float | int]] = extra or None
+
+    def __getitem__(self, key: str) -> float | int:
+        if key in SearchStats.FIELDS:
+            return getattr(self, key)
+        if self.extra is None:
+            raise KeyError(key)
+        return self.extra[key]
+
+    def __setitem__(self, key: str, value: float | int) -> None:
+        if key in SearchStats.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in SearchStats.FIELDS or self.extra is None:
+            raise KeyError(key)
+        del self.extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from SearchStats.FIELDS
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return len(SearchStats.FIELDS) + len(self.extra or ())
+
+    def __repr__(self) -> str:
+        return f"SearchStats({dict(self)!r})"
+
+    def to_dict(self) -> Dict[str, float | int]:
+        return dict(self)
+
+
+# Tabla de nodos internados (por proceso, compartida entre hilos): los caminos se guardan
+# como array('i') de ids. Leer un id ya publicado no necesita lock; dar de alta uno nuevo sí.
+_NODE_IDS: Dict[str, int] = {}
+_NODE_NAMES: List[str] = []
+_INTERN_LOCK = threading.Lock()
+
+
+def _intern_new(n: str) -> int:
+    with _INTERN_LOCK:
+        i = _NODE_IDS.get(n)
+        if i is None:
+            # primero el nombre y después el id: quien lea el id ya encuentra el nombre
+            i = len(_NODE_NAMES)
+            _NODE_NAMES.append(n)
+            _NODE_IDS[n] = i
+        return i
+
+
+def intern_path(path: Iterable[str]) -> array:
+    """Camino de nombres -> array('i') de ids internados (4 bytes por nodo)."""
+    ids = _NODE_IDS
+    out = array("i")
+    for n in path:
+        i = ids.get(n)
+        if i is None:
+            i = _intern_new(n)
+        out.append(i)
+    return out
+
+
+def path_names(path_ids: Optional[array]) -> Optional[List[str]]:
+    if path_ids is None:
+        return None
+    names = _NODE_NAMES
+    return [names[i] for i in path_ids]
+
+
+class _CompactResult:
+    """
+    Base de los resultados de los motores (dataclasses con slots):
+    - path_ids: array('i'); `path` materializa la lista de nombres al pedirla. Se puede
+      construir con una lista de nombres (se interna en __post_init__).
+    - stats: SearchStats; un dict se convierte al construir.
+    Los ids solo valen en este proceso: al serializar (pickle) se guardan los nombres.
+    """
+    __slots__ = ()
+
+    def __post_init__(self) -> None:
+        if self.path_ids is not None and not isinstance(self.path_ids, array):
+            self.path_ids = intern_path(self.path_ids)
+        if not isinstance(self.stats, SearchStats):
+            self.stats = SearchStats(**self.stats)
+
+    @property
+    def path(self) -> Optional[List[str]]:
+        return path_names(self.path_ids)
+
+    def __reduce__(self):
+        kw = {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+        kw["path_ids"] = self.path
+        return (_rebuild_result, (type(self), kw))
+
+
+def _rebuild_result(cls: type, kw: Dict) -> "_CompactResult":
+    return cls(**kw)
+
+
+# =========================================================
+# Límites por consulta (presupuestos y deadline)
+# =========================================================
+@dataclass(frozen=True)
+class SearchLimits:
+    """
+    Límites por consulta; None = sin límite.
+    - deadline_s es relativo al inicio de la búsqueda; el reloj se consulta cada check_every iteraciones.
+    - goal_distance: estimación de distancia al goal para elegir closest_node en Dijkstra/UCS
+      (A* usa su heurística).
+    """
+    max_expansions: Optional[int] = None
+    max_frontier: Optional[int] = None
+    deadline_s: Optional[float] = None
+    check_every: int = 64
+    goal_distance: Optional[Callable[[str], float]] = None
+
+
+@dataclass(slots=True)
+class PartialResult:
+    """Resultado best-effort cuando una búsqueda se corta por un límite."""
+    reason: str                         # "max_expansions" | "max_frontier" | "deadline"
+    lower_bound: float                  # cota inferior del coste óptimo (mínima clave de la frontera)
+    closest_node: Optional[str]         # nodo expandido más cercano al goal
+    closest_distance: Optional[float]   # h(closest_node)
+    partial_path: Optional[List[str]]   # start -> closest_node
+    partial_cost: Optional[float]
+    elapsed_ms: float
+
+
+class _LimitGuard:
+    __slots__ = ("limits", "t0", "deadline", "ticks", "reason")
+
+    def __init__(self, limits: SearchLimits):
+        self.limits = limits
+        self.t0 = time.perf_counter()
+        self.deadline = (self.t0 + limits.deadline_s) if limits.deadline_s is not None else None
+        self.ticks = 0
+        self.reason: Optional[str] = None
+
+    def hit(self, expansions: int, frontier_len: int) -> bool:
+        lim = self.limits
+        if lim.max_expansions is not None and expansions >= lim.max_expansions:
+            self.reason = "max_expansions"
+        elif lim.max_frontier is not None and frontier_len > lim.max_frontier:
+            self.reason = "max_frontier"
+        elif self.deadline is not None:
+            self.ticks += 1
+            if self.ticks % lim.check_every == 0 and time.perf_counter() > self.deadline:
+                self.reason = "deadline"
+        return self.reason is not None
+
+    def partial(
+        self,
+        lower_bound: float,
+        closed: set,
+        closeness: Optional[Callable[[str], float]],
+        came_from: Dict[str, Optional[str]],
+        g: Dict[str, float],
+    ) -> PartialResult:
+        closest = min(closed, key=closeness) if (closeness is not None and closed) else None
+        return PartialResult(
+            reason=str(self.reason),
+            lower_bound=lower_bound,
+            closest_node=closest,
+            closest_distance=float(closeness(closest)) if closest is not None else None,
+            partial_path=reconstruct_path(came_from, closest) if closest is not None else None,
+            partial_cost=g.get(closest) if closest is not None else None,
+            elapsed_ms=(time.perf_counter() - self.t0) * 1000.0,
+        )
+
+
 # =========================================================
 # A*
 # =========================================================
-@dataclass
-class AStarResult:
+@dataclass(slots=True)
+class AStarResult(_CompactResult):
     found: bool
     start: str
     goal: str
-    path: Optional[List[str]]
+    path_ids: Optional[array]
     total_cost: Optional[float]
-    node_info: pd.DataFrame
-    event_info: pd.DataFrame
-    stats: Dict[str, float | int]
+    node_records: Dict[str, Dict[str, float | int | None | str]]
+    event_records: Dict[str, Dict[str, float | int | None | str]]
+    stats: SearchStats
+    partial: Optional[PartialResult] = None   # solo si se cortó por SearchLimits
+    _frames: Optional[Tuple[pd.DataFrame, pd.DataFrame]] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def node_info(self) -> pd.DataFrame:
+        """g, h, f, expansion_order, parent por nodo (DataFrame construido al pedirlo)."""
+        return self._materialize()[0]
+
+    @property
+    def event_info(self) -> pd.DataFrame:
+        """Eventos de la búsqueda para tree_viz (DataFrame construido al pedirlo)."""
+        return self._materialize()[1]
+
+    def _materialize(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        if self._frames is None:
+            import pandas as pd
+
+            nodes = pd.DataFrame([{"node": n, **r} for n, r in self.node_records.items()]) if self.node_records else pd.DataFrame()
+            events = pd.DataFrame(list(self.event_records.values())) if self.event_records else pd.DataFrame()
+            self._frames = (nodes, events)
+        return self._frames
 
 
 def a_star(
     start: str,
     goal: str,
-    distance_df: pd.DataFrame,
+    distance_df: Optional[pd.DataFrame],
     heuristic_h: Callable[[str], float],
+    adj: Optional[Adjacency] = None,
+    reach: Optional["ReachabilityIndex"] = None,
+    arc_flags: Optional["ArcFlags"] = None,
+    limits: Optional[SearchLimits] = None,
 ) -> AStarResult:
     """
     A* (graph-search) con:
@@ -61,15 +345,20 @@ def a_star(
     - came_from para reconstrucción
     - node_info: g,h,f,expansion_order,parent
     - event_info: eventos (para tree_viz)
-    """
-    adj = build_adjacency(distance_df)
+    node_info / event_info se guardan como registros y solo pasan a DataFrame al pedirlos.
 
-    stats: Dict[str, float | int] = {
-        "expanded_nodes": 0,
-        "generated_nodes": 0,
-        "max_frontier": 0,
-        "reopen_updates": 0,
-    }
+    Si se pasa `adj` (p.ej. residente en un servicio) no se reconstruye desde distance_df.
+    Si se pasa `reach` (ReachabilityIndex), los pares sin camino se rechazan sin buscar.
+    Con `arc_flags` (ArcFlags) solo se recorren las aristas con el flag de la región del goal.
+    Con `limits` (SearchLimits) la búsqueda se corta al agotar el presupuesto y devuelve
+    found=False con `partial` (cota inferior, nodo más cercano al goal, camino parcial).
+    """
+    if _unreachable(reach, start, goal):
+        return AStarResult(False, start, goal, None, None, {}, {}, _empty_stats())
+    if adj is None:
+        adj = build_adjacency(distance_df)
+    if arc_flags is not None:
+        adj = arc_flags.adjacency_for(goal)
 
     INF = float("inf")
     g_score: Dict[str, float] = {start: 0.0}
@@ -92,8 +381,8 @@ def a_star(
     start_eid = new_event_id(start)
     frontier: List[Tuple[float, int, str, str]] = []
     heapq.heappush(frontier, (f0, tie, start_eid, start))
-    stats["max_frontier"] = 1
-    stats["generated_nodes"] = 1
+    generated = max_front = 1
+    reopen = 0
 
     node_info_dict[start] = {"g": 0.0, "h": h0, "f": f0, "expansion_order": None, "parent": None}
 
@@ -110,9 +399,24 @@ def a_star(
 
     closed = set()
     exp_counter = 0
+    guard = _LimitGuard(limits) if limits is not None else None
 
     while frontier:
-        stats["max_frontier"] = max(int(stats["max_frontier"]), len(frontier))
+        if len(frontier) > max_front:
+            max_front = len(frontier)
+
+        if guard is not None and guard.hit(len(closed), len(frontier)):
+            return AStarResult(
+                found=False,
+                start=start,
+                goal=goal,
+                path_ids=None,
+                total_cost=None,
+                node_records=node_info_dict,
+                event_records=event_records,
+                stats=SearchStats(len(closed), generated, max_front, reopen),
+                partial=guard.partial(frontier[0][0], closed, heuristic_h, came_from, g_score),
+            )
 
         f_cur, _, cur_eid, current = heapq.heappop(frontier)
 
@@ -129,21 +433,15 @@ def a_star(
         exp_counter += 1
 
         if current == goal:
-            path = reconstruct_path(came_from, goal)
-            stats["expanded_nodes"] = len(closed)
-
-            df_nodes = pd.DataFrame([{"node": n, **node_info_dict[n]} for n in node_info_dict])
-            df_events = pd.DataFrame(list(event_records.values()))
-
             return AStarResult(
                 found=True,
                 start=start,
                 goal=goal,
-                path=path,
+                path_ids=intern_path(reconstruct_path(came_from, goal)),
                 total_cost=g_cur,
-                node_info=df_nodes,
-                event_info=df_events,
-                stats=stats,
+                node_records=node_info_dict,
+                event_records=event_records,
+                stats=SearchStats(len(closed), generated, max_front, reopen),
             )
 
         for nxt, step_cost in adj.get(current, []):
@@ -172,7 +470,7 @@ def a_star(
                 event_records[child_eid]["decision"] = "accepted"
 
                 if nxt in g_score:
-                    stats["reopen_updates"] = int(stats["reopen_updates"]) + 1
+                    reopen += 1
 
                 g_score[nxt] = cand_g
                 came_from[nxt] = current
@@ -190,41 +488,54 @@ def a_star(
 
                 tie += 1
                 heapq.heappush(frontier, (f_nxt, tie, child_eid, nxt))
-                stats["generated_nodes"] = int(stats["generated_nodes"]) + 1
+                generated += 1
 
     # no solution
-    stats["expanded_nodes"] = len(closed)
-    df_nodes = pd.DataFrame([{"node": n, **node_info_dict[n]} for n in node_info_dict]) if node_info_dict else pd.DataFrame()
-    df_events = pd.DataFrame(list(event_records.values())) if event_records else pd.DataFrame()
-
     return AStarResult(
         found=False,
         start=start,
         goal=goal,
-        path=None,
+        path_ids=None,
         total_cost=None,
-        node_info=df_nodes,
-        event_info=df_events,
-        stats=stats,
+        node_records=node_info_dict,
+        event_records=event_records,
+        stats=SearchStats(len(closed), generated, max_front, reopen),
     )
 
 
 # =========================================================
 # Dijkstra
 # =========================================================
-@dataclass
-class DijkstraResult:
+@dataclass(slots=True)
+class DijkstraResult(_CompactResult):
     found: bool
     start: str
     goal: str
-    path: Optional[List[str]]
+    path_ids: Optional[array]
     total_cost: Optional[float]
-    stats: Dict[str, float | int]
+    stats: SearchStats
+    partial: Optional[PartialResult] = None   # solo si se cortó por SearchLimits
 
 
-def dijkstra(start: str, goal: str, distance_df: pd.DataFrame) -> DijkstraResult:
-    """Dijkstra (graph-search) con coste real."""
-    adj = build_adjacency(distance_df)
+def dijkstra(
+    start: str,
+    goal: str,
+    distance_df: Optional[pd.DataFrame],
+    adj: Optional[Adjacency] = None,
+    reach: Optional["ReachabilityIndex"] = None,
+    arc_flags: Optional["ArcFlags"] = None,
+    limits: Optional[SearchLimits] = None,
+) -> DijkstraResult:
+    """
+    Dijkstra (graph-search) con coste real.
+    Con `limits` se corta al agotar el presupuesto (found=False + `partial`).
+    """
+    if _unreachable(reach, start, goal):
+        return DijkstraResult(False, start, goal, None, None, _empty_stats())
+    if adj is None:
+        adj = build_adjacency(distance_df)
+    if arc_flags is not None:
+        adj = arc_flags.adjacency_for(goal)
 
     INF = float("inf")
     dist: Dict[str, float] = {start: 0.0}
@@ -235,16 +546,18 @@ def dijkstra(start: str, goal: str, distance_df: pd.DataFrame) -> DijkstraResult
     heapq.heappush(pq, (0.0, tie, start))
 
     closed = set()
+    generated = max_front = 1
+    reopen = 0
 
-    stats: Dict[str, float | int] = {
-        "expanded_nodes": 0,
-        "generated_nodes": 1,
-        "max_frontier": 1,
-        "reopen_updates": 0,
-    }
+    guard = _LimitGuard(limits) if limits is not None else None
 
     while pq:
-        stats["max_frontier"] = max(int(stats["max_frontier"]), len(pq))
+        if len(pq) > max_front:
+            max_front = len(pq)
+
+        if guard is not None and guard.hit(len(closed), len(pq)):
+            partial = guard.partial(pq[0][0], closed, limits.goal_distance, came_from, dist)
+            return DijkstraResult(False, start, goal, None, None, SearchStats(len(closed), generated, max_front, reopen), partial=partial)
         g_cur, _, u = heapq.heappop(pq)
 
         if u in closed:
@@ -252,14 +565,13 @@ def dijkstra(start: str, goal: str, distance_df: pd.DataFrame) -> DijkstraResult
         closed.add(u)
 
         if u == goal:
-            stats["expanded_nodes"] = len(closed)
             return DijkstraResult(
                 found=True,
                 start=start,
                 goal=goal,
-                path=reconstruct_path(came_from, goal),
+                path_ids=intern_path(reconstruct_path(came_from, goal)),
                 total_cost=g_cur,
-                stats=stats,
+                stats=SearchStats(len(closed), generated, max_front, reopen),
             )
 
         for v, w in adj.get(u, []):
@@ -269,43 +581,57 @@ def dijkstra(start: str, goal: str, distance_df: pd.DataFrame) -> DijkstraResult
             known = dist.get(v, INF)
             if cand < known:
                 if v in dist:
-                    stats["reopen_updates"] = int(stats["reopen_updates"]) + 1
+                    reopen += 1
                 dist[v] = cand
                 came_from[v] = u
                 tie += 1
                 heapq.heappush(pq, (cand, tie, v))
-                stats["generated_nodes"] = int(stats["generated_nodes"]) + 1
+                generated += 1
 
-    stats["expanded_nodes"] = len(closed)
     return DijkstraResult(
         found=False,
         start=start,
         goal=goal,
-        path=None,
+        path_ids=None,
         total_cost=None,
-        stats=stats,
+        stats=SearchStats(len(closed), generated, max_front, reopen),
     )
 
 
 # =========================================================
 # UCS
 # =========================================================
-@dataclass
-class UCSResult:
+@dataclass(slots=True)
+class UCSResult(_CompactResult):
     found: bool
     start: str
     goal: str
-    path: Optional[List[str]]
+    path_ids: Optional[array]
     total_cost: Optional[float]
-    stats: Dict[str, float | int]
+    stats: SearchStats
+    partial: Optional[PartialResult] = None   # solo si se cortó por SearchLimits
 
 
-def ucs(start: str, goal: str, distance_df: pd.DataFrame) -> UCSResult:
+def ucs(
+    start: str,
+    goal: str,
+    distance_df: Optional[pd.DataFrame],
+    adj: Optional[Adjacency] = None,
+    reach: Optional["ReachabilityIndex"] = None,
+    arc_flags: Optional["ArcFlags"] = None,
+    limits: Optional[SearchLimits] = None,
+) -> UCSResult:
     """
     Uniform Cost Search (graph-search) con coste real.
     En costes no negativos, UCS es equivalente a Dijkstra (pero lo mantenemos separado por claridad académica).
+    Con `limits` se corta al agotar el presupuesto (found=False + `partial`).
     """
-    adj = build_adjacency(distance_df)
+    if _unreachable(reach, start, goal):
+        return UCSResult(False, start, goal, None, None, _empty_stats())
+    if adj is None:
+        adj = build_adjacency(distance_df)
+    if arc_flags is not None:
+        adj = arc_flags.adjacency_for(goal)
 
     INF = float("inf")
     best_g: Dict[str, float] = {start: 0.0}
@@ -316,16 +642,18 @@ def ucs(start: str, goal: str, distance_df: pd.DataFrame) -> UCSResult:
     heapq.heappush(pq, (0.0, tie, start))
 
     closed = set()
+    generated = max_front = 1
+    reopen = 0
 
-    stats: Dict[str, float | int] = {
-        "expanded_nodes": 0,
-        "generated_nodes": 1,
-        "max_frontier": 1,
-        "reopen_updates": 0,
-    }
+    guard = _LimitGuard(limits) if limits is not None else None
 
     while pq:
-        stats["max_frontier"] = max(int(stats["max_frontier"]), len(pq))
+        if len(pq) > max_front:
+            max_front = len(pq)
+
+        if guard is not None and guard.hit(len(closed), len(pq)):
+            partial = guard.partial(pq[0][0], closed, limits.goal_distance, came_from, best_g)
+            return UCSResult(False, start, goal, None, None, SearchStats(len(closed), generated, max_front, reopen), partial=partial)
         g_cur, _, u = heapq.heappop(pq)
 
         if u in closed:
@@ -333,14 +661,13 @@ def ucs(start: str, goal: str, distance_df: pd.DataFrame) -> UCSResult:
         closed.add(u)
 
         if u == goal:
-            stats["expanded_nodes"] = len(closed)
             return UCSResult(
                 found=True,
                 start=start,
                 goal=goal,
-                path=reconstruct_path(came_from, goal),
+                path_ids=intern_path(reconstruct_path(came_from, goal)),
                 total_cost=g_cur,
-                stats=stats,
+                stats=SearchStats(len(closed), generated, max_front, reopen),
             )
 
         for v, w in adj.get(u, []):
@@ -350,51 +677,54 @@ def ucs(start: str, goal: str, distance_df: pd.DataFrame) -> UCSResult:
             known = best_g.get(v, INF)
             if cand < known:
                 if v in best_g:
-                    stats["reopen_updates"] = int(stats["reopen_updates"]) + 1
+                    reopen += 1
                 best_g[v] = cand
                 came_from[v] = u
                 tie += 1
                 heapq.heappush(pq, (cand, tie, v))
-                stats["generated_nodes"] = int(stats["generated_nodes"]) + 1
+                generated += 1
 
-    stats["expanded_nodes"] = len(closed)
     return UCSResult(
         found=False,
         start=start,
         goal=goal,
-        path=None,
+        path_ids=None,
         total_cost=None,
-        stats=stats,
+        stats=SearchStats(len(closed), generated, max_front, reopen),
     )
-@dataclass
-class AStarFastResult:
+@dataclass(slots=True)
+class AStarFastResult(_CompactResult):
     found: bool
     start: str
     goal: str
-    path: Optional[List[str]]
+    path_ids: Optional[array]
     total_cost: Optional[float]
-    stats: Dict[str, float | int]
+    stats: SearchStats
+    partial: Optional[PartialResult] = None   # solo si se cortó por SearchLimits
 
 
 def a_star_fast(
     start: str,
     goal: str,
-    distance_df: pd.DataFrame,
+    distance_df: Optional[pd.DataFrame],
     heuristic_h: Callable[[str], float],
+    adj: Optional[Adjacency] = None,
+    reach: Optional["ReachabilityIndex"] = None,
+    arc_flags: Optional["ArcFlags"] = None,
+    limits: Optional[SearchLimits] = None,
 ) -> AStarFastResult:
     """
     A* (graph-search) en modo FAST:
     - NO guarda event_info ni node_info
     - Ideal para benchmark de algoritmos (sin overhead de trazas)
+    - `limits`: como en a_star (resultado parcial en `partial`)
     """
-    adj = build_adjacency(distance_df)
-
-    stats: Dict[str, float | int] = {
-        "expanded_nodes": 0,
-        "generated_nodes": 0,
-        "max_frontier": 0,
-        "reopen_updates": 0,
-    }
+    if _unreachable(reach, start, goal):
+        return AStarFastResult(False, start, goal, None, None, _empty_stats())
+    if adj is None:
+        adj = build_adjacency(distance_df)
+    if arc_flags is not None:
+        adj = arc_flags.adjacency_for(goal)
 
     INF = float("inf")
     g_score: Dict[str, float] = {start: 0.0}
@@ -406,13 +736,20 @@ def a_star_fast(
     h0 = float(heuristic_h(start))
     heapq.heappush(frontier, (h0, tie, start))
 
-    stats["generated_nodes"] = 1
-    stats["max_frontier"] = 1
+    generated = max_front = 1
+    reopen = 0
 
     closed = set()
+    guard = _LimitGuard(limits) if limits is not None else None
 
     while frontier:
-        stats["max_frontier"] = max(int(stats["max_frontier"]), len(frontier))
+        if len(frontier) > max_front:
+            max_front = len(frontier)
+
+        if guard is not None and guard.hit(len(closed), len(frontier)):
+            partial = guard.partial(frontier[0][0], closed, heuristic_h, came_from, g_score)
+            stats = SearchStats(len(closed), generated, max_front, reopen)
+            return AStarFastResult(False, start, goal, None, None, stats, partial=partial)
 
         f_cur, _, current = heapq.heappop(frontier)
         if current in closed:
@@ -422,14 +759,13 @@ def a_star_fast(
         closed.add(current)
 
         if current == goal:
-            stats["expanded_nodes"] = len(closed)
             return AStarFastResult(
                 found=True,
                 start=start,
                 goal=goal,
-                path=reconstruct_path(came_from, goal),
+                path_ids=intern_path(reconstruct_path(came_from, goal)),
                 total_cost=g_cur,
-                stats=stats,
+                stats=SearchStats(len(closed), generated, max_front, reopen),
             )
 
         for nxt, step_cost in adj.get(current, []):
@@ -441,7 +777,7 @@ def a_star_fast(
 
             if cand_g < known_g:
                 if nxt in g_score:
-                    stats["reopen_updates"] = int(stats["reopen_updates"]) + 1
+                    reopen += 1
 
                 g_score[nxt] = cand_g
                 came_from[nxt] = current
@@ -449,14 +785,681 @@ def a_star_fast(
                 tie += 1
                 f_nxt = cand_g + float(heuristic_h(nxt))
                 heapq.heappush(frontier, (f_nxt, tie, nxt))
-                stats["generated_nodes"] = int(stats["generated_nodes"]) + 1
+                generated += 1
 
-    stats["expanded_nodes"] = len(closed)
     return AStarFastResult(
         found=False,
         start=start,
         goal=goal,
-        path=None,
+        path_ids=None,
         total_cost=None,
+        stats=SearchStats(len(closed), generated, max_front, reopen),
+    )
+
+# =========================================================
+# Weighted A* y ARA* (subóptimos con cota)
+# =========================================================
+def weighted_a_star(
+    start: str,
+    goal: str,
+    distance_df: Optional[pd.DataFrame],
+    heuristic_h: Callable[[str], float],
+    weight: float = 1.5,
+    adj: Optional[Adjacency] = None,
+    reach: Optional["ReachabilityIndex"] = None,
+) -> AStarFastResult:
+    """
+    A* FAST con f = g + w·h (w >= 1). Con h consistente y sin reabrir nodos cerrados,
+    el coste devuelto es <= w · óptimo (stats["suboptimality_bound"]).
+    """
+    if weight < 1.0:
+        raise ValueError("weight must be >= 1.")
+    if _unreachable(reach, start, goal):
+        return AStarFastResult(False, start, goal, None, None, SearchStats(suboptimality_bound=weight))
+    if adj is None:
+        adj = build_adjacency(distance_df)
+
+    generated = max_front = 1
+    reopen = 0
+
+    INF = float("inf")
+    g_score: Dict[str, float] = {start: 0.0}
+    came_from: Dict[str, Optional[str]] = {start: None}
+
+    tie = 0
+    frontier: List[Tuple[float, int, str]] = [(weight * float(heuristic_h(start)), tie, start)]
+    closed = set()
+
+    while frontier:
+        if len(frontier) > max_front:
+            max_front = len(frontier)
+
+        _, _, current = heapq.heappop(frontier)
+        if current in closed:
+            continue
+
+        g_cur = g_score[current]
+        closed.add(current)
+
+        if current == goal:
+            stats = SearchStats(len(closed), generated, max_front, reopen, suboptimality_bound=weight)
+            return AStarFastResult(True, start, goal, intern_path(reconstruct_path(came_from, goal)), g_cur, stats)
+
+        for nxt, step_cost in adj.get(current, []):
+            if step_cost < 0:
+                raise ValueError("Negative edge cost is not allowed for A*.")
+            if nxt in closed:
+                continue
+
+            cand_g = g_cur + step_cost
+            if cand_g < g_score.get(nxt, INF):
+                if nxt in g_score:
+                    reopen += 1
+                g_score[nxt] = cand_g
+                came_from[nxt] = current
+
+                tie += 1
+                heapq.heappush(frontier, (cand_g + weight * float(heuristic_h(nxt)), tie, nxt))
+                generated += 1
+
+    stats = SearchStats(len(closed), generated, max_front, reopen, suboptimality_bound=weight)
+    return AStarFastResult(False, start, goal, None, None, stats)
+
+
+@dataclass(slots=True)
+class AnytimeResult(_CompactResult):
+    found: bool
+    start: str
+    goal: str
+    path_ids: Optional[array]           # mejor solución encontrada
+    total_cost: Optional[float]
+    stats: SearchStats
+    solutions: List[Dict[str, float | int]]   # una entrada por mejora: weight, cost, bound, elapsed_ms, expanded_nodes
+
+
+def ara_star(
+    start: str,
+    goal: str,
+    distance_df: Optional[pd.DataFrame],
+    heuristic_h: Callable[[str], float],
+    w0: float = 3.0,
+    w_step: float = 0.5,
+    deadline_s: Optional[float] = None,
+    adj: Optional[Adjacency] = None,
+    reach: Optional["ReachabilityIndex"] = None,
+) -> AnytimeResult:
+    """
+    Anytime Repairing A* (Likhachev et al.):
+    - primera solución con w0, después w -= w_step hasta 1, reutilizando la búsqueda
+      (los nodos cerrados que mejoran van a INCONS en vez de reabrirse)
+    - cota de suboptimalidad: min(w, g(goal) / min_{OPEN ∪ INCONS}(g + h))
+    - con deadline_s se devuelve la mejor solución disponible al agotarse el tiempo
+      (comprobación cada 256 expansiones); la primera solución se busca siempre entera
+    """
+    if w0 < 1.0 or w_step <= 0.0:
+        raise ValueError("ara_star needs w0 >= 1 and w_step > 0.")
+    if _unreachable(reach, start, goal):
+        return AnytimeResult(False, start, goal, None, None, _empty_stats(), [])
+    if adj is None:
+        adj = build_adjacency(distance_df)
+
+    t0 = time.perf_counter()
+    deadline = (t0 + deadline_s) if deadline_s is not None else None
+
+    INF = float("inf")
+    h_cache: Dict[str, float] = {}
+
+    def h(n: str) -> float:
+        v = h_cache.get(n)
+        if v is None:
+            v = h_cache[n] = float(heuristic_h(n))
+        return v
+
+    g_score: Dict[str, float] = {start: 0.0}
+    came_from: Dict[str, Optional[str]] = {start: None}
+    stats = SearchStats(0, 1, 1, 0, iterations=0, suboptimality_bound=INF, deadline_hit=0)
+
+    w = w0
+    tie = 0
+    # entradas (clave, tie, nodo, g al insertar): las obsoletas se descartan al salir
+    open_heap: List[Tuple[float, int, str, float]] = [(w * h(start), tie, start, 0.0)]
+    closed: set = set()
+    incons: set = set()
+    solutions: List[Dict[str, float | int]] = []
+
+    def clean_top() -> None:
+        while open_heap:
+            _, _, n, g_push = open_heap[0]
+            if n in closed or g_push > g_score[n]:
+                heapq.heappop(open_heap)
+            else:
+                return
+
+    def improve_path() -> bool:
+        """False si se agota el deadline. Contadores locales; se vuelcan en stats al salir."""
+        nonlocal tie
+        expansions = generated = reopen = 0
+        max_front = stats.max_frontier
+        try:
+            while True:
+                clean_top()
+                if not open_heap or g_score.get(goal, INF) <= open_heap[0][0]:
+                    return True
+                if deadline is not None and solutions and (expansions & 255) == 0 and time.perf_counter() > deadline:
+                    return False
+
+                if len(open_heap) > max_front:
+                    max_front = len(open_heap)
+                _, _, current, _ = heapq.heappop(open_heap)
+                closed.add(current)
+                expansions += 1
+
+                g_cur = g_score[current]
+                for nxt, step_cost in adj.get(current, []):
+                    if step_cost < 0:
+                        raise ValueError("Negative edge cost is not allowed for A*.")
+                    cand_g = g_cur + step_cost
+                    if cand_g < g_score.get(nxt, INF):
+                        if nxt in g_score:
+                            reopen += 1
+                        g_score[nxt] = cand_g
+                        came_from[nxt] = current
+                        if nxt in closed:
+                            incons.add(nxt)
+                        else:
+                            tie += 1
+                            heapq.heappush(open_heap, (cand_g + w * h(nxt), tie, nxt, cand_g))
+                            generated += 1
+        finally:
+            stats.expanded_nodes += expansions
+            stats.generated_nodes += generated
+            stats.reopen_updates += reopen
+            stats.max_frontier = max_front
+
+    def bound() -> float:
+        g_goal = g_score.get(goal, INF)
+        if g_goal == INF:
+            return INF
+        lows = [g + h(n) for _, _, n, g in open_heap if n not in closed and g <= g_score[n]]
+        lows += [g_score[n] + h(n) for n in incons]
+        lo = min(lows) if lows else g_goal
+        return max(1.0, min(w, g_goal / lo)) if lo > 0 else w
+
+    def publish() -> None:
+        g_goal = g_score.get(goal, INF)
+        eps = bound()
+        stats["suboptimality_bound"] = eps
+        if g_goal < INF and (not solutions or g_goal < float(solutions[-1]["cost"])):
+            solutions.append({
+                "weight": w,
+                "cost": g_goal,
+                "bound": eps,
+                "elapsed_ms": (time.perf_counter() - t0) * 1000.0,
+                "expanded_nodes": stats.expanded_nodes,
+            })
+        elif solutions:
+            solutions[-1]["bound"] = eps
+
+    while True:
+        stats["iterations"] += 1
+        finished = improve_path()
+        publish()
+        if not finished:
+            stats["deadline_hit"] = 1
+            break
+        if float(stats["suboptimality_bound"]) <= 1.0 or w <= 1.0:
+            break
+        if deadline is not None and time.perf_counter() > deadline:
+            stats["deadline_hit"] = 1
+            break
+
+        # siguiente iteración: w más pequeño, OPEN ∪ INCONS con claves nuevas, CLOSED vacío
+        w = max(1.0, w - w_step)
+        pending = {n for _, _, n, g in open_heap if n not in closed and g <= g_score[n]} | incons
+        incons = set()
+        closed = set()
+        open_heap = []
+        for n in pending:
+            tie += 1
+            open_heap.append((g_score[n] + w * h(n), tie, n, g_score[n]))
+        heapq.heapify(open_heap)
+
+    stats["final_weight"] = w
+    if not solutions:
+        return AnytimeResult(False, start, goal, None, None, stats, solutions)
+    return AnytimeResult(
+        found=True,
+        start=start,
+        goal=goal,
+        path_ids=intern_path(reconstruct_path(came_from, goal)),
+        total_cost=g_score[goal],
         stats=stats,
-    )
\ No newline at end of file
+        solutions=solutions,
+    )
+
+
+# =========================================================
+# Búsqueda con memoria acotada: IDA* y SMA*
+# =========================================================
+def ida_star(
+    start: str,
+    goal: str,
+    distance_df: Optional[pd.DataFrame],
+    heuristic_h: Callable[[str], float],
+    tt_size: Optional[int] = 100_000,
+    bound_step: float = 0.0,
+    adj: Optional[Adjacency] = None,
+    reach: Optional["ReachabilityIndex"] = None,
+) -> AStarFastResult:
+    """
+    IDA*: profundización iterativa sobre la cota f, DFS con pila explícita.
+    Memoria O(profundidad · grado) + tabla de transposición acotada:
+    - tt_size: nº máximo de entradas nodo -> mejor g de la iteración (0 = sin tabla,
+      None = sin límite); poda las llegadas repetidas con g no mejor.
+    - bound_step: crecimiento relativo mínimo de la cota entre iteraciones. Con costes reales
+      hay casi tantas iteraciones como valores distintos de f; con bound_step > 0 el coste
+      es <= (1 + bound_step) · óptimo (stats["suboptimality_bound"]).
+    - sin `reach`, un DFS O(V+E) descarta antes los pares sin camino: si no, IDA* recorre
+      todos los caminos simples desde start antes de rendirse.
+    stats["peak_frontier"]: máximo de marcos en la pila DFS.
+    """
+    if _unreachable(reach, start, goal):
+        return AStarFastResult(False, start, goal, None, None, SearchStats(peak_frontier=0))
+    if adj is None:
+        adj = build_adjacency(distance_df)
+    if reach is None and not _reaches(adj, start, goal):
+        return AStarFastResult(False, start, goal, None, None, SearchStats(peak_frontier=0))
+
+    INF = float("inf")
+    stats = SearchStats(
+        0, 1, 1, 0,
+        peak_frontier=1, iterations=0, tt_peak=0, peak_memory_nodes=1, suboptimality_bound=1.0 + bound_step,
+    )
+    if start == goal:
+        return AStarFastResult(True, start, goal, intern_path([start]), 0.0, stats)
+
+    expanded = generated = peak = tt_peak = iterations = 0
+    bound = float(heuristic_h(start))
+
+    while True:
+        iterations += 1
+        next_bound = INF
+        tt: Dict[str, float] = {}
+        # marco: [nodo, g, sucesores, siguiente índice]
+        stack: List[list] = [[start, 0.0, adj.get(start, []), 0]]
+        on_path = {start}
+        expanded += 1
+
+        while stack:
+            frame = stack[-1]
+            node, g, succ, i = frame
+            if i >= len(succ):
+                stack.pop()
+                on_path.discard(node)
+                continue
+            frame[3] = i + 1
+
+            nxt, step_cost = succ[i]
+            if step_cost < 0:
+                raise ValueError("Negative edge cost is not allowed for IDA*.")
+            if nxt in on_path:
+                continue
+            generated += 1
+            g2 = g + step_cost
+            f2 = g2 + float(heuristic_h(nxt))
+            if f2 > bound:
+                if f2 < next_bound:
+                    next_bound = f2
+                continue
+
+            if nxt == goal:
+                path = intern_path([fr[0] for fr in stack] + [nxt])
+                stats.update({
+                    "expanded_nodes": expanded,
+                    "generated_nodes": generated + 1,
+                    "max_frontier": max(peak, len(stack)),
+                    "peak_frontier": max(peak, len(stack)),
+                    "iterations": iterations,
+                    "tt_peak": tt_peak,
+                    "peak_memory_nodes": max(peak, len(stack)) + tt_peak,
+                })
+                return AStarFastResult(True, start, goal, path, g2, stats)
+
+            if tt_size != 0:
+                if tt.get(nxt, INF) <= g2:
+                    continue
+                if tt_size is None or len(tt) < tt_size or nxt in tt:
+                    tt[nxt] = g2
+                    tt_peak = max(tt_peak, len(tt))
+
+            stack.append([nxt, g2, adj.get(nxt, []), 0])
+            on_path.add(nxt)
+            expanded += 1
+            if len(stack) > peak:
+                peak = len(stack)
+
+        if next_bound == INF:
+            break
+        bound = max(next_bound, bound * (1.0 + bound_step))
+
+    stats.update({
+        "expanded_nodes": expanded,
+        "generated_nodes": generated + 1,
+        "max_frontier": peak,
+        "peak_frontier": peak,
+        "iterations": iterations,
+        "tt_peak": tt_peak,
+        "peak_memory_nodes": peak + tt_peak,
+    })
+    return AStarFastResult(False, start, goal, None, None, stats)
+
+
+class _SMANode:
+    __slots__ = ("state", "g", "f", "parent", "depth", "children", "forgotten", "alive", "version")
+
+    def __init__(self, state: str, g: float, f: float, parent: Optional["_SMANode"], depth: int):
+        self.state = state
+        self.g = g
+        self.f = f
+        self.parent = parent
+        self.depth = depth
+        self.children: Dict[str, "_SMANode"] = {}
+        self.forgotten: Dict[str, float] = {}     # sucesor olvidado -> su último f
+        self.alive = True
+        self.version = 0
+
+
+def sma_star(
+    start: str,
+    goal: str,
+    distance_df: Optional[pd.DataFrame],
+    heuristic_h: Callable[[str], float],
+    max_nodes: int = 10_000,
+    adj: Optional[Adjacency] = None,
+    reach: Optional["ReachabilityIndex"] = None,
+) -> AStarFastResult:
+    """
+    SMA* (Simplified Memory-bounded A*) con presupuesto de max_nodes nodos en memoria:
+    - pathmax; el f de un nodo interior es el mínimo de sus hijos en memoria y de los
+      olvidados (backup hasta la raíz)
+    - se podan ciclos del propio camino y los sucesores con una copia en memoria de g
+      estrictamente menor (no pueden estar en un camino óptimo)
+    - si se supera el presupuesto se olvida la hoja de mayor f (la menos profunda en empate);
+      el padre guarda el f de ese sucesor y vuelve a la frontera con él, aunque conserve
+      otros hijos, para regenerarlo cuando sea el mejor candidato
+    - se expande el candidato de menor f (el más profundo en empate)
+    - un BFS hacia atrás desde goal (O(V+E), fuera del presupuesto) da el mínimo de aristas
+      hasta goal: no se generan sucesores cuyo camino más corto en aristas ya no cabe en
+      max_nodes, y un par sin camino (o que no cabe) se responde sin buscar
+    - un nodo sin sucesores útiles recibe f = inf; cuando no queda candidato finito no hay
+      camino dentro del presupuesto
+    Óptimo si el camino óptimo cabe en el presupuesto. stats["peak_frontier"]: máximo de hojas.
+    """
+    if max_nodes < 2:
+        raise ValueError("sma_star needs max_nodes >= 2.")
+    if _unreachable(reach, start, goal):
+        return AStarFastResult(False, start, goal, None, None, SearchStats(peak_frontier=0))
+    if adj is None:
+        adj = build_adjacency(distance_df)
+    hops = _hops_to(adj, goal)
+    if hops.get(start, max_nodes) >= max_nodes:
+        return AStarFastResult(False, start, goal, None, None, SearchStats(peak_frontier=0, max_nodes=max_nodes))
+
+    INF = float("inf")
+    expanded = forgotten = 0
+    generated = peak_leaves = peak_memory = 1
+
+    def result(path_ids: Optional[array], cost: Optional[float]) -> AStarFastResult:
+        stats = SearchStats(
+            expanded, generated, peak_leaves, 0,
+            peak_frontier=peak_leaves, peak_memory_nodes=peak_memory, forgotten_nodes=forgotten, max_nodes=max_nodes,
+        )
+        return AStarFastResult(path_ids is not None, start, goal, path_ids, cost, stats)
+
+    root = _SMANode(start, 0.0, float(heuristic_h(start)), None, 0)
+    best_by_state: Dict[str, _SMANode] = {start: root}     # copia en memoria de menor g
+    in_memory = 1
+    n_leaves = 1
+    tie = 0
+    # candidatos: min-heap (f, -depth) con hojas (clave f) y nodos con sucesores olvidados
+    # (clave: el menor f olvidado); hojas a olvidar: max-heap (-f, depth).
+    # Una entrada es válida si el nodo sigue vivo y su versión coincide.
+    open_heap: List[Tuple[float, int, int, int, _SMANode]] = []
+    evict_heap: List[Tuple[float, int, int, int, _SMANode]] = []
+
+    def schedule(n: _SMANode) -> None:
+        nonlocal tie
+        tie += 1
+        n.version += 1
+        if not n.children:
+            heapq.heappush(open_heap, (n.f, -n.depth, tie, n.version, n))
+            heapq.heappush(evict_heap, (-n.f, n.depth, tie, n.version, n))
+        elif n.forgotten:
+            heapq.heappush(open_heap, (min(n.forgotten.values()), -n.depth - 1, tie, n.version, n))
+
+    def valid(entry: Tuple[float, int, int, int, _SMANode]) -> bool:
+        n = entry[4]
+        return n.alive and entry[3] == n.version
+
+    def backup(n: Optional[_SMANode]) -> None:
+        """Propaga hacia la raíz f(n) = min(f de hijos en memoria y olvidados) mientras cambie."""
+        while n is not None and n.children:
+            f = min(c.f for c in n.children.values())
+            if n.forgotten:
+                f = min(f, min(n.forgotten.values()))
+            if f == n.f:
+                return
+            n.f = f
+            n = n.parent
+
+    def forget(n: _SMANode) -> None:
+        """Olvida la hoja n; su padre guarda su f y vuelve a la frontera de candidatos."""
+        nonlocal in_memory, n_leaves, forgotten
+        n.alive = False
+        in_memory -= 1
+        n_leaves -= 1
+        forgotten += 1
+        if best_by_state.get(n.state) is n:
+            del best_by_state[n.state]
+        p = n.parent
+        del p.children[n.state]
+        p.forgotten[n.state] = n.f
+        if not p.children:
+            n_leaves += 1
+        schedule(p)
+
+    def on_path(n: _SMANode, state: str) -> bool:
+        while n is not None:
+            if n.state == state:
+                return True
+            n = n.parent
+        return False
+
+    schedule(root)
+    while True:
+        while open_heap and not valid(open_heap[0]):
+            heapq.heappop(open_heap)
+        if not open_heap or open_heap[0][0] == INF:
+            break
+        node = heapq.heappop(open_heap)[4]
+
+        if node.state == goal:
+            path = []
+            n: Optional[_SMANode] = node
+            while n is not None:
+                path.append(n.state)
+                n = n.parent
+            path.reverse()
+            return result(intern_path(path), node.g)
+
+        expanded += 1
+        # un sucesor por estado (aristas paralelas: la más barata), sin ciclos, sin los hijos
+        # ya en memoria, sin los que no caben (profundidad + aristas hasta goal >= max_nodes)
+        # y sin los dominados por otra copia en memoria con menor g
+        depth = node.depth + 1
+        succ: Dict[str, float] = {}
+        for nxt, step_cost in adj.get(node.state, []):
+            if step_cost < 0:
+                raise ValueError("Negative edge cost is not allowed for SMA*.")
+            g2 = node.g + step_cost
+            if g2 < succ.get(nxt, INF) and nxt not in node.children and depth + hops.get(nxt, max_nodes) < max_nodes:
+                succ[nxt] = g2
+        for nxt in list(succ):
+            other = best_by_state.get(nxt)
+            if (other is not None and other.g < succ[nxt]) or on_path(node, nxt):
+                del succ[nxt]
+
+        was_leaf = not node.children
+        for nxt, g2 in succ.items():
+            f2 = max(node.f, g2 + float(heuristic_h(nxt)), node.forgotten.get(nxt, -INF))
+            child = _SMANode(nxt, g2, f2, node, depth)
+            node.children[nxt] = child
+            other = best_by_state.get(nxt)
+            if other is None or g2 < other.g:
+                best_by_state[nxt] = child
+            in_memory += 1
+            n_leaves += 1
+            schedule(child)
+            generated += 1
+        node.forgotten.clear()
+
+        if node.children:
+            if was_leaf:
+                n_leaves -= 1
+            backup(node)
+        else:
+            # sin sucesores útiles: hoja con f = inf (la primera en olvidarse)
+            node.f = INF
+            backup(node.parent)
+        schedule(node)
+
+        while in_memory > max_nodes:
+            while evict_heap and not (valid(evict_heap[0]) and not evict_heap[0][4].children):
+                heapq.heappop(evict_heap)
+            victim = heapq.heappop(evict_heap)[4]
+            if victim is root:
+                break
+            forget(victim)
+
+        if in_memory > peak_memory:
+            peak_memory = in_memory
+        if n_leaves > peak_leaves:
+            peak_leaves = n_leaves
+
+    return result(None, None)
+
+
+# =========================================================
+# A* multi-origen / multi-destino
+# =========================================================
+@dataclass(slots=True)
+class MultiSearchResult(_CompactResult):
+    found: bool
+    start: Optional[str]        # origen ganador
+    goal: Optional[str]         # destino ganador
+    path_ids: Optional[array]
+    total_cost: Optional[float]
+    stats: SearchStats
+
+
+def reverse_adjacency(adj: Adjacency) -> Adjacency:
+    """Adjacency traspuesta (u->v pasa a v->u), para buscar 'hacia atrás' desde los destinos."""
+    rev: Adjacency = {n: [] for n in adj}
+    for u, lst in adj.items():
+        for v, w in lst:
+            rev.setdefault(v, []).append((u, w))
+    return rev
+
+
+def a_star_multi(
+    sources: List[str],
+    goals: List[str],
+    distance_df: Optional[pd.DataFrame],
+    heuristic_h: Callable[[str], float],
+    adj: Optional[Adjacency] = None,
+    reach: Optional["ReachabilityIndex"] = None,
+) -> MultiSearchResult:
+    """
+    A* FAST con varios orígenes y varios destinos en UNA sola búsqueda:
+    - La frontera se siembra con todos los orígenes (g=0).
+    - Se detiene en el primer destino expandido: el par (origen, destino) más barato.
+    - heuristic_h debe ser admisible respecto al destino más cercano, p.ej. el mínimo sobre
+      goals (HeuristicRegistry.min_over_goals).
+
+    Para "muchos orígenes -> pocos destinos" puede convenir buscar al revés:
+    a_star_multi(goals, sources, None, h_min_sobre_sources, adj=reverse_adjacency(adj))
+    y luego invertir path / start / goal.
+    """
+    if not sources or not goals:
+        raise ValueError("a_star_multi needs at least one source and one goal.")
+    if reach is not None and not any(reach.reachable(s, g) for s in sources for g in goals):
+        return MultiSearchResult(False, None, None, None, None, _empty_stats())
+    if adj is None:
+        adj = build_adjacency(distance_df)
+
+    goal_set = set(goals)
+    INF = float("inf")
+    g_score: Dict[str, float] = {}
+    came_from: Dict[str, Optional[str]] = {}
+
+    tie = 0
+    frontier: List[Tuple[float, int, str]] = []
+    for s in dict.fromkeys(sources):
+        g_score[s] = 0.0
+        came_from[s] = None
+        heapq.heappush(frontier, (float(heuristic_h(s)), tie, s))
+        tie += 1
+
+    generated = max_front = len(frontier)
+    reopen = 0
+
+    closed = set()
+
+    while frontier:
+        if len(frontier) > max_front:
+            max_front = len(frontier)
+
+        f_cur, _, current = heapq.heappop(frontier)
+        if current in closed:
+            continue
+
+        g_cur = g_score.get(current, INF)
+        closed.add(current)
+
+        if current in goal_set:
+            path = reconstruct_path(came_from, current)
+            return MultiSearchResult(
+                found=True,
+                start=path[0],
+                goal=current,
+                path_ids=intern_path(path),
+                total_cost=g_cur,
+                stats=SearchStats(len(closed), generated, max_front, reopen),
+            )
+
+        for nxt, step_cost in adj.get(current, []):
+            if step_cost < 0:
+                raise ValueError("Negative edge cost is not allowed for A*.")
+
+            cand_g = g_cur + step_cost
+            known_g = g_score.get(nxt, INF)
+
+            if cand_g < known_g:
+                if nxt in g_score:
+                    reopen += 1
+
+                g_score[nxt] = cand_g
+                came_from[nxt] = current
+
+                tie += 1
+                heapq.heappush(frontier, (cand_g + float(heuristic_h(nxt)), tie, nxt))
+                generated += 1
+
+    return MultiSearchResult(
+        found=False,
+        start=None,
+        goal=None,
+        path_ids=None,
+        total_cost=None,
+        stats=SearchStats(len(closed), generated, max_front, reopen),
+    )
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .algorithms import Adjacency, build_adjacency
+from .delta_stepping import DeltaSteppingEngine
+from .graph import CSRGraph, csr_from_adjacency
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# =========================================================
+# Partición del grafo (sin geometría)
+# =========================================================
+def partition_bfs(adj: Adjacency, n_regions: int) -> Dict[str, int]:
+    """
+    Partición en ~n_regions regiones por crecimiento BFS sobre el grafo no dirigido:
+    - las regiones se reparten entre componentes conexas según su tamaño; las islas que no
+      reciben ninguna comparten la región 0 (no hay aristas entre ellas, así que los flags
+      siguen siendo correctos);
+    - dentro de cada componente, semillas por "punto más lejano" (cada nueva semilla es el
+      nodo a más saltos de las ya elegidas) y BFS multi-origen: cada nodo va a la semilla
+      más cercana en saltos.
+    Determinista (orden de inserción de la adjacency).
+    """
+    und: Dict[str, List[str]] = {u: [] for u in adj}
+    for u, lst in adj.items():
+        for v, _ in lst:
+            und.setdefault(v, [])
+            und[u].append(v)
+            und[v].append(u)
+    if not und:
+        return {}
+    n_regions = max(1, int(n_regions))
+
+    def bfs(sources: List[str], hops: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+        hops = {} if hops is None else hops
+        q = deque()
+        for s in sources:
+            hops[s] = 0
+            q.append(s)
+        while q:
+            u = q.popleft()
+            for v in und[u]:
+                if hops.get(v, 1 << 62) > hops[u] + 1:
+                    hops[v] = hops[u] + 1
+                    q.append(v)
+        return hops
+
+    components: List[List[str]] = []
+    seen: Dict[str, int] = {}
+    for n in und:
+        if n not in seen:
+            comp = list(bfs([n]))
+            for x in comp:
+                seen[x] = 0
+            components.append(comp)
+    components.sort(key=len, reverse=True)
+    total = sum(len(c) for c in components)
+
+    region: Dict[str, int] = {}
+    next_id = 0
+    for comp in components:
+        k = min(len(comp), int(round(n_regions * len(comp) / total)), n_regions - next_id)
+        if k <= 0:
+            for x in comp:
+                region[x] = 0
+            continue
+        seeds = [comp[0]]
+        hops = bfs(seeds)
+        while len(seeds) < k:
+            far = max(comp, key=lambda x: hops[x])
+            if hops[far] == 0:
+                break
+            seeds.append(far)
+            bfs([far], hops)
+        for i, sd in enumerate(seeds):
+            region[sd] = next_id + i
+        q = deque(seeds)
+        while q:
+            u = q.popleft()
+            for v in und[u]:
+                if v not in region:
+                    region[v] = region[u]
+                    q.append(v)
+        next_id += len(seeds)
+    return region
+
+
+# =========================================================
+# Cálculo de flags (una región por tarea)
+# =========================================================
+_STATE: Dict[str, object] = {}
+
+
+def _init_worker(rev: CSRGraph, src: np.ndarray, dst: np.ndarray, w: np.ndarray, region: np.ndarray) -> None:
+    _STATE["rev"] = rev
+    _STATE["edges"] = (src, dst, w)
+    _STATE["region"] = region
+
+
+def _region_flags(r: int) -> Tuple[int, np.ndarray, int]:
+    """
+    Flags de la región r (bool por arista):
+    - aristas internas a r;
+    - aristas "tensas" (dist(u) == c(u,v) + dist(v)) del árbol hacia atrás desde cada nodo
+      frontera de r (nodos de r con alguna arista entrante desde fuera).
+    Un camino mínimo hacia un goal de r entra en r por última vez en un nodo frontera y desde
+    ahí solo usa aristas internas, así que todas sus aristas quedan marcadas.
+    """
+    rev: CSRGraph = _STATE["rev"]  # type: ignore[assignment]
+    src, dst, w = _STATE["edges"]  # type: ignore[misc]
+    region: np.ndarray = _STATE["region"]  # type: ignore[assignment]
+
+    flags = (region[src] == r) & (region[dst] == r)
+    boundary = np.unique(dst[(region[dst] == r) & (region[src] != r)])
+    with DeltaSteppingEngine(rev) as eng:
+        for b in boundary.tolist():
+            dist_map = eng.run(rev.nodes[b]).dist
+            dist = np.full(rev.n_nodes, np.inf)
+            if dist_map:
+                idx = np.fromiter((rev.index[n] for n in dist_map), dtype=np.int64, count=len(dist_map))
+                dist[idx] = np.fromiter(dist_map.values(), dtype=np.float64, count=len(dist_map))
+            du, dv = dist[src], dist[dst]
+            ok = np.isfinite(du) & np.isfinite(dv)
+            tight = ok & (w + dv <= du + 1e-9 * np.maximum(1.0, np.abs(du)))
+            flags |= tight
+    return r, flags, int(len(boundary))
+
+
+# =========================================================
+# Índice de arc-flags
+# =========================================================
+@dataclass
+class ArcFlags:
+    """
+    Arc-flags: bit r de la arista e = "e está en algún camino mínimo hacia la región r".
+    - packed: np.packbits de la matriz (E, R) de flags -> (E, ceil(R/8)) uint8.
+    - Las aristas siguen el orden de la adjacency (u en orden de inserción, sus aristas en orden).
+    - adjacency_for(goal): adjacency filtrada a las aristas con el flag de la región del goal,
+      cacheada por región (LRU acotada). Cualquier motor de algorithms.py la usa sin cambios.
+    """
+    adj: Adjacency
+    region: Dict[str, int]
+    n_regions: int
+    packed: np.ndarray
+    offsets: Dict[str, int]                  # u -> id de su primera arista
+    stats: Dict[str, float | int] = field(default_factory=dict)
+    cache_size: int = 64
+
+    def __post_init__(self) -> None:
+        self._cache: "OrderedDict[int, Adjacency]" = OrderedDict()
+
+    def flag(self, edge_id: int, r: int) -> bool:
+        return bool((self.packed[edge_id, r >> 3] >> (7 - (r & 7))) & 1)
+
+    def region_mask(self, r: int) -> np.ndarray:
+        """Flag de la región r para todas las aristas (bool, vectorizado sobre packed)."""
+        return ((self.packed[:, r >> 3] >> (7 - (r & 7))) & 1).astype(bool)
+
+    def adjacency_for(self, goal: str) -> Adjacency:
+        r = self.region.get(goal)
+        if r is None:
+            return self.adj
+        sub = self._cache.get(r)
+        if sub is not None:
+            self._cache.move_to_end(r)
+            return sub
+        mask = self.region_mask(r).tolist()
+        sub = {}
+        for u, lst in self.adj.items():
+            o = self.offsets[u]
+            sub[u] = [e for i, e in enumerate(lst) if mask[o + i]]
+        if len(self._cache) >= self.cache_size:
+            self._cache.popitem(last=False)
+        self._cache[r] = sub
+        return sub
+
+    def flag_density(self) -> float:
+        """Fracción media de aristas activas por región (1.0 = sin poda)."""
+        if self.packed.size == 0:
+            return 1.0
+        bits = np.unpackbits(self.packed, axis=1, count=self.n_regions)
+        return float(bits.mean())
+
+
+def build_arc_flags(adj: Adjacency, n_regions: int = 16, workers: int = 1) -> ArcFlags:
+    """
+    Preproceso completo: partición BFS + una tarea por región (búsquedas hacia atrás desde su
+    frontera con delta-stepping). Con workers > 1 las regiones se reparten entre procesos
+    (ProcessPoolExecutor; grafo y aristas se cargan una vez por worker).
+    """
+    t0 = time.perf_counter()
+    region_of = partition_bfs(adj, n_regions)
+    R = (max(region_of.values()) + 1) if region_of else 0
+
+    full: Adjacency = {u: list(lst) for u, lst in adj.items()}
+    for lst in adj.values():
+        for v, _ in lst:
+            full.setdefault(v, [])
+
+    graph = csr_from_adjacency(full)
+    offsets: Dict[str, int] = {}
+    src_l: List[int] = []
+    dst_l: List[int] = []
+    w_l: List[float] = []
+    for u, lst in full.items():
+        offsets[u] = len(src_l)
+        iu = graph.index[u]
+        for v, c in lst:
+            src_l.append(iu)
+            dst_l.append(graph.index[v])
+            w_l.append(float(c))
+    src = np.asarray(src_l, dtype=np.int64)
+    dst = np.asarray(dst_l, dtype=np.int64)
+    w = np.asarray(w_l, dtype=np.float64)
+    region = np.fromiter((region_of[n] for n in graph.nodes), dtype=np.int64, count=graph.n_nodes)
+    init_args = (graph.reversed(), src, dst, w, region)
+    t_part = time.perf_counter()
+
+    flags = np.zeros((len(src), max(R, 1)), dtype=bool)
+    boundary_nodes = 0
+    if workers > 1 and R > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as ex:
+            for r, col, nb in ex.map(_region_flags, range(R)):
+                flags[:, r] = col
+                boundary_nodes += nb
+    else:
+        _init_worker(*init_args)
+        try:
+            for r in range(R):
+                _, col, nb = _region_flags(r)
+                flags[:, r] = col
+                boundary_nodes += nb
+        finally:
+            _STATE.clear()
+
+    packed = np.packbits(flags, axis=1)
+    af = ArcFlags(adj=full, region=region_of, n_regions=R, packed=packed, offsets=offsets)
+    t1 = time.perf_counter()
+    af.stats = {
+        "regions": R,
+        "edges": int(len(src)),
+        "boundary_nodes": boundary_nodes,
+        "flag_bytes": int(packed.nbytes),
+        "flag_density": af.flag_density(),
+        "partition_ms": (t_part - t0) * 1000.0,
+        "preprocess_ms": (t1 - t0) * 1000.0,
+        "workers": int(workers),
+    }
+    return af
+
+
+def build_arc_flags_from_dataframe(distance_df: pd.DataFrame, n_regions: int = 16, workers: int = 1) -> ArcFlags:
+    return build_arc_flags(build_adjacency(distance_df), n_regions=n_regions, workers=workers)
@@ -1,12 +1,34 @@
 from __future__ import annotations
 
-from typing import Dict, List, Tuple, Callable
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Callable
+import heapq
 import time
-import pandas as pd
 
-from .algorithms import a_star, AStarResult, a_star_fast, AStarFastResult, dijkstra, ucs
-from .heuristics import HeuristicBundle
+from .algorithms import (
+    a_star,
+    AStarResult,
+    a_star_fast,
+    AStarFastResult,
+    ara_star,
+    Adjacency,
+    build_adjacency,
+    dijkstra,
+    ida_star,
+    sma_star,
+    ucs,
+    weighted_a_star,
+)
+from .heuristics import HeuristicBundle, HeuristicRegistry
+from .graph import build_csr
+from .delta_stepping import DeltaSteppingEngine
+from .reduction import ReducedGraph, reduce_graph
+from .arc_flags import ArcFlags, build_arc_flags
+from .hub_labels import HubLabels, build_hub_labels
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .results_store import ResultsStore
 
 
 def run_single(
@@ -28,7 +50,9 @@ def run_benchmark_case_astar(
     distance_df: pd.DataFrame,
     heuristic: HeuristicBundle,
     repeats: int = 50,
+    keep_times: bool = False,
 ) -> Dict:
+    """Una fila de benchmark; keep_times=True añade la distribución completa (times_ms)."""
     times_ms: List[float] = []
     last: AStarFastResult | None = None
 
@@ -61,66 +85,108 @@ def run_benchmark_case_astar(
         "path": " -> ".join(last.path) if last.path else None,
         "ms_per_expanded": (mean_ms / expanded) if expanded > 0 else None,
     }
+    if keep_times:
+        row["times_ms"] = times_ms
     return row
 
 
+def _resolve_heuristic(
+    heuristic: HeuristicBundle | str,
+    goal: str,
+    registry: Optional[HeuristicRegistry],
+) -> HeuristicBundle:
+    """Bundle tal cual, o construido (perezosamente) por nombre desde el registro."""
+    if isinstance(heuristic, HeuristicBundle):
+        return heuristic
+    if registry is None:
+        raise ValueError(f"Heuristic '{heuristic}' given by name but no registry was provided.")
+    return registry.get(heuristic, goal)
+
+
 def benchmark_heuristics(
     cases: List[Tuple[str, str]],
-    heuristics: List[HeuristicBundle],
+    heuristics: List[HeuristicBundle | str],
     distance_df: pd.DataFrame,
     repeats: int = 50,
+    registry: Optional[HeuristicRegistry] = None,
+    keep_times: bool = False,
 ) -> pd.DataFrame:
+    """
+    `heuristics` admite bundles ya construidos o nombres; los nombres se resuelven por goal
+    contra `registry`, que solo construye lo que se pide y reutiliza las constantes del grafo.
+    """
+    import pandas as pd
+
     rows = []
     for s, g in cases:
         for h in heuristics:
-            rows.append(run_benchmark_case_astar(s, g, distance_df, h, repeats=repeats))
+            hb = _resolve_heuristic(h, g, registry)
+            rows.append(run_benchmark_case_astar(s, g, distance_df, hb, repeats=repeats, keep_times=keep_times))
 
     df = pd.DataFrame(rows)
     df = df.sort_values(["start", "goal", "label"]).reset_index(drop=True)
     return df
 
 
+RANK_METRICS = ["expanded_nodes", "exec_time_ms_mean", "ms_per_expanded", "max_frontier"]
+
+
+def metrics_long(df: pd.DataFrame, label_col: str = "label") -> pd.DataFrame:
+    """Filas encontradas en formato largo (case, label, metric, value), sin nulos."""
+    d = df.loc[df["found"] == True, ["case", label_col, *RANK_METRICS]]  # noqa: E712
+    long = d.melt(id_vars=["case", label_col], value_vars=RANK_METRICS, var_name="metric")
+    return long.dropna(subset=["value"]).reset_index(drop=True)
+
+
+def label_scores(df: pd.DataFrame) -> pd.Series:
+    """
+    Score por label = suma de ranks por (caso, métrica), en una sola pasada agrupada:
+    - rank 1..n por orden ascendente (a igual valor, orden de aparición: equivale al
+      sort_values anterior con orden estable)
+    - empates con el mejor valor -> todos rank 1
+    Los scores de casos distintos son aditivos (permite acumular por particiones).
+    """
+    import pandas as pd
+
+    long = metrics_long(df)
+    labels = sorted(df.loc[df["found"] == True, "label"].unique().tolist())  # noqa: E712
+    if long.empty:
+        return pd.Series(0.0, index=labels, dtype=float)
+    grp = long.groupby(["case", "metric"], sort=False)["value"]
+    rank = grp.rank(method="first").where(long["value"] != grp.transform("min"), 1.0)
+    return rank.groupby(long["label"]).sum().reindex(labels, fill_value=0.0).astype(float)
+
+
+def _best_from_scores(score: pd.Series) -> str:
+    if score.empty:
+        return ""
+    # menor score gana; a igual score, el primero en orden alfabético
+    score = score.sort_index(kind="stable")
+    return str(score.idxmin())
+
+
 def pick_best_label_overall(df: pd.DataFrame) -> str:
     """
     Escoge el 'label' ganador (heurística) globalmente usando ranking por caso en:
     expanded_nodes, exec_time_ms_mean, ms_per_expanded, max_frontier.
     Menor es mejor.
     """
-    metrics = ["expanded_nodes", "exec_time_ms_mean", "ms_per_expanded", "max_frontier"]
-    df = df.copy()
-    df = df[df["found"] == True]
-    if df.empty:
-        # fallback: el primero que haya
-        return str(df["label"].iloc[0]) if "label" in df.columns and len(df) else ""
-
-    labels = sorted(df["label"].unique().tolist())
-    score = {lb: 0.0 for lb in labels}
+    return _best_from_scores(label_scores(df))
 
-    for case in sorted(df["case"].unique().tolist()):
-        dfc = df[df["case"] == case].copy()
-        if dfc.empty:
-            continue
 
-        for m in metrics:
-            d = dfc.dropna(subset=[m])
-            if d.empty:
-                continue
-            # ranking: menor valor => rank 1
-            d = d.sort_values(m, ascending=True)
-            # asignar rank (ties -> mismo rank mínimo)
-            best = float(d[m].iloc[0])
-            # rank simple: 1..n
-            ranks = {row["label"]: i + 1 for i, (_, row) in enumerate(d.iterrows())}
-            # ties: todos con el mismo valor que best tienen rank 1
-            for _, row in d.iterrows():
-                if float(row[m]) == best:
-                    ranks[row["label"]] = 1
-
-            for lb, rk in ranks.items():
-                score[lb] += float(rk)
+def pick_best_label_from_store(store: ResultsStore, run: str, phase: str) -> str:
+    """
+    Igual que pick_best_label_overall, pero leyendo del ResultsStore partición a partición
+    (solo las columnas necesarias), para sweeps que no caben en memoria.
+    """
+    import pandas as pd
 
-    # menor score gana
-    return min(score.items(), key=lambda kv: kv[1])[0]
+    columns = ["case", "label", "found", *RANK_METRICS]
+    total = pd.Series(dtype=float)
+    for _, _, _, path in store.partitions(run, phase):
+        part = label_scores(store.read_partition(path, columns=columns))
+        total = total.add(part, fill_value=0.0)
+    return _best_from_scores(total)
 
 
 # -------------------------
@@ -133,6 +199,8 @@ def _bench_algo(
     algo_name: str,
     algo_fn: Callable[[], Tuple[bool, float | None, List[str] | None, Dict[str, float | int]]],
     repeats: int,
+    keep_times: bool = False,
+    extra_stats: Sequence[str] = (),
 ) -> Dict:
     times_ms: List[float] = []
     last_found = False
@@ -150,7 +218,7 @@ def _bench_algo(
     expanded = int(last_stats.get("expanded_nodes", 0))
     mean_ms = sum(times_ms) / len(times_ms)
 
-    return {
+    row = {
         "case": f"{start}->{goal}",
         "start": start,
         "goal": goal,
@@ -168,61 +236,465 @@ def _bench_algo(
         "path": " -> ".join(last_path) if last_path else None,
         "ms_per_expanded": (mean_ms / expanded) if expanded > 0 else None,
     }
+    for k in extra_stats:
+        row[k] = int(last_stats.get(k, 0))
+    if keep_times:
+        row["times_ms"] = times_ms
+    return row
+
+
+ALGORITHM_ENGINES = ("astar", "dijkstra", "ucs", "wastar", "arastar", "idastar", "smastar")
+DEFAULT_WEIGHTS = (1.5, 2.0, 3.0)
+DEFAULT_SMA_MAX_NODES = 10_000
+HEURISTIC_ENGINES = {"astar", "wastar", "arastar", "idastar", "smastar"}
 
 
 def benchmark_algorithms(
     cases: List[Tuple[str, str]],
     distance_df: pd.DataFrame,
-    astar_heuristic: HeuristicBundle,
+    astar_heuristic: HeuristicBundle | str,
     repeats: int = 50,
+    registry: Optional[HeuristicRegistry] = None,
+    engines: Sequence[str] = ALGORITHM_ENGINES,
+    keep_times: bool = False,
+    weights: Sequence[float] = DEFAULT_WEIGHTS,
+    ara_deadline_s: Optional[float] = None,
+    sma_max_nodes: int = DEFAULT_SMA_MAX_NODES,
 ) -> pd.DataFrame:
+    """
+    `engines` permite ejecutar solo un subconjunto de ALGORITHM_ENGINES.
+    keep_times=True añade a cada fila la distribución de tiempos (times_ms).
+
+    wastar: una fila por peso de `weights` (f = g + w·h).
+    arastar: ARA* desde max(weights) hasta w=1 (o hasta ara_deadline_s).
+    idastar / smastar: memoria acotada (SMA* con sma_max_nodes nodos); sus filas añaden
+    peak_frontier y peak_memory_nodes.
+    Todas las filas llevan cost_gap (coste / óptimo - 1, con el óptimo de Dijkstra)
+    y suboptimality_bound (1 en los motores exactos).
+    """
+    import pandas as pd
+
+    unknown = set(engines) - set(ALGORITHM_ENGINES)
+    if unknown:
+        raise ValueError(f"Unknown engines: {sorted(unknown)}")
+
     rows = []
     for s, g in cases:
+        case_rows = []
+        hb = _resolve_heuristic(astar_heuristic, g, registry) if HEURISTIC_ENGINES & set(engines) else None
+
         # A* con heurística ganadora
-        rows.append(
-            _bench_algo(
-                s, g, distance_df,
-                algo_name=f"A*_({astar_heuristic.name})",
-                algo_fn=lambda s=s, g=g: (
-                    (res := a_star_fast(s, g, distance_df, astar_heuristic.h)).found,
-                    res.total_cost,
-                    res.path,
-                    res.stats,
-                ),
-                repeats=repeats,
+        if "astar" in engines:
+            case_rows.append(
+                _bench_algo(
+                    s, g, distance_df,
+                    algo_name=f"A*_({hb.name})",
+                    algo_fn=lambda s=s, g=g, hb=hb: (
+                        (res := a_star_fast(s, g, distance_df, hb.h)).found,
+                        res.total_cost,
+                        res.path,
+                        res.stats,
+                    ),
+                    repeats=repeats,
+                    keep_times=keep_times,
+                )
             )
-        )
 
         # Dijkstra
-        rows.append(
-            _bench_algo(
-                s, g, distance_df,
-                algo_name="Dijkstra",
-                algo_fn=lambda s=s, g=g: (
-                    (res := dijkstra(s, g, distance_df)).found,
-                    res.total_cost,
-                    res.path,
-                    res.stats,
-                ),
-                repeats=repeats,
+        if "dijkstra" in engines:
+            case_rows.append(
+                _bench_algo(
+                    s, g, distance_df,
+                    algo_name="Dijkstra",
+                    algo_fn=lambda s=s, g=g: (
+                        (res := dijkstra(s, g, distance_df)).found,
+                        res.total_cost,
+                        res.path,
+                        res.stats,
+                    ),
+                    repeats=repeats,
+                    keep_times=keep_times,
+                )
             )
-        )
 
         # UCS
-        rows.append(
-            _bench_algo(
+        if "ucs" in engines:
+            case_rows.append(
+                _bench_algo(
+                    s, g, distance_df,
+                    algo_name="UCS",
+                    algo_fn=lambda s=s, g=g: (
+                        (res := ucs(s, g, distance_df)).found,
+                        res.total_cost,
+                        res.path,
+                        res.stats,
+                    ),
+                    repeats=repeats,
+                    keep_times=keep_times,
+                )
+            )
+
+        # Weighted A* (un peso por fila)
+        if "wastar" in engines:
+            for w in weights:
+                row = _bench_algo(
+                    s, g, distance_df,
+                    algo_name=f"wA*_w{w:g}_({hb.name})",
+                    algo_fn=lambda s=s, g=g, hb=hb, w=w: (
+                        (res := weighted_a_star(s, g, distance_df, hb.h, weight=w)).found,
+                        res.total_cost,
+                        res.path,
+                        res.stats,
+                    ),
+                    repeats=repeats,
+                    keep_times=keep_times,
+                )
+                row["suboptimality_bound"] = float(w)
+                case_rows.append(row)
+
+        # ARA* (anytime)
+        if "arastar" in engines:
+            last_ara: List = []
+
+            def run_ara(s=s, g=g, hb=hb):
+                res = ara_star(s, g, distance_df, hb.h, w0=max(weights, default=3.0), deadline_s=ara_deadline_s)
+                last_ara[:] = [res]
+                return res.found, res.total_cost, res.path, res.stats
+
+            row = _bench_algo(
                 s, g, distance_df,
-                algo_name="UCS",
-                algo_fn=lambda s=s, g=g: (
-                    (res := ucs(s, g, distance_df)).found,
-                    res.total_cost,
-                    res.path,
-                    res.stats,
-                ),
+                algo_name=f"ARA*_({hb.name})",
+                algo_fn=run_ara,
                 repeats=repeats,
+                keep_times=keep_times,
+            )
+            row["suboptimality_bound"] = float(last_ara[0].stats["suboptimality_bound"])
+            case_rows.append(row)
+
+        # Memoria acotada
+        if "idastar" in engines:
+            case_rows.append(
+                _bench_algo(
+                    s, g, distance_df,
+                    algo_name=f"IDA*_({hb.name})",
+                    algo_fn=lambda s=s, g=g, hb=hb: (
+                        (res := ida_star(s, g, distance_df, hb.h)).found,
+                        res.total_cost,
+                        res.path,
+                        res.stats,
+                    ),
+                    repeats=repeats,
+                    keep_times=keep_times,
+                    extra_stats=("peak_frontier", "peak_memory_nodes"),
+                )
             )
-        )
+
+        if "smastar" in engines:
+            case_rows.append(
+                _bench_algo(
+                    s, g, distance_df,
+                    algo_name=f"SMA*_m{sma_max_nodes}_({hb.name})",
+                    algo_fn=lambda s=s, g=g, hb=hb: (
+                        (res := sma_star(s, g, distance_df, hb.h, max_nodes=sma_max_nodes)).found,
+                        res.total_cost,
+                        res.path,
+                        res.stats,
+                    ),
+                    repeats=repeats,
+                    keep_times=keep_times,
+                    extra_stats=("peak_frontier", "peak_memory_nodes"),
+                )
+            )
+
+        optimal = dijkstra(s, g, distance_df).total_cost
+        for row in case_rows:
+            row.setdefault("suboptimality_bound", 1.0)
+            cost = row["total_cost"]
+            if cost is None:
+                row["cost_gap"] = None
+            else:
+                row["cost_gap"] = (cost / optimal - 1.0) if optimal else 0.0
+        rows.extend(case_rows)
 
     df = pd.DataFrame(rows)
     df = df.sort_values(["start", "goal", "label"]).reset_index(drop=True)
     return df
+
+
+# -------------------------
+# 3) Delta-stepping (uno-a-todos) barriendo Delta
+# -------------------------
+def _dijkstra_all(adj: Adjacency, source: str) -> Dict[str, float]:
+    """Dijkstra uno-a-todos de referencia: distancia a cada nodo alcanzable desde source."""
+    dist: Dict[str, float] = {source: 0.0}
+    pq: List[Tuple[float, str]] = [(0.0, source)]
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        for v, w in adj.get(u, ()):
+            nd = d + w
+            if nd < dist.get(v, float("inf")):
+                dist[v] = nd
+                heapq.heappush(pq, (nd, v))
+    return dist
+
+
+def benchmark_delta_stepping(
+    sources: List[str],
+    distance_df: pd.DataFrame,
+    deltas: List[float],
+    workers: int = 1,
+    backend: str = "serial",
+    repeats: int = 5,
+    verify: bool = True,
+) -> pd.DataFrame:
+    """
+    Una fila por (source, Delta). Si verify=True, compara las distancias con un Dijkstra
+    uno-a-todos por source (columna matches_dijkstra).
+    """
+    import pandas as pd
+
+    graph = build_csr(distance_df)
+    reference: Dict[str, Dict[str, float | None]] = {}
+    if verify:
+        adj = build_adjacency(distance_df)
+        for s in sources:
+            ref = _dijkstra_all(adj, s)
+            reference[s] = {t: ref.get(t) for t in graph.nodes}
+
+    rows = []
+    for delta in deltas:
+        with DeltaSteppingEngine(graph, delta=delta, workers=workers, backend=backend) as eng:
+            for s in sources:
+                times_ms: List[float] = []
+                last = None
+                for _ in range(repeats):
+                    t0 = time.perf_counter()
+                    last = eng.run(s)
+                    t1 = time.perf_counter()
+                    times_ms.append((t1 - t0) * 1000.0)
+                assert last is not None
+
+                matches = None
+                if verify:
+                    matches = all(
+                        (ref is None and t not in last.dist)
+                        or (ref is not None and abs(last.dist.get(t, float("inf")) - ref) <= 1e-9 * max(1.0, ref))
+                        for t, ref in reference[s].items()
+                    )
+
+                rows.append({
+                    "source": s,
+                    "label": f"delta={eng.delta:g}",
+                    "kind": "delta_stepping",
+                    "delta": eng.delta,
+                    "backend": eng.backend,
+                    "workers": eng.workers,
+                    "exec_time_ms_mean": sum(times_ms) / len(times_ms),
+                    "exec_time_ms_min": min(times_ms),
+                    "reached_nodes": int(last.stats["reached_nodes"]),
+                    "buckets": int(last.stats["buckets"]),
+                    "phases": int(last.stats["phases"]),
+                    "light_relaxations": int(last.stats["light_relaxations"]),
+                    "heavy_relaxations": int(last.stats["heavy_relaxations"]),
+                    "matches_dijkstra": matches,
+                })
+
+    df = pd.DataFrame(rows)
+    df = df.sort_values(["source", "delta"]).reset_index(drop=True)
+    return df
+
+
+# -------------------------
+# 4) Reducción del grafo (cadenas de grado 2 + poda de callejones)
+# -------------------------
+def _time_ms(fn: Callable[[], object], repeats: int) -> Tuple[List[float], object]:
+    times_ms: List[float] = []
+    last = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        last = fn()
+        t1 = time.perf_counter()
+        times_ms.append((t1 - t0) * 1000.0)
+    return times_ms, last
+
+
+# Motores de búsqueda completa contra los que se compara cada índice / preproceso
+_FULL_SEARCH = {"astar": a_star_fast, "dijkstra": dijkstra, "ucs": ucs}
+
+
+def _search_outcome(res) -> Tuple[bool, Optional[float], int]:
+    return res.found, res.total_cost, int(res.stats["expanded_nodes"])
+
+
+def _benchmark_indexed(
+    cases: List[Tuple[str, str]],
+    distance_df: pd.DataFrame,
+    astar_heuristic: HeuristicBundle | str,
+    repeats: int,
+    registry: Optional[HeuristicRegistry],
+    engines: Sequence[str],
+    allowed: Sequence[str],
+    kind: str,
+    suffix: str,
+    preprocess: Callable[[Adjacency], object],
+    query: Callable[[object, str, str, str, Optional[Callable[[str], float]]], object],
+    stat_cols: Sequence[str],
+    outcome: Callable[[object], Tuple[bool, Optional[float], int]] = _search_outcome,
+    prepare_goal: Optional[Callable[[object, str], None]] = None,
+) -> pd.DataFrame:
+    """
+    Plantilla común: una fila por (caso, motor) con la búsqueda completa del motor frente a
+    query(index, s, g, motor, h) sobre el índice que devuelve preprocess(adj). Ambos lados con
+    las estructuras ya construidas; prepare_goal calienta lo que el índice cachea por goal.
+    Columnas *_full frente a *_<suffix>, speedup y, repetidas en cada fila, index.stats[stat_cols].
+    """
+    import pandas as pd
+
+    unknown = set(engines) - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown engines: {sorted(unknown)}")
+
+    adj = build_adjacency(distance_df)
+    index = preprocess(adj)
+    stats = {c: index.stats[c] for c in stat_cols}
+
+    rows = []
+    for s, g in cases:
+        h = _resolve_heuristic(astar_heuristic, g, registry).h if "astar" in engines else None
+        if prepare_goal is not None:
+            prepare_goal(index, g)
+        for eng in engines:
+            fn = _FULL_SEARCH[eng]
+            extra = {"heuristic_h": h} if eng == "astar" else {}
+            t_full, res_full = _time_ms(lambda: fn(s, g, None, adj=adj, **extra), repeats)
+            t_idx, res_idx = _time_ms(lambda: query(index, s, g, eng, h), repeats)
+            mean_full = sum(t_full) / len(t_full)
+            mean_idx = sum(t_idx) / len(t_idx)
+            found, cost, expanded = _search_outcome(res_full)
+            found_idx, cost_idx, expanded_idx = outcome(res_idx)
+
+            rows.append({
+                "case": f"{s}->{g}",
+                "start": s,
+                "goal": g,
+                "label": eng,
+                "kind": kind,
+                "found": found,
+                "total_cost": cost,
+                "cost_matches": (found == found_idx) and (
+                    not found or abs(cost - cost_idx) <= 1e-9 * max(1.0, cost)
+                ),
+                "expanded_full": expanded,
+                f"expanded_{suffix}": expanded_idx,
+                "exec_time_ms_full": mean_full,
+                f"exec_time_ms_{suffix}": mean_idx,
+                "speedup": (mean_full / mean_idx) if mean_idx > 0 else None,
+                **stats,
+            })
+
+    df = pd.DataFrame(rows)
+    df = df.sort_values(["start", "goal", "label"]).reset_index(drop=True)
+    return df
+
+
+REDUCTION_ENGINES = ("astar", "dijkstra", "ucs")
+
+
+def benchmark_reduction(
+    cases: List[Tuple[str, str]],
+    distance_df: pd.DataFrame,
+    astar_heuristic: HeuristicBundle | str,
+    repeats: int = 20,
+    registry: Optional[HeuristicRegistry] = None,
+    engines: Sequence[str] = REDUCTION_ENGINES,
+    reduced: Optional[ReducedGraph] = None,
+) -> pd.DataFrame:
+    """
+    Una fila por (caso, motor): grafo completo vs grafo reducido, ambos con la adjacency ya
+    construida. El tiempo reducido incluye las aristas virtuales de la consulta y la expansión
+    del camino. Las columnas node_reduction / edge_reduction / preprocess_ms repiten
+    ReducedGraph.stats en cada fila.
+    """
+    return _benchmark_indexed(
+        cases, distance_df, astar_heuristic, repeats, registry, engines, REDUCTION_ENGINES,
+        kind="reduction",
+        suffix="reduced",
+        preprocess=lambda adj: reduced if reduced is not None else reduce_graph(adj),
+        query=lambda rg, s, g, eng, h: rg.search(s, g, eng, heuristic_h=h),
+        stat_cols=("node_reduction", "edge_reduction", "preprocess_ms"),
+    )
+
+
+ARC_FLAG_ENGINES = ("astar", "dijkstra", "ucs")
+
+
+def benchmark_arc_flags(
+    cases: List[Tuple[str, str]],
+    distance_df: pd.DataFrame,
+    astar_heuristic: HeuristicBundle | str,
+    repeats: int = 20,
+    registry: Optional[HeuristicRegistry] = None,
+    engines: Sequence[str] = ARC_FLAG_ENGINES,
+    n_regions: int = 16,
+    workers: int = 1,
+    flags: Optional[ArcFlags] = None,
+) -> pd.DataFrame:
+    """
+    Una fila por (caso, motor): grafo completo vs mismo motor con arc_flags, ambos con la
+    adjacency ya construida. La adjacency filtrada de la región del goal se calienta antes de
+    medir (se cachea por región). preprocess_ms / flag_density / flag_bytes repiten
+    ArcFlags.stats en cada fila para poner el coste del preproceso junto al speedup.
+    """
+    def query(af: ArcFlags, s: str, g: str, eng: str, h):
+        extra = {"heuristic_h": h} if eng == "astar" else {}
+        return _FULL_SEARCH[eng](s, g, None, adj=af.adj, arc_flags=af, **extra)
+
+    return _benchmark_indexed(
+        cases, distance_df, astar_heuristic, repeats, registry, engines, ARC_FLAG_ENGINES,
+        kind="arc_flags",
+        suffix="flags",
+        preprocess=lambda adj: flags if flags is not None else build_arc_flags(adj, n_regions=n_regions, workers=workers),
+        query=query,
+        stat_cols=("regions", "flag_density", "flag_bytes", "preprocess_ms"),
+        prepare_goal=lambda af, g: af.adjacency_for(g),
+    )
+
+
+# -------------------------
+# Hub labels (consulta de distancia por merge de etiquetas)
+# -------------------------
+HUB_LABEL_ENGINES = ("astar", "dijkstra", "ucs")
+
+
+def _label_outcome(d: float) -> Tuple[bool, Optional[float], int]:
+    # el merge de etiquetas no expande nodos
+    found = d != float("inf")
+    return found, (d if found else None), 0
+
+
+def benchmark_hub_labels(
+    cases: List[Tuple[str, str]],
+    distance_df: pd.DataFrame,
+    astar_heuristic: HeuristicBundle | str,
+    repeats: int = 20,
+    registry: Optional[HeuristicRegistry] = None,
+    engines: Sequence[str] = HUB_LABEL_ENGINES,
+    labels: Optional[HubLabels] = None,
+) -> pd.DataFrame:
+    """
+    Una fila por (caso, motor): latencia de HubLabels.distance (exec_time_ms_labels) frente a
+    la búsqueda completa del motor (ambos con las estructuras ya construidas). index_bytes /
+    avg_*_label / preprocess_ms repiten HubLabels.stats en cada fila para poner tamaño y
+    preproceso junto a la latencia.
+    """
+    return _benchmark_indexed(
+        cases, distance_df, astar_heuristic, repeats, registry, engines, HUB_LABEL_ENGINES,
+        kind="hub_labels",
+        suffix="labels",
+        preprocess=lambda adj: labels if labels is not None else build_hub_labels(adj),
+        query=lambda hl, s, g, eng, h: hl.distance(s, g),
+        stat_cols=("index_bytes", "avg_out_label", "avg_in_label", "preprocess_ms"),
+        outcome=_label_outcome,
+    )
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import math
+import numpy as np
+
+from .graph import CSRGraph, build_csr, gather_edges
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# =========================================================
+# Resultado
+# =========================================================
+@dataclass
+class DeltaSteppingResult:
+    start: str
+    dist: Dict[str, float]          # solo nodos alcanzables
+    stats: Dict[str, float | int]
+
+    def distance_to(self, goal: str) -> Optional[float]:
+        return self.dist.get(goal)
+
+
+# =========================================================
+# Relajación (común a serie / hilos / procesos)
+# =========================================================
+def _relax_candidates(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    weights: np.ndarray,
+    dist: np.ndarray,
+    frontier: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(destinos, distancia candidata) de las aristas de `frontier` que mejoran dist."""
+    src, eids = gather_edges(indptr, frontier)
+    if eids.size == 0:
+        return eids, np.empty(0, dtype=np.float64)
+    tgt = indices[eids]
+    cand = dist[src] + weights[eids]
+    mask = cand < dist[tgt]
+    return tgt[mask], cand[mask]
+
+
+# --- Estado de los procesos worker (memoria compartida) ---
+_WORKER: Dict[str, object] = {}
+
+
+def _attach(spec: Tuple[str, Tuple[int, ...], str]) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _worker_init(specs: Dict[str, Tuple[str, Tuple[int, ...], str]]) -> None:
+    for key, spec in specs.items():
+        shm, arr = _attach(spec)
+        _WORKER[key + "_shm"] = shm  # mantener viva la referencia
+        _WORKER[key] = arr
+
+
+def _worker_relax(kind: str, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return _relax_candidates(
+        _WORKER[kind + "_indptr"],  # type: ignore[arg-type]
+        _WORKER[kind + "_indices"],  # type: ignore[arg-type]
+        _WORKER[kind + "_weights"],  # type: ignore[arg-type]
+        _WORKER["dist"],  # type: ignore[arg-type]
+        frontier,
+    )
+
+
+def _split_by_weight(graph: CSRGraph, light: bool, delta: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    mask = graph.weights <= delta if light else graph.weights > delta
+    counts = np.bincount(graph.edge_sources()[mask], minlength=graph.n_nodes)
+    indptr = np.zeros(graph.n_nodes + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    return indptr, graph.indices[mask].copy(), graph.weights[mask].copy()
+
+
+def default_delta(graph: CSRGraph) -> float:
+    """Heurística clásica: Delta = peso máximo / grado medio."""
+    if graph.n_edges == 0:
+        return 1.0
+    avg_degree = graph.n_edges / max(graph.n_nodes, 1)
+    return float(max(graph.weights.max() / max(avg_degree, 1.0), 1e-12))
+
+
+# =========================================================
+# Delta-stepping
+# =========================================================
+class DeltaSteppingEngine:
+    """
+    SSSP uno-a-todos por delta-stepping (Meyer & Sanders):
+    - Buckets de anchura Delta; aristas ligeras (w <= Delta) se relajan dentro del bucket
+      hasta que se vacía, las pesadas una sola vez al cerrarlo.
+    - La relajación de cada fase se reparte por trozos del bucket entre workers:
+        backend="serial"  -> sin paralelismo
+        backend="thread"  -> ThreadPoolExecutor sobre los mismos arrays NumPy
+        backend="process" -> ProcessPoolExecutor; CSR y dist en shared_memory
+    - La reducción (np.minimum.at) se hace en el proceso principal.
+
+    Usar como context manager (o llamar a close()) para liberar pool y memoria compartida.
+    """
+
+    def __init__(
+        self,
+        graph: CSRGraph,
+        delta: Optional[float] = None,
+        workers: int = 1,
+        backend: str = "serial",
+        parallel_threshold: int = 2048,
+    ):
+        backend = backend.lower().strip()
+        if backend not in {"serial", "thread", "process"}:
+            raise ValueError(f"backend must be one of serial/thread/process, got {backend}")
+        if delta is not None and delta <= 0:
+            raise ValueError("delta must be > 0")
+        if graph.n_edges and float(graph.weights.min()) < 0:
+            raise ValueError("Negative edge cost is not allowed for delta-stepping.")
+
+        self.graph = graph
+        self.delta = float(delta) if delta is not None else default_delta(graph)
+        self.workers = max(1, int(workers))
+        self.backend = backend if self.workers > 1 else "serial"
+        self.parallel_threshold = int(parallel_threshold)
+
+        self._arrays: Dict[str, np.ndarray] = {}
+        for kind, is_light in (("light", True), ("heavy", False)):
+            ip, ix, w = _split_by_weight(graph, is_light, self.delta)
+            self._arrays[kind + "_indptr"] = ip
+            self._arrays[kind + "_indices"] = ix
+            self._arrays[kind + "_weights"] = w
+        self._arrays["dist"] = np.full(graph.n_nodes, np.inf, dtype=np.float64)
+
+        self._shms: List[shared_memory.SharedMemory] = []
+        self._pool: Optional[Executor] = None
+        if self.backend == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        elif self.backend == "process":
+            specs = {}
+            for key, arr in list(self._arrays.items()):
+                shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+                shared = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+                shared[...] = arr
+                self._arrays[key] = shared
+                self._shms.append(shm)
+                specs[key] = (shm.name, arr.shape, arr.dtype.str)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_worker_init, initargs=(specs,)
+            )
+
+    # --- ciclo de vida ---
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        # soltar vistas antes de cerrar la memoria compartida
+        self._arrays = {}
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
+        self._shms = []
+
+    def __enter__(self) -> "DeltaSteppingEngine":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --- relajación de una fase ---
+    def _relax(self, kind: str, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+        a = self._arrays
+        if self._pool is None or frontier.size < self.parallel_threshold:
+            tgt, cand = _relax_candidates(
+                a[kind + "_indptr"], a[kind + "_indices"], a[kind + "_weights"], a["dist"], frontier
+            )
+            return tgt, cand, 1
+
+        chunks = np.array_split(frontier, self.workers)
+        if self.backend == "thread":
+            futs = [
+                self._pool.submit(
+                    _relax_candidates,
+                    a[kind + "_indptr"], a[kind + "_indices"], a[kind + "_weights"], a["dist"], c,
+                )
+                for c in chunks if c.size
+            ]
+        else:
+            futs = [self._pool.submit(_worker_relax, kind, c) for c in chunks if c.size]
+        parts = [f.result() for f in futs]
+        tgt = np.concatenate([p[0] for p in parts])
+        cand = np.concatenate([p[1] for p in parts])
+        return tgt, cand, len(parts)
+
+    def run(self, start: str) -> DeltaSteppingResult:
+        g = self.graph
+        if start not in g.index:
+            raise KeyError(f"Unknown start node: {start}")
+
+        delta = self.delta
+        dist = self._arrays["dist"]
+        dist[:] = np.inf
+        dist[g.index[start]] = 0.0
+
+        # pending: nodos con dist finita que aún están en algún bucket
+        pending = np.zeros(g.n_nodes, dtype=bool)
+        pending[g.index[start]] = True
+
+        stats: Dict[str, float | int] = {
+            "buckets": 0,
+            "phases": 0,
+            "light_relaxations": 0,
+            "heavy_relaxations": 0,
+            "parallel_tasks": 0,
+        }
+
+        while True:
+            idx = np.flatnonzero(pending)
+            if idx.size == 0:
+                break
+            bucket = math.floor(float(dist[idx].min()) / delta)
+            stats["buckets"] += 1
+            settled_here: List[np.ndarray] = []
+
+            while True:
+                idx = np.flatnonzero(pending)
+                in_bucket = idx[np.floor(dist[idx] / delta) == bucket]
+                if in_bucket.size == 0:
+                    break
+                pending[in_bucket] = False
+                settled_here.append(in_bucket)
+
+                tgt, cand, ntasks = self._relax("light", in_bucket)
+                stats["phases"] += 1
+                stats["parallel_tasks"] += ntasks
+                stats["light_relaxations"] += int(tgt.size)
+                if tgt.size:
+                    np.minimum.at(dist, tgt, cand)
+                    pending[tgt] = True
+
+            removed = np.unique(np.concatenate(settled_here))
+            tgt, cand, ntasks = self._relax("heavy", removed)
+            stats["parallel_tasks"] += ntasks
+            stats["heavy_relaxations"] += int(tgt.size)
+            if tgt.size:
+                np.minimum.at(dist, tgt, cand)
+                pending[tgt] = True
+
+        reach = np.flatnonzero(np.isfinite(dist))
+        stats["reached_nodes"] = int(reach.size)
+        return DeltaSteppingResult(
+            start=start,
+            dist={g.nodes[int(i)]: float(dist[i]) for i in reach},
+            stats=stats,
+        )
+
+
+def delta_stepping(
+    start: str,
+    distance_df: pd.DataFrame,
+    delta: Optional[float] = None,
+    workers: int = 1,
+    backend: str = "serial",
+) -> DeltaSteppingResult:
+    """Atajo uno-a-todos: construye el CSR, ejecuta una vez y libera recursos."""
+    with DeltaSteppingEngine(build_csr(distance_df), delta=delta, workers=workers, backend=backend) as eng:
+        return eng.run(start)
@@ -0,0 +1,703 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .algorithms import (
+    Adjacency,
+    a_star,
+    a_star_fast,
+    a_star_multi,
+    ara_star,
+    build_adjacency,
+    dijkstra,
+    ida_star,
+    sma_star,
+    ucs,
+    weighted_a_star,
+)
+from .heuristics import Coords, HeuristicRegistry
+from .spatial import CoordStore
+
+if TYPE_CHECKING:
+    import networkx as nx
+    import pandas as pd
+
+FCC_LEVELS = (2.0, 5.0, 8.0)          # los mismos niveles que data/nodes_distance.csv
+DEFAULT_SIZES = (50, 200, 800)
+DEFAULT_HEURISTICS = ("euclidean", "manhattan_scaled", "chebyshev_scaled", "region_scaled")
+DEFAULT_TIMEOUT_S = 30.0              # por consulta: un motor colgado falla la pasada, no la bloquea
+SMA_BUDGETS = (4, 8, 32)              # presupuestos pequeños: obligan a SMA* a olvidar nodos
+
+
+# =========================================================
+# Grafos aleatorios con coordenadas
+# =========================================================
+def random_digraph(
+    n_nodes: int,
+    seed: int = 0,
+    k: int = 3,
+    one_way: float = 0.3,
+    detour: Tuple[float, float] = (1.0, 1.3),
+    fcc_levels: Sequence[float] = FCC_LEVELS,
+) -> Tuple[pd.DataFrame, Coords]:
+    """
+    Red aleatoria con la forma de la real: subestaciones en un cuadrado y líneas a sus k
+    vecinos más cercanos.
+    - dist_km = distancia euclídea · U(detour) (redondeada hacia arriba a 0.1 km): nunca menor
+      que la recta, como una línea real;
+    - FCC sorteado en fcc_levels; real = dist_km · FCC;
+    - con probabilidad one_way la línea solo existe en un sentido (quedan pares sin camino).
+    Devuelve (distance_df con start_node/end_node/dist_km/FCC/real, coords).
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    side = 10.0 * np.sqrt(max(n_nodes, 1))
+    xy = rng.uniform(0.0, side, size=(n_nodes, 2)).round(3)
+    names = [f"N{i}" for i in range(n_nodes)]
+    coords: Coords = {n: (float(x), float(y)) for n, (x, y) in zip(names, xy)}
+
+    kk = min(k + 1, n_nodes)
+    idx, dist = CoordStore(coords).nearest(xy, k=kk)
+    rows: List[Tuple[str, str, float, float]] = []
+    seen = set()
+    for i in range(n_nodes):
+        for j, d in zip(idx[i, 1:].tolist(), dist[i, 1:].tolist()):
+            if j < 0 or j == i:
+                continue
+            pairs = [(i, j)] if rng.random() < one_way else [(i, j), (j, i)]
+            for u, v in pairs:
+                if (u, v) in seen:
+                    continue
+                seen.add((u, v))
+                km = float(np.ceil(d * rng.uniform(*detour) * 10.0) / 10.0)
+                rows.append((names[u], names[v], km, float(rng.choice(fcc_levels))))
+
+    df = pd.DataFrame(rows, columns=["start_node", "end_node", "dist_km", "FCC"])
+    df["real"] = df["dist_km"] * df["FCC"]
+    return df, coords
+
+
+def to_networkx(adj: Adjacency) -> nx.DiGraph:
+    """DiGraph de referencia; con aristas paralelas se queda la más barata."""
+    import networkx as nx
+
+    G = nx.DiGraph()
+    G.add_nodes_from(adj)
+    for u, lst in adj.items():
+        for v, w in lst:
+            if not G.has_edge(u, v) or w < G[u][v]["weight"]:
+                G.add_edge(u, v, weight=float(w))
+    return G
+
+
+# =========================================================
+# Contexto por grafo (estructuras derivadas, construidas una vez)
+# =========================================================
+class DiffContext:
+    """
+    Un grafo bajo prueba: distance_df, adjacency, coordenadas, HeuristicRegistry y las
+    estructuras derivadas que usan algunos motores (grafo reducido, arc-flags, hub labels...).
+    `derived(key, build)` construye cada una la primera vez y apunta su preproceso en
+    preprocess_ms[key].
+    """
+
+    def __init__(self, distance_df: pd.DataFrame, coords: Coords, fcc_min: float = min(FCC_LEVELS)):
+        self.distance_df = distance_df
+        self.coords = coords
+        self.adj: Adjacency = build_adjacency(distance_df)
+        for n in coords:
+            self.adj.setdefault(n, [])
+        self.registry = HeuristicRegistry(distance_df, coords, fcc_min=fcc_min)
+        self.n_nodes = len(self.adj)
+        self.preprocess_ms: Dict[str, float] = {}
+        self._derived: Dict[str, object] = {}
+
+    def derived(self, key: str, build: Callable[[], object]) -> object:
+        if key not in self._derived:
+            t0 = time.perf_counter()
+            self._derived[key] = build()
+            self.preprocess_ms[key] = (time.perf_counter() - t0) * 1000.0
+        return self._derived[key]
+
+    def close(self) -> None:
+        for obj in self._derived.values():
+            if hasattr(obj, "close"):
+                obj.close()
+        self._derived.clear()
+
+
+# =========================================================
+# Registro de motores bajo prueba
+# =========================================================
+# motor(ctx, start, goal, h) -> (coste o None, camino o None, cota de suboptimalidad)
+EngineFn = Callable[[DiffContext, str, str, Optional[Callable[[str], float]]], Tuple[Optional[float], Optional[List[str]], float]]
+
+
+@dataclass(frozen=True)
+class EngineSpec:
+    name: str
+    fn: EngineFn
+    needs_heuristic: bool = False
+    returns_path: bool = True
+    max_nodes: Optional[int] = None          # grafos más grandes se saltan (motores exponenciales)
+    path_budget: Optional[int] = None        # memoria acotada: solo caminos de < path_budget nodos son exactos
+
+
+_ENGINES: Dict[str, EngineSpec] = {}
+
+
+def register_engine(
+    name: str,
+    needs_heuristic: bool = False,
+    returns_path: bool = True,
+    max_nodes: Optional[int] = None,
+    path_budget: Optional[int] = None,
+) -> Callable[[EngineFn], EngineFn]:
+    """
+    Decorador: añade un motor al arnés. Devuelve coste == None si no hay camino y una cota
+    > 1.0 si el motor es acotado (coste <= cota · óptimo) en vez de exacto.
+    Con path_budget (memoria acotada) la paridad exacta con la referencia solo se exige si el
+    camino óptimo tiene menos de path_budget nodos; si no, basta un camino válido no mejor
+    que el óptimo (o ninguno).
+    """
+    def deco(fn: EngineFn) -> EngineFn:
+        _ENGINES[name] = EngineSpec(name, fn, needs_heuristic, returns_path, max_nodes, path_budget)
+        return fn
+    return deco
+
+
+def engine_names() -> List[str]:
+    return list(_ENGINES)
+
+
+def _res(r, bound: float = 1.0) -> Tuple[Optional[float], Optional[List[str]], float]:
+    return (r.total_cost if r.found else None), (r.path if r.found else None), bound
+
+
+@register_engine("astar", needs_heuristic=True)
+def _astar(ctx, s, g, h):
+    return _res(a_star(s, g, None, h, adj=ctx.adj))
+
+
+@register_engine("astar_fast", needs_heuristic=True)
+def _astar_fast(ctx, s, g, h):
+    return _res(a_star_fast(s, g, None, h, adj=ctx.adj))
+
+
+@register_engine("wastar", needs_heuristic=True)
+def _wastar(ctx, s, g, h):
+    return _res(weighted_a_star(s, g, None, h, weight=1.5, adj=ctx.adj), bound=1.5)
+
+
+@register_engine("arastar", needs_heuristic=True)
+def _arastar(ctx, s, g, h):
+    r = ara_star(s, g, None, h, adj=ctx.adj)
+    return _res(r, bound=max(1.0, float(r.stats.get("suboptimality_bound", 1.0))))
+
+
+@register_engine("idastar", needs_heuristic=True, max_nodes=60)
+def _idastar(ctx, s, g, h):
+    return _res(ida_star(s, g, None, h, adj=ctx.adj))
+
+
+@register_engine("smastar", needs_heuristic=True, max_nodes=1000)
+def _smastar(ctx, s, g, h):
+    return _res(sma_star(s, g, None, h, max_nodes=10_000, adj=ctx.adj))
+
+
+def _smastar_budget(budget: int) -> EngineFn:
+    def fn(ctx, s, g, h):
+        return _res(sma_star(s, g, None, h, max_nodes=budget, adj=ctx.adj))
+    return fn
+
+
+# con presupuestos pequeños SMA* recicla memoria sin parar en grafos grandes: hasta 200 nodos
+for _m in SMA_BUDGETS:
+    register_engine(f"smastar_m{_m}", needs_heuristic=True, max_nodes=200, path_budget=_m)(_smastar_budget(_m))
+
+
+@register_engine("astar_multi", needs_heuristic=True)
+def _astar_multi(ctx, s, g, h):
+    return _res(a_star_multi([s], [g], None, h, adj=ctx.adj))
+
+
+@register_engine("dijkstra")
+def _dijkstra(ctx, s, g, h):
+    return _res(dijkstra(s, g, None, adj=ctx.adj))
+
+
+@register_engine("ucs")
+def _ucs(ctx, s, g, h):
+    return _res(ucs(s, g, None, adj=ctx.adj))
+
+
+@register_engine("dijkstra_reach")
+def _dijkstra_reach(ctx, s, g, h):
+    from .reachability import ReachabilityIndex
+
+    reach = ctx.derived("reach", lambda: ReachabilityIndex(ctx.adj))
+    return _res(dijkstra(s, g, None, adj=ctx.adj, reach=reach))
+
+
+@register_engine("delta_stepping", returns_path=False)
+def _delta_stepping(ctx, s, g, h):
+    from .delta_stepping import DeltaSteppingEngine
+    from .graph import csr_from_adjacency
+
+    eng = ctx.derived("delta_stepping", lambda: DeltaSteppingEngine(csr_from_adjacency(ctx.adj)))
+    return eng.run(s).distance_to(g), None, 1.0
+
+
+@register_engine("reduced_dijkstra")
+def _reduced(ctx, s, g, h):
+    from .reduction import reduce_graph
+
+    rg = ctx.derived("reduced", lambda: reduce_graph(ctx.adj))
+    return _res(rg.search(s, g, "dijkstra"))
+
+
+@register_engine("arcflags_dijkstra")
+def _arc_flags(ctx, s, g, h):
+    from .arc_flags import build_arc_flags
+
+    af = ctx.derived("arc_flags", lambda: build_arc_flags(ctx.adj, n_regions=8))
+    return _res(dijkstra(s, g, None, adj=ctx.adj, arc_flags=af))
+
+
+@register_engine("hub_labels", returns_path=False)
+def _hub_labels(ctx, s, g, h):
+    from .hub_labels import build_hub_labels
+
+    hl = ctx.derived("hub_labels", lambda: build_hub_labels(ctx.adj))
+    d = hl.distance(s, g)
+    return (None if d == float("inf") else d), None, 1.0
+
+
+@register_engine("td_dijkstra")
+def _td_dijkstra(ctx, s, g, h):
+    from .time_dependent import TimeDependentGraph, td_dijkstra
+
+    # sin perfiles: cada arista conserva su FCC estático -> mismo coste que `real` (cost_rate
+    # solo mueve el reloj)
+    tdg = ctx.derived("td_graph", lambda: TimeDependentGraph.from_dataframe(ctx.distance_df, cost_rate=250.0))
+    return _res(td_dijkstra(tdg, s, g, 0.0))
+
+
+@register_engine("pareto_min_cost", max_nodes=300)
+def _pareto(ctx, s, g, h):
+    from .pareto import pareto_search
+
+    r = pareto_search(s, g, ctx.distance_df)
+    if not r.found:
+        return None, None, 1.0
+    best = min(r.front, key=lambda x: x.cost)         # extremo del frente en coste real
+    return best.cost, best.path, 1.0
+
+
+# =========================================================
+# Comprobaciones
+# =========================================================
+def check_path(G: nx.DiGraph, path: Optional[List[str]], start: str, goal: str, cost: float, tol: float) -> bool:
+    """El camino va de start a goal por aristas existentes y su peso suma `cost`."""
+    if not path or path[0] != start or path[-1] != goal:
+        return False
+    total = 0.0
+    for u, v in zip(path, path[1:]):
+        if not G.has_edge(u, v):
+            return False
+        total += G[u][v]["weight"]
+    return abs(total - cost) <= tol * max(1.0, abs(cost))
+
+
+def _status(
+    G: nx.DiGraph,
+    spec: EngineSpec,
+    start: str,
+    goal: str,
+    ref: Optional[float],
+    out: Tuple[Optional[float], Optional[List[str]], float],
+    tol: float,
+    ref_len: Optional[int] = None,
+) -> str:
+    cost, path, bound = out
+    if spec.path_budget is not None and ref is not None and ref_len >= spec.path_budget:
+        # el óptimo no cabe en memoria: vale no encontrar nada o un camino válido que quepa
+        if cost is None:
+            return "ok"
+        if cost < ref - tol * max(1.0, abs(ref)):
+            return "below_optimum"
+        if not check_path(G, path, start, goal, cost, tol) or len(path) > spec.path_budget:
+            return "invalid_path"
+        return "ok"
+    if (cost is None) != (ref is None):
+        return "found_mismatch"
+    if cost is None:
+        return "ok"
+    slack = tol * max(1.0, abs(ref))
+    if cost < ref - slack:
+        return "below_optimum"                # coste imposible: camino inválido o referencia rota
+    if bound <= 1.0 and cost > ref + slack:
+        return "cost_mismatch"
+    if bound > 1.0 and cost > bound * ref + slack:
+        return "bound_violation"
+    if spec.returns_path and not check_path(G, path, start, goal, cost, tol):
+        return "invalid_path"
+    return "ok"
+
+
+def check_heuristics(
+    ctx: DiffContext,
+    G: nx.DiGraph,
+    heuristics: Sequence[str],
+    goals: Sequence[str],
+    tol: float = 1e-9,
+) -> List[Dict]:
+    """
+    Admisibilidad y consistencia de cada HeuristicBundle contra las distancias exactas de
+    NetworkX (Dijkstra hacia atrás desde cada goal):
+    - admisible: h(n) <= d(n, goal) en todo nodo que alcanza goal;
+    - consistente: h(u) <= c(u,v) + h(v) en toda arista y h(goal) == 0.
+    """
+    import networkx as nx
+
+    R = G.reverse(copy=False)
+    edges = [(u, v, d["weight"]) for u, v, d in G.edges(data=True)]
+    dist_to = {g: nx.single_source_dijkstra_path_length(R, g, weight="weight") for g in goals}
+    rows: List[Dict] = []
+    for name in heuristics:
+        adm = cons = 0
+        max_adm = max_cons = 0.0
+        for g in goals:
+            h = ctx.registry.get(name, g).h
+            hv = {n: float(h(n)) for n in G.nodes}
+            for n, d in dist_to[g].items():
+                ex = hv[n] - d
+                if ex > tol * max(1.0, d):
+                    adm += 1
+                    max_adm = max(max_adm, ex)
+            for u, v, w in edges:
+                ex = hv[u] - (w + hv[v])
+                if ex > tol * max(1.0, w):
+                    cons += 1
+                    max_cons = max(max_cons, ex)
+            if abs(hv[g]) > tol:
+                cons += 1
+                max_cons = max(max_cons, abs(hv[g]))
+        rows.append({
+            "heuristic": ctx.registry.label(name),
+            "goals": len(goals),
+            "admissibility_violations": adm,
+            "max_admissibility_excess": max_adm,
+            "consistency_violations": cons,
+            "max_consistency_excess": max_cons,
+        })
+    return rows
+
+
+# =========================================================
+# Arnés
+# =========================================================
+@dataclass
+class HarnessReport:
+    """
+    checks: una fila por (grafo, motor, heurística, consulta) con status (ok / found_mismatch /
+    cost_mismatch / bound_violation / below_optimum / invalid_path / error / timeout).
+    admissibility: una fila por (grafo, heurística).
+    speed: una fila por (tamaño, motor, heurística) con la media por consulta frente a NetworkX.
+    """
+    checks: pd.DataFrame
+    admissibility: pd.DataFrame
+    speed: pd.DataFrame
+    config: Dict = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.n_failures == 0
+
+    @property
+    def n_failures(self) -> int:
+        bad_checks = int((self.checks["status"] != "ok").sum()) if len(self.checks) else 0
+        bad_h = 0
+        if len(self.admissibility):
+            bad_h = int(self.admissibility["admissibility_violations"].sum())
+            bad_h += int(self.admissibility["consistency_violations"].sum())
+        return bad_checks + bad_h
+
+    def failures(self) -> pd.DataFrame:
+        return self.checks[self.checks["status"] != "ok"]
+
+
+def _queries(nodes: List[str], n: int, rng: random.Random) -> List[Tuple[str, str]]:
+    return [(rng.choice(nodes), rng.choice(nodes)) for _ in range(n)]
+
+
+def _unreachable_queries(adj: Adjacency, n: int, rng: random.Random) -> List[Tuple[str, str]]:
+    """
+    Hasta n pares (start, goal) sin camino, con starts distintos: los pares al azar casi
+    siempre tienen camino y son los que hacen explorar todo el grafo (IDA*, SMA*).
+    """
+    import networkx as nx
+
+    if n <= 0:
+        return []
+    G = to_networkx(adj)
+    nodes = list(adj)
+    rng.shuffle(nodes)
+    out: List[Tuple[str, str]] = []
+    for s in nodes:
+        seen = nx.descendants(G, s)
+        seen.add(s)
+        if len(seen) < len(nodes):
+            out.append((s, rng.choice([v for v in adj if v not in seen])))
+            if len(out) == n:
+                break
+    return out
+
+
+class _QueryTimeout(Exception):
+    pass
+
+
+@contextmanager
+def _time_limit(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Corta la consulta con SIGALRM a los `seconds` segundos. Sin SIGALRM (Windows) o fuera del
+    hilo principal no corta: run_graph marca igualmente la consulta como timeout al terminar.
+    """
+    if not seconds or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def _raise(signum, frame):
+        raise _QueryTimeout(f"> {seconds:g} s")
+
+    old = signal.signal(signal.SIGALRM, _raise)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, old)
+
+
+def run_graph(
+    ctx: DiffContext,
+    queries: Sequence[Tuple[str, str]],
+    engines: Sequence[str],
+    heuristics: Sequence[str],
+    tol: float = 1e-9,
+    timeout: Optional[float] = DEFAULT_TIMEOUT_S,
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Todas las consultas de un grafo: referencia NetworkX + cada motor (y heurística).
+    Una consulta que pasa de `timeout` segundos queda con status "timeout".
+    """
+    import networkx as nx
+
+    G = to_networkx(ctx.adj)
+    ref: List[Tuple[Optional[float], Optional[int], float]] = []
+    for s, g in queries:
+        t0 = time.perf_counter()
+        try:
+            d, p = nx.single_source_dijkstra(G, s, target=g, weight="weight")
+        except nx.NetworkXNoPath:
+            d, p = None, None
+        ref.append((d, (len(p) if p else None), (time.perf_counter() - t0) * 1000.0))
+
+    rows: List[Dict] = []
+    for name in engines:
+        spec = _ENGINES[name]
+        if spec.max_nodes is not None and ctx.n_nodes > spec.max_nodes:
+            continue
+        labels = [ctx.registry.label(hn) for hn in heuristics] if spec.needs_heuristic else [None]
+        for hn, label in zip(heuristics if spec.needs_heuristic else [None], labels):
+            # calentamiento sin medir: construye las estructuras derivadas (ctx.derived)
+            try:
+                s0, g0 = queries[0]
+                with _time_limit(timeout):
+                    spec.fn(ctx, s0, g0, ctx.registry.get(hn, g0).h if hn is not None else None)
+            except Exception:  # noqa: BLE001  (el error se reporta en la consulta medida)
+                pass
+            for (s, g), (d_ref, ref_len, ref_ms) in zip(queries, ref):
+                h = ctx.registry.get(hn, g).h if hn is not None else None
+                t0 = time.perf_counter()
+                status = None
+                try:
+                    with _time_limit(timeout):
+                        out = spec.fn(ctx, s, g, h)
+                    err = None
+                except _QueryTimeout as e:
+                    out, err, status = (None, None, 1.0), f"timeout {e}", "timeout"
+                except Exception as e:  # noqa: BLE001  (un motor roto se reporta, no para el arnés)
+                    out, err, status = (None, None, 1.0), f"{type(e).__name__}: {e}", "error"
+                ms = (time.perf_counter() - t0) * 1000.0
+                if status is None and timeout and ms > timeout * 1000.0:
+                    status, err = "timeout", f"timeout > {timeout:g} s"
+                rows.append({
+                    "engine": name,
+                    "heuristic": label,
+                    "start": s,
+                    "goal": g,
+                    "ref_cost": d_ref,
+                    "ref_path_nodes": ref_len,
+                    "cost": out[0],
+                    "bound": out[2],
+                    "status": status or _status(G, spec, s, g, d_ref, out, tol, ref_len),
+                    "error": err,
+                    "exec_time_ms": ms,
+                    "ref_time_ms": ref_ms,
+                })
+
+    goals = list(dict.fromkeys(g for _, g in queries))
+    adm = check_heuristics(ctx, G, heuristics, goals, tol=tol)
+    return rows, adm
+
+
+def run_harness(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    graphs_per_size: int = 2,
+    queries_per_graph: int = 20,
+    seed: int = 0,
+    engines: Optional[Sequence[str]] = None,
+    heuristics: Sequence[str] = DEFAULT_HEURISTICS,
+    tol: float = 1e-9,
+    timeout: Optional[float] = DEFAULT_TIMEOUT_S,
+    unreachable_per_graph: int = 3,
+) -> HarnessReport:
+    """
+    Para cada tamaño, graphs_per_size grafos aleatorios (random_digraph) con
+    queries_per_graph pares (start, goal) al azar (puede haber start == goal) más
+    unreachable_per_graph pares sin camino garantizados (si el grafo los tiene).
+    El tiempo de preproceso de motores con índice (reducción, arc-flags, hub labels, ...) no
+    entra en exec_time_ms; va en la columna preprocess_ms de speed.
+    """
+    import pandas as pd
+
+    engines = list(engines) if engines is not None else engine_names()
+    unknown = set(engines) - set(_ENGINES)
+    if unknown:
+        raise ValueError(f"Unknown engines: {sorted(unknown)}")
+    heuristics = [HeuristicRegistry.canonical(h) for h in heuristics]
+
+    checks: List[Dict] = []
+    adm_rows: List[Dict] = []
+    prep: List[Dict] = []
+    for size in sizes:
+        for gi in range(graphs_per_size):
+            gseed = seed * 1_000_003 + size * 101 + gi
+            df, coords = random_digraph(size, seed=gseed)
+            ctx = DiffContext(df, coords)
+            try:
+                rng = random.Random(gseed)
+                qs = _queries(list(coords), queries_per_graph, rng)
+                qs += _unreachable_queries(ctx.adj, unreachable_per_graph, rng)
+                rows, adm = run_graph(ctx, qs, engines, heuristics, tol=tol, timeout=timeout)
+            finally:
+                ctx.close()
+            meta = {"size": size, "graph": gi, "seed": gseed, "edges": len(df)}
+            checks.extend({**meta, **r} for r in rows)
+            adm_rows.extend({**meta, **a} for a in adm)
+            prep.extend({"size": size, "key": k, "preprocess_ms": v} for k, v in ctx.preprocess_ms.items())
+
+    checks_df = pd.DataFrame(checks)
+    speed = summarize_speed(checks_df, pd.DataFrame(prep))
+    config = {
+        "sizes": list(sizes), "graphs_per_size": graphs_per_size, "queries_per_graph": queries_per_graph,
+        "seed": seed, "engines": engines, "heuristics": heuristics, "tol": tol,
+        "timeout": timeout, "unreachable_per_graph": unreachable_per_graph,
+    }
+    return HarnessReport(checks_df, pd.DataFrame(adm_rows), speed, config)
+
+
+# motor -> clave de su estructura derivada (preproceso)
+_PREPROCESS_KEY = {
+    "dijkstra_reach": "reach",
+    "delta_stepping": "delta_stepping",
+    "reduced_dijkstra": "reduced",
+    "arcflags_dijkstra": "arc_flags",
+    "hub_labels": "hub_labels",
+    "td_dijkstra": "td_graph",
+}
+
+
+def summarize_speed(checks: pd.DataFrame, prep: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Media por consulta de cada (tamaño, motor, heurística) frente a NetworkX sobre las mismas
+    consultas: speedup_vs_ref > 1 = más rápido que la referencia.
+    """
+    import pandas as pd
+
+    if checks.empty:
+        return pd.DataFrame()
+    keys = ["size", "engine", "heuristic"]
+    g = checks.assign(heuristic=checks["heuristic"].fillna("-")).groupby(keys, sort=False)
+    out = g.agg(
+        queries=("status", "size"),
+        failures=("status", lambda s: int((s != "ok").sum())),
+        exec_time_ms_mean=("exec_time_ms", "mean"),
+        ref_time_ms_mean=("ref_time_ms", "mean"),
+    ).reset_index()
+    out["speedup_vs_ref"] = out["ref_time_ms_mean"] / out["exec_time_ms_mean"].where(out["exec_time_ms_mean"] > 0)
+    if prep is not None and not prep.empty:
+        pm = prep.groupby(["size", "key"])["preprocess_ms"].mean()
+        out["preprocess_ms"] = [
+            pm.get((sz, _PREPROCESS_KEY[e]), np.nan) if e in _PREPROCESS_KEY else np.nan
+            for sz, e in zip(out["size"], out["engine"])
+        ]
+    return out
+
+
+def write_report(report: HarnessReport, out_dir: str) -> None:
+    os.makedirs(out_dir, exist_ok=True)
+    opts = dict(sep=";", decimal=",", index=False, encoding="utf-8-sig")
+    report.checks.to_csv(os.path.join(out_dir, "diff_checks.csv"), **opts)
+    report.admissibility.to_csv(os.path.join(out_dir, "diff_admissibility.csv"), **opts)
+    report.speed.to_csv(os.path.join(out_dir, "diff_speed.csv"), **opts)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Corrección diferencial y velocidad de los motores frente a NetworkX.")
+    ap.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    ap.add_argument("--graphs", type=int, default=2, help="grafos aleatorios por tamaño")
+    ap.add_argument("--queries", type=int, default=20, help="consultas por grafo")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--engines", nargs="+", default=None, choices=engine_names())
+    ap.add_argument("--heuristics", nargs="+", default=list(DEFAULT_HEURISTICS))
+    ap.add_argument("--tol", type=float, default=1e-9, help="tolerancia relativa de costes")
+    ap.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_S, help="segundos por consulta (0 = sin límite)")
+    ap.add_argument("--unreachable", type=int, default=3, help="pares sin camino añadidos por grafo")
+    ap.add_argument("--out", default=None, help="carpeta para diff_checks / diff_admissibility / diff_speed (CSV)")
+    args = ap.parse_args(argv)
+
+    report = run_harness(
+        args.sizes, args.graphs, args.queries, args.seed, args.engines, args.heuristics, args.tol,
+        timeout=args.timeout or None, unreachable_per_graph=args.unreachable,
+    )
+    if args.out:
+        write_report(report, args.out)
+
+    cols = ["size", "engine", "heuristic", "queries", "failures", "exec_time_ms_mean", "speedup_vs_ref"]
+    print(report.speed[cols].to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    print()
+    print(report.admissibility.groupby("heuristic")[["admissibility_violations", "consistency_violations"]].sum())
+    if not report.ok:
+        print()
+        print(report.failures().head(20).to_string(index=False))
+    print(f"\n{len(report.checks)} comprobaciones, {report.n_failures} fallos")
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
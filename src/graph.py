@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Tuple
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# =========================================================
+# Grafo compacto (CSR) sobre arrays NumPy
+# =========================================================
+@dataclass(frozen=True)
+class CSRGraph:
+    """
+    Grafo dirigido en formato CSR:
+    - nodes[i]: nombre del nodo i (orden determinista)
+    - index: nombre -> i
+    - aristas salientes de i: indices[indptr[i]:indptr[i+1]] con pesos weights[...]
+    """
+    nodes: List[str]
+    index: Dict[str, int]
+    indptr: np.ndarray
+    indices: np.ndarray
+    weights: np.ndarray
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def n_edges(self) -> int:
+        return int(self.indices.shape[0])
+
+    def edge_sources(self) -> np.ndarray:
+        """Nodo origen de cada arista (mismo orden que indices/weights)."""
+        return np.repeat(np.arange(self.n_nodes, dtype=np.int64), np.diff(self.indptr))
+
+    def reversed(self) -> "CSRGraph":
+        """Grafo traspuesto (u->v pasa a v->u), útil para búsquedas hacia atrás."""
+        return _from_arrays(self.nodes, self.indices.astype(np.int64), self.edge_sources(), self.weights)
+
+    def to_adjacency(self) -> Dict[str, List[Tuple[str, float]]]:
+        """Convierte a la adjacency list de `algorithms.build_adjacency`."""
+        adj: Dict[str, List[Tuple[str, float]]] = {n: [] for n in self.nodes}
+        for i, n in enumerate(self.nodes):
+            lo, hi = int(self.indptr[i]), int(self.indptr[i + 1])
+            adj[n] = [(self.nodes[int(j)], float(w)) for j, w in zip(self.indices[lo:hi], self.weights[lo:hi])]
+        return adj
+
+
+def _from_arrays(nodes: List[str], src: np.ndarray, dst: np.ndarray, w: np.ndarray) -> CSRGraph:
+    n = len(nodes)
+    order = np.argsort(src, kind="stable")
+    src, dst, w = src[order], dst[order], w[order]
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return CSRGraph(
+        nodes=list(nodes),
+        index={name: i for i, name in enumerate(nodes)},
+        indptr=indptr,
+        indices=dst.astype(np.int64),
+        weights=np.asarray(w, dtype=np.float64),
+    )
+
+
+def build_csr(distance_df: pd.DataFrame, weight_col: str = "real") -> CSRGraph:
+    """CSR con coste real (dist_km * FCC) a partir del DataFrame de aristas."""
+    u = distance_df["start_node"].astype(str).to_numpy()
+    v = distance_df["end_node"].astype(str).to_numpy()
+    nodes = sorted(set(u).union(set(v)))
+    index = {name: i for i, name in enumerate(nodes)}
+    src = np.fromiter((index[x] for x in u), dtype=np.int64, count=len(u))
+    dst = np.fromiter((index[x] for x in v), dtype=np.int64, count=len(v))
+    w = distance_df[weight_col].to_numpy(dtype=np.float64)
+    if np.any(w < 0):
+        raise ValueError("Negative edge cost is not allowed.")
+    return _from_arrays(nodes, src, dst, w)
+
+
+def read_edges_csv(path: str, delimiter: str = ";") -> Dict[str, List[Tuple[str, float]]]:
+    """
+    Adjacency con coste real (dist_km * FCC) leída con el módulo csv, sin pandas.
+    Mismas aristas y en el mismo orden que build_adjacency(pd.read_csv(...)): pensado para
+    consultas sueltas, donde importar pandas cuesta más que la propia búsqueda.
+    """
+    adj: Dict[str, List[Tuple[str, float]]] = {}
+    with open(path, "r", encoding="utf-8-sig", newline="") as fh:
+        for r in csv.DictReader(fh, delimiter=delimiter):
+            u, v = r["start_node"].strip(), r["end_node"].strip()
+            w = float(r["dist_km"]) * float(r["FCC"])
+            if w < 0:
+                raise ValueError("Negative edge cost is not allowed.")
+            adj.setdefault(u, []).append((v, w))
+            adj.setdefault(v, [])
+    return adj
+
+
+def csr_from_adjacency(adj: Dict[str, List[Tuple[str, float]]]) -> CSRGraph:
+    """CSR a partir de la adjacency list de `algorithms.build_adjacency`."""
+    nodes = sorted(set(adj).union(v for lst in adj.values() for v, _ in lst))
+    index = {name: i for i, name in enumerate(nodes)}
+    src: List[int] = []
+    dst: List[int] = []
+    w: List[float] = []
+    for u, lst in adj.items():
+        for v, c in lst:
+            src.append(index[u])
+            dst.append(index[v])
+            w.append(float(c))
+    return _from_arrays(
+        nodes,
+        np.asarray(src, dtype=np.int64),
+        np.asarray(dst, dtype=np.int64),
+        np.asarray(w, dtype=np.float64),
+    )
+
+
+def gather_edges(indptr: np.ndarray, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Expande vectorizadamente las aristas salientes de `frontier`.
+    Devuelve (src_por_arista, edge_ids) sin bucles Python.
+    """
+    starts = indptr[frontier]
+    counts = indptr[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    src = np.repeat(frontier, counts)
+    offsets = np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+    return src, np.repeat(starts, counts) + offsets
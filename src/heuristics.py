@@ -1,9 +1,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable, Dict, List, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
 import numpy as np
-import pandas as pd
+
+from .spatial import CoordStore
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .region_scaling import RegionScaling
 
 Coords = Dict[str, Tuple[float, float]]
 
@@ -33,37 +40,27 @@ def chebyshev(a: str, b: str, coords: Coords) -> float:
     return float(max(abs(bx - ax), abs(by - ay)))
 
 
-def compute_scaling_k(distance_df: pd.DataFrame, coords: Coords, metric: str) -> float:
+def compute_scaling_k(distance_df: pd.DataFrame, coords: Coords | CoordStore, metric: str) -> float:
     """
     k = min_{(u,v) in E} cost(u,v) / d_metric(u,v)
     Usando cost(u,v)=real (dist_km*FCC). Garantiza h(n)=k*d_metric(n,goal) admisible.
 
     metric in {"manhattan","chebyshev","euclidean"}
+    Vectorizado sobre todas las aristas con un CoordStore.
     """
     metric = metric.lower().strip()
     if metric not in {"manhattan", "chebyshev", "euclidean"}:
         raise ValueError(f"metric must be one of manhattan/chebyshev/euclidean, got {metric}")
 
-    ratios = []
-    for _, row in distance_df.iterrows():
-        u = row["start_node"]
-        v = row["end_node"]
-        cost = float(row["real"])
+    store = coords if isinstance(coords, CoordStore) else CoordStore(coords)
+    d = store.edge_lengths(distance_df["start_node"], distance_df["end_node"], metric)
+    cost = distance_df["real"].to_numpy(dtype=np.float64)
 
-        if metric == "manhattan":
-            d = manhattan(u, v, coords)
-        elif metric == "chebyshev":
-            d = chebyshev(u, v, coords)
-        else:
-            d = euclidean(u, v, coords)
-
-        if d > 0:
-            ratios.append(cost / d)
-
-    if not ratios:
+    pos = d > 0
+    if not pos.any():
         return 0.0
 
-    k = float(min(ratios))
+    k = float((cost[pos] / d[pos]).min())
     return max(0.0, k)
 
 
@@ -74,6 +71,242 @@ class HeuristicBundle:
     h: Callable[[str], float]
 
 
+# =========================================================
+# Registro / fábrica perezosa de heurísticas
+# =========================================================
+HeuristicFactory = Callable[["HeuristicRegistry", str], Callable[[str], float]]
+# Para heurísticas de la forma h = k * d_metric(n, goal): registry -> (metric, k)
+MetricScale = Callable[["HeuristicRegistry"], Tuple[str, float]]
+
+# name -> (label del bundle, fábrica(registry, goal) -> h, metric_scale opcional)
+_FACTORIES: Dict[str, Tuple[str, HeuristicFactory, Optional[MetricScale]]] = {}
+
+
+def register_heuristic(
+    name: str,
+    label: Optional[str] = None,
+    metric_scale: Optional[MetricScale] = None,
+) -> Callable[[HeuristicFactory], HeuristicFactory]:
+    """
+    Decorador: registra una fábrica de heurística bajo `name` (label = nombre del bundle).
+    `metric_scale` (opcional) permite evaluarla vectorizada sobre arrays de coordenadas.
+    """
+    def deco(fn: HeuristicFactory) -> HeuristicFactory:
+        _FACTORIES[name] = (label or name, fn, metric_scale)
+        return fn
+    return deco
+
+
+class HeuristicRegistry:
+    """
+    Construye HeuristicBundle bajo demanda para (name, goal):
+    - Constantes a nivel de grafo (k de escalado por métrica) se calculan una sola vez
+      y se comparten entre todos los goals.
+    - Cada bundle se construye la primera vez que se pide y queda cacheado.
+    - Acepta tanto el nombre ("euclidean") como el label del bundle ("euclidean_x_fccmin").
+    - `spatial`: CoordStore (arrays NumPy + rejilla) construido una vez; alimenta las tablas
+      vectorizadas (constantes k, table, min_over_goals).
+    """
+
+    def __init__(
+        self,
+        distance_df: pd.DataFrame,
+        coords: Coords,
+        fcc_min: float = 2.0,
+        region_grid: Tuple[int, int] = (4, 4),
+    ):
+        self.distance_df = distance_df
+        self.coords = coords
+        self.fcc_min = fcc_min
+        self.region_grid = (int(region_grid[0]), int(region_grid[1]))
+        self._region: Optional["RegionScaling"] = None
+        self._constants: Dict[str, float] = {}
+        self._bundles: Dict[Tuple[str, str], HeuristicBundle] = {}
+        self._spatial: Optional[CoordStore] = None
+
+    @property
+    def spatial(self) -> CoordStore:
+        if self._spatial is None:
+            self._spatial = CoordStore(self.coords)
+        return self._spatial
+
+    @staticmethod
+    def names() -> List[str]:
+        return list(_FACTORIES)
+
+    @staticmethod
+    def canonical(name_or_label: str) -> str:
+        key = name_or_label.lower().strip()
+        if key in _FACTORIES:
+            return key
+        for name, (label, _, _) in _FACTORIES.items():
+            if label == key:
+                return name
+        raise ValueError(f"Unknown heuristic name: {name_or_label}")
+
+    @staticmethod
+    def spec(name: str) -> Tuple[str, HeuristicFactory, Optional[MetricScale]]:
+        """(label, fábrica, metric_scale) registrados para `name`."""
+        return _FACTORIES[HeuristicRegistry.canonical(name)]
+
+    @staticmethod
+    def label(name: str) -> str:
+        return _FACTORIES[HeuristicRegistry.canonical(name)][0]
+
+    def constant(self, key: str, compute: Callable[[], float]) -> float:
+        """Constante del grafo (independiente del goal), calculada una vez."""
+        if key not in self._constants:
+            self._constants[key] = float(compute())
+        return self._constants[key]
+
+    def scaling_k(self, metric: str) -> float:
+        metric = metric.lower().strip()
+        return self.constant(f"k_{metric}", lambda: compute_scaling_k(self.distance_df, self.spatial, metric=metric))
+
+    def region_scaling(self) -> "RegionScaling":
+        """Tabla K por par de regiones (src/region_scaling.py), construida una vez por grafo."""
+        if self._region is None:
+            from .region_scaling import build_region_scaling
+            self._region = build_region_scaling(self.distance_df, self.spatial, grid=self.region_grid)
+        return self._region
+
+    def get(self, name: str, goal: str) -> HeuristicBundle:
+        name = self.canonical(name)
+        key = (name, goal)
+        bundle = self._bundles.get(key)
+        if bundle is None:
+            label, factory, _ = _FACTORIES[name]
+            bundle = HeuristicBundle(label, factory(self, goal))
+            self._bundles[key] = bundle
+        return bundle
+
+    def metric_scale(self, name: str) -> Optional[Tuple[str, float]]:
+        """(metric, k) si la heurística es k * d_metric, None si no."""
+        spec = _FACTORIES[self.canonical(name)][2]
+        return spec(self) if spec is not None else None
+
+    def table(self, name: str, goals: List[str]) -> np.ndarray:
+        """
+        h(n) = min_{g in goals} h_g(n) para cada fila de `spatial` (mismo orden que spatial.names).
+        Vectorizada si la heurística es de tipo k * d_metric; si no, evalúa cada bundle.
+        """
+        name = self.canonical(name)
+        ms = self.metric_scale(name)
+        if ms is not None:
+            metric, k = ms
+            return k * self.spatial.distances_to(goals, metric)
+        bundles = [self.get(name, g) for g in goals]
+        nodes = self.spatial.names
+        return np.array([[b.h(n) for b in bundles] for n in nodes], dtype=np.float64).reshape(len(nodes), -1).min(axis=1)
+
+    def min_over_goals(self, name: str, goals: List[str]) -> HeuristicBundle:
+        """
+        h(n) = min_{g in goals} h_g(n), tabulada para todos los nodos con coordenadas.
+        Admisible para búsquedas multi-destino (a_star_multi).
+        """
+        table = dict(zip(self.spatial.names, self.table(name, goals).tolist()))
+
+        def h(n: str) -> float:
+            return table.get(n, 0.0)
+        return HeuristicBundle(f"{self.label(name)}_min{len(goals)}", h)
+
+    def derive(
+        self,
+        distance_df: pd.DataFrame,
+        changes: Sequence[Tuple[str, str, Optional[float], Optional[float]]],
+    ) -> "HeuristicRegistry":
+        """
+        Registry para una versión nueva del grafo (mismas coordenadas), reutilizando lo que sigue
+        valiendo. changes: (u, v, coste antes o None, coste después o None) de cada arista tocada.
+        - k_metric = min c/d: si una arista aparece o se abarata, k' = min(k, c'/d) sin recorrer
+          el grafo; si sube o desaparece una arista que fijaba k (c/d == k), se recalcula al pedirlo.
+        - Los bundles k·d_metric cuyo k no cambia (y los de fcc_min) se conservan.
+        - Si ninguna arista aparece ni se abarata, las distancias solo pueden crecer: la tabla por
+          regiones sigue siendo admisible y consistente y se conserva. Si no, se reconstruye al pedirla.
+        """
+        reg = HeuristicRegistry(distance_df, self.coords, fcc_min=self.fcc_min, region_grid=self.region_grid)
+        reg._spatial = self._spatial
+        if not changes:
+            reg._constants = dict(self._constants)
+            reg._bundles = dict(self._bundles)
+            reg._region = self._region
+            return reg
+
+        us = [c[0] for c in changes]
+        vs = [c[1] for c in changes]
+        before = np.array([np.nan if c[2] is None else c[2] for c in changes], dtype=np.float64)
+        after = np.array([np.nan if c[3] is None else c[3] for c in changes], dtype=np.float64)
+        for key, k in self._constants.items():
+            if not key.startswith("k_"):
+                continue
+            d = self.spatial.edge_lengths(us, vs, key[2:])
+            pos = d > 0
+            with np.errstate(invalid="ignore", divide="ignore"):
+                r_before = np.where(pos, before / d, np.nan)
+                r_after = np.where(pos, after / d, np.nan)
+            tight = r_before <= k * (1.0 + 1e-12)
+            worse = np.isnan(after) | (after > before)
+            if (tight & worse).any():
+                continue                                  # k puede subir: recálculo perezoso
+            lower = r_after[np.isfinite(r_after)]
+            reg._constants[key] = max(0.0, min(k, float(lower.min()))) if lower.size else k
+
+        only_worse = not np.isnan(before).any() and not (after < before).any()
+        if only_worse:
+            reg._region = self._region
+
+        for (name, goal), bundle in self._bundles.items():
+            ms = _FACTORIES[name][2]
+            if ms is None:
+                if name == "region_scaled" and only_worse:
+                    reg._bundles[(name, goal)] = bundle
+                continue
+            key = f"k_{ms(self)[0]}"
+            if name == "euclidean" or self._constants.get(key) == reg._constants.get(key, -1.0):
+                reg._bundles[(name, goal)] = bundle
+        return reg
+
+    def clear(self) -> None:
+        """Olvida constantes, bundles y el índice espacial (p.ej. si cambia el grafo)."""
+        self._constants.clear()
+        self._bundles.clear()
+        self._spatial = None
+        self._region = None
+
+
+@register_heuristic("euclidean", label="euclidean_x_fccmin", metric_scale=lambda reg: ("euclidean", reg.fcc_min))
+def _euclidean_factory(reg: HeuristicRegistry, goal: str) -> Callable[[str], float]:
+    fcc_min, coords = reg.fcc_min, reg.coords
+
+    def h(n: str) -> float:
+        return float(fcc_min * euclidean(n, goal, coords))
+    return h
+
+
+@register_heuristic("manhattan_scaled", metric_scale=lambda reg: ("manhattan", reg.scaling_k("manhattan")))
+def _manhattan_factory(reg: HeuristicRegistry, goal: str) -> Callable[[str], float]:
+    kM, coords = reg.scaling_k("manhattan"), reg.coords
+
+    def h(n: str) -> float:
+        return float(kM * manhattan(n, goal, coords))
+    return h
+
+
+@register_heuristic("chebyshev_scaled", metric_scale=lambda reg: ("chebyshev", reg.scaling_k("chebyshev")))
+def _chebyshev_factory(reg: HeuristicRegistry, goal: str) -> Callable[[str], float]:
+    kC, coords = reg.scaling_k("chebyshev"), reg.coords
+
+    def h(n: str) -> float:
+        return float(kC * chebyshev(n, goal, coords))
+    return h
+
+
+@register_heuristic("region_scaled")
+def _region_factory(reg: HeuristicRegistry, goal: str) -> Callable[[str], float]:
+    # K[región(n), región(goal)] * euclidean(n, goal): un k por par de regiones en vez de uno global
+    return reg.region_scaling().h(goal)
+
+
 def make_heuristic(
     name: str,
     distance_df: pd.DataFrame,
@@ -82,31 +315,13 @@ def make_heuristic(
     fcc_min: float = 2.0,
 ) -> HeuristicBundle:
     """
-    name in {"euclidean", "manhattan_scaled", "chebyshev_scaled"}
+    name in {"euclidean", "manhattan_scaled", "chebyshev_scaled", "region_scaled"}
 
     - euclidean: h = fcc_min * euclidean_distance
     - manhattan_scaled: h = kM * manhattan_distance (kM calculado desde el grafo con coste real)
     - chebyshev_scaled: h = kC * chebyshev_distance (kC calculado desde el grafo con coste real)
-    """
-    name = name.lower().strip()
-
-    if name == "euclidean":
-        def h(n: str) -> float:
-            return float(fcc_min * euclidean(n, goal, coords))
-        return HeuristicBundle("euclidean_x_fccmin", h)
+    - region_scaled: h = K[región(n), región(goal)] * euclidean_distance (ver region_scaling.py)
 
-    if name == "manhattan_scaled":
-        kM = compute_scaling_k(distance_df, coords, metric="manhattan")
-
-        def h(n: str) -> float:
-            return float(kM * manhattan(n, goal, coords))
-        return HeuristicBundle("manhattan_scaled", h)
-
-    if name == "chebyshev_scaled":
-        kC = compute_scaling_k(distance_df, coords, metric="chebyshev")
-
-        def h(n: str) -> float:
-            return float(kC * chebyshev(n, goal, coords))
-        return HeuristicBundle("chebyshev_scaled", h)
-
-    raise ValueError(f"Unknown heuristic name: {name}")
+    Para muchos goals sobre el mismo grafo usar HeuristicRegistry (comparte las constantes).
+    """
+    return HeuristicRegistry(distance_df, coords, fcc_min=fcc_min).get(name, goal)
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+CELL_COLUMNS = ["phase", "case", "label", "found", "expanded_nodes", "total_cost", "times_ms"]
+
+
+# =========================================================
+# Metadatos del entorno
+# =========================================================
+def _git(args: List[str], cwd: str) -> Optional[str]:
+    try:
+        out = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() if out.returncode == 0 else None
+
+
+def environment_metadata(repo_dir: Optional[str] = None) -> Dict:
+    """Python, CPU, versiones de librerías y commit (con marca de árbol sucio)."""
+    repo_dir = repo_dir or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    status = _git(["status", "--porcelain", "--untracked-files=no"], repo_dir)
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "commit": _git(["rev-parse", "HEAD"], repo_dir),
+        "dirty": bool(status) if status is not None else None,
+    }
+
+
+# =========================================================
+# Estadística: Mann-Whitney U (aprox. normal, con corrección de empates)
+# =========================================================
+def mann_whitney_p(a: np.ndarray, b: np.ndarray) -> float:
+    """p-valor bilateral de Mann-Whitney U. Sin scipy: aproximación normal."""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    n1, n2 = a.size, b.size
+    if n1 == 0 or n2 == 0:
+        return float("nan")
+    ranks = pd.Series(np.concatenate([a, b])).rank(method="average").to_numpy()
+    u1 = ranks[:n1].sum() - n1 * (n1 + 1) / 2.0
+    mu = n1 * n2 / 2.0
+    n = n1 + n2
+    _, counts = np.unique(np.concatenate([a, b]), return_counts=True)
+    tie = float((counts ** 3 - counts).sum())
+    sigma2 = n1 * n2 / 12.0 * ((n + 1) - tie / (n * (n - 1))) if n > 1 else 0.0
+    if sigma2 <= 0:
+        return 1.0
+    z = (abs(u1 - mu) - 0.5) / math.sqrt(sigma2)
+    return float(math.erfc(max(z, 0.0) / math.sqrt(2.0)))
+
+
+# =========================================================
+# Historial de runs
+# =========================================================
+class RunHistory:
+    """
+    <root>/<run_id>/meta.json   -> metadatos del entorno
+    <root>/<run_id>/cells.json  -> por celda: phase, case, label, found, expanded_nodes,
+                                   total_cost, times_ms (distribución completa) y cached
+                                   (True si los tiempos vienen de la caché de celdas)
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def runs(self) -> List[str]:
+        """Runs ordenados cronológicamente (por timestamp del meta)."""
+        out = []
+        for r in os.listdir(self.root):
+            meta = os.path.join(self.root, r, "meta.json")
+            if os.path.isfile(meta):
+                with open(meta, "r", encoding="utf-8") as fh:
+                    out.append((json.load(fh).get("timestamp", ""), r))
+        return [r for _, r in sorted(out)]
+
+    def record(self, run_id: str, cells: pd.DataFrame, meta: Optional[Dict] = None) -> str:
+        """Guarda las celdas de un run (DataFrame con al menos CELL_COLUMNS)."""
+        missing = set(CELL_COLUMNS) - set(cells.columns)
+        if missing:
+            raise ValueError(f"cells must contain {CELL_COLUMNS}. Missing: {sorted(missing)}")
+        d = os.path.join(self.root, run_id)
+        os.makedirs(d, exist_ok=True)
+        cells = cells.assign(cached=cells["cached"].astype(bool) if "cached" in cells else False)
+        records = json.loads(cells[CELL_COLUMNS + ["cached"]].to_json(orient="records"))
+        with open(os.path.join(d, "cells.json"), "w", encoding="utf-8") as fh:
+            json.dump(records, fh)
+        # meta al final: un run sin meta.json no aparece en runs()
+        with open(os.path.join(d, "meta.json"), "w", encoding="utf-8") as fh:
+            json.dump({"run_id": run_id, **(meta or environment_metadata())}, fh, indent=2)
+        return d
+
+    def load(self, run_id: str) -> pd.DataFrame:
+        with open(os.path.join(self.root, run_id, "cells.json"), "r", encoding="utf-8") as fh:
+            df = pd.DataFrame(json.load(fh))
+        df["cached"] = df["cached"].fillna(False).astype(bool) if "cached" in df else False
+        df["run_id"] = run_id
+        return df
+
+    def meta(self, run_id: str) -> Dict:
+        with open(os.path.join(self.root, run_id, "meta.json"), "r", encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def resolve(self, ref: str, current: Optional[str] = None) -> str:
+        """'latest' / 'previous' (anterior a current o al último) / id explícito."""
+        runs = self.runs()
+        if not runs:
+            raise ValueError("Run history is empty.")
+        if ref == "latest":
+            return runs[-1]
+        if ref == "previous":
+            anchor = current or runs[-1]
+            idx = runs.index(anchor) if anchor in runs else len(runs)
+            if idx < 1:
+                raise ValueError(f"No run before {anchor}.")
+            return runs[idx - 1]
+        if ref not in runs:
+            raise ValueError(f"Unknown run: {ref}")
+        return ref
+
+    def trends(self) -> pd.DataFrame:
+        """Una fila por (run, celda medida) con mediana de tiempo: entrada de plots.plot_trends."""
+        frames = []
+        for i, r in enumerate(self.runs()):
+            df = self.load(r)
+            df = df[~df["cached"]].copy()
+            df["run_index"] = i
+            df["time_ms_median"] = df["times_ms"].apply(lambda t: float(np.median(_times(t))) if len(_times(t)) else np.nan)
+            frames.append(df.drop(columns=["times_ms"]))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+# =========================================================
+# Comparación contra baseline
+# =========================================================
+def _times(x) -> np.ndarray:
+    return np.asarray(x if isinstance(x, (list, tuple, np.ndarray)) else [], dtype=np.float64)
+
+
+def compare_runs(
+    baseline: pd.DataFrame,
+    current: pd.DataFrame,
+    rel_threshold: float = 0.10,
+    alpha: float = 0.01,
+) -> pd.DataFrame:
+    """
+    Por celda (phase, case, label):
+    - rel_change = mediana_actual / mediana_baseline - 1
+    - p_value: Mann-Whitney U entre las dos distribuciones
+    - status: "regression" si rel_change > rel_threshold y p < alpha, o si aumentan
+      expanded_nodes; "improvement" en el caso simétrico; "unchanged"; "new"/"missing";
+      "cached" si alguno de los dos lados reutilizó tiempos de la caché (no se comparan).
+    """
+    key = ["phase", "case", "label"]
+    baseline, current = (d if "cached" in d else d.assign(cached=False) for d in (baseline, current))
+    m = baseline.merge(current, on=key, how="outer", suffixes=("_base", "_cur"), indicator=True)
+
+    rows = []
+    for _, r in m.iterrows():
+        row = {k: r[k] for k in key}
+        if r["_merge"] == "left_only":
+            row["status"] = "missing"
+            rows.append(row)
+            continue
+        if r["_merge"] == "right_only":
+            row["status"] = "new"
+            rows.append(row)
+            continue
+        if r["cached_base"] or r["cached_cur"]:
+            row["status"] = "cached"
+            rows.append(row)
+            continue
+
+        tb = _times(r["times_ms_base"])
+        tc = _times(r["times_ms_cur"])
+        med_b = float(np.median(tb)) if tb.size else float("nan")
+        med_c = float(np.median(tc)) if tc.size else float("nan")
+        rel = (med_c / med_b - 1.0) if med_b > 0 else float("nan")
+        p = mann_whitney_p(tb, tc)
+        exp_b, exp_c = r["expanded_nodes_base"], r["expanded_nodes_cur"]
+
+        status = "unchanged"
+        if pd.notna(exp_b) and pd.notna(exp_c) and exp_c > exp_b:
+            status = "regression"
+        elif pd.notna(rel) and p < alpha and rel > rel_threshold:
+            status = "regression"
+        elif pd.notna(rel) and p < alpha and rel < -rel_threshold:
+            status = "improvement"
+
+        row.update({
+            "median_ms_base": med_b,
+            "median_ms_cur": med_c,
+            "rel_change": rel,
+            "p_value": p,
+            "expanded_base": exp_b,
+            "expanded_cur": exp_c,
+            "cost_base": r["total_cost_base"],
+            "cost_cur": r["total_cost_cur"],
+            "status": status,
+        })
+        rows.append(row)
+
+    return pd.DataFrame(rows).sort_values(key).reset_index(drop=True)
+
+
+def write_report(
+    report: pd.DataFrame,
+    out_dir: str,
+    baseline_id: str,
+    run_id: str,
+    meta_base: Optional[Dict] = None,
+    meta_cur: Optional[Dict] = None,
+) -> str:
+    """regression_report.csv + regression_report.md; devuelve la ruta del .md."""
+    os.makedirs(out_dir, exist_ok=True)
+    report.to_csv(os.path.join(out_dir, "regression_report.csv"), sep=";", decimal=",", index=False, encoding="utf-8-sig")
+
+    counts = report["status"].value_counts().to_dict()
+    lines = [
+        f"# Informe de regresiones: {run_id} vs {baseline_id}",
+        "",
+        "| | baseline | actual |",
+        "|---|---|---|",
+    ]
+    for k in ["commit", "python", "processor", "cpu_count"]:
+        lines.append(f"| {k} | {(meta_base or {}).get(k)} | {(meta_cur or {}).get(k)} |")
+    lines += ["", "Resumen: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())), ""]
+
+    flagged = report[report["status"].isin(["regression", "improvement"])]
+    if not flagged.empty:
+        lines += ["| phase | case | label | status | mediana base (ms) | mediana actual (ms) | cambio | p |",
+                  "|---|---|---|---|---|---|---|---|"]
+        for _, r in flagged.iterrows():
+            lines.append(
+                f"| {r['phase']} | {r['case']} | {r['label']} | {r['status']} | "
+                f"{r['median_ms_base']:.4f} | {r['median_ms_cur']:.4f} | {r['rel_change']:+.1%} | {r['p_value']:.3g} |"
+            )
+    out = os.path.join(out_dir, "regression_report.md")
+    with open(out, "w", encoding="utf-8") as fh:
+        fh.write("\n".join(lines) + "\n")
+    return out
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Compara un run de benchmark con un baseline.")
+    ap.add_argument("--root", default=os.path.join("results", "history"))
+    ap.add_argument("--baseline", default="previous", help="id, 'previous' o 'latest'")
+    ap.add_argument("--run", default="latest", help="id o 'latest'")
+    ap.add_argument("--threshold", type=float, default=0.10, help="cambio relativo de la mediana")
+    ap.add_argument("--alpha", type=float, default=0.01, help="nivel de significación")
+    ap.add_argument("--out", default=None, help="carpeta del informe (por defecto, la del run)")
+    ap.add_argument("--fail-on-regression", action="store_true", help="exit code 1 si hay regresiones")
+    args = ap.parse_args(argv)
+
+    hist = RunHistory(args.root)
+    run_id = hist.resolve(args.run)
+    base_id = hist.resolve(args.baseline, current=run_id)
+    report = compare_runs(hist.load(base_id), hist.load(run_id), args.threshold, args.alpha)
+    md = write_report(report, args.out or os.path.join(args.root, run_id), base_id, run_id,
+                      hist.meta(base_id), hist.meta(run_id))
+    n_reg = int((report["status"] == "regression").sum())
+    print(f"{md}: {n_reg} regresiones")
+    return 1 if (args.fail_on_regression and n_reg) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .algorithms import Adjacency, DijkstraResult, _empty_stats, build_adjacency, dijkstra
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+INF = float("inf")
+
+_ARRAYS = ("out_ptr", "out_hub", "out_dist", "in_ptr", "in_hub", "in_dist")
+
+
+# =========================================================
+# Índice de etiquetas
+# =========================================================
+@dataclass
+class HubLabels:
+    """
+    Hub labeling (2-hop cover) dirigido:
+    - L_out(v) = [(h, d(v, h))], L_in(v) = [(h, d(h, v))]
+    - d(s, t) = min_{h en L_out(s) ∩ L_in(t)} d(s, h) + d(h, t)
+
+    Los nodos se identifican por su rango (orden de importancia) y los hubs de cada etiqueta
+    están ordenados por rango, así que la consulta es un merge de dos listas ordenadas.
+    Almacenamiento plano estilo CSR: hubs de v en out_hub[out_ptr[v]:out_ptr[v+1]] (int32)
+    con sus distancias en out_dist (float64); igual para in_*. save/load en .npy (mmap).
+    """
+    nodes: List[str]                  # nodes[rank]
+    out_ptr: np.ndarray
+    out_hub: np.ndarray
+    out_dist: np.ndarray
+    in_ptr: np.ndarray
+    in_hub: np.ndarray
+    in_dist: np.ndarray
+    stats: Dict[str, float | int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.index: Dict[str, int] = {n: i for i, n in enumerate(self.nodes)}
+
+    # --- consultas ---
+    def distance(self, start: str, goal: str) -> float:
+        """Coste mínimo start -> goal (inf si no hay camino o el nodo no existe)."""
+        s = self.index.get(start)
+        t = self.index.get(goal)
+        if s is None or t is None:
+            return INF
+        if s == t:
+            return 0.0
+        a0, a1 = int(self.out_ptr[s]), int(self.out_ptr[s + 1])
+        b0, b1 = int(self.in_ptr[t]), int(self.in_ptr[t + 1])
+        ha, hb = self.out_hub[a0:a1], self.in_hub[b0:b1]
+        if len(ha) == 0 or len(hb) == 0:
+            return INF
+        # merge de dos listas ordenadas: posición de cada hub de s en la etiqueta de t
+        pos = np.searchsorted(hb, ha)
+        pos[pos == len(hb)] = 0
+        common = hb[pos] == ha
+        if not common.any():
+            return INF
+        return float((self.out_dist[a0:a1][common] + self.in_dist[b0:b1][pos[common]]).min())
+
+    def distances(self, pairs: Sequence[Tuple[str, str]]) -> np.ndarray:
+        return np.array([self.distance(s, t) for s, t in pairs], dtype=np.float64)
+
+    def route(self, start: str, goal: str, adj: Adjacency) -> DijkstraResult:
+        """
+        Camino con el `dijkstra` de siempre. Los pares sin camino se descartan en O(1)
+        con el índice, sin buscar.
+        """
+        if self.distance(start, goal) == INF:
+            return DijkstraResult(False, start, goal, None, None, _empty_stats())
+        return dijkstra(start, goal, None, adj=adj)
+
+    # --- tamaño ---
+    def nbytes(self) -> int:
+        return int(sum(getattr(self, a).nbytes for a in _ARRAYS))
+
+    def label_sizes(self) -> Tuple[float, float]:
+        """(media |L_out|, media |L_in|)."""
+        n = max(len(self.nodes), 1)
+        return len(self.out_hub) / n, len(self.in_hub) / n
+
+    # --- persistencia ---
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        for a in _ARRAYS:
+            np.save(os.path.join(directory, f"{a}.npy"), np.asarray(getattr(self, a)))
+        with open(os.path.join(directory, "nodes.json"), "w", encoding="utf-8") as fh:
+            json.dump({"nodes": self.nodes, "stats": self.stats}, fh)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "HubLabels":
+        """Carga el índice; con mmap=True los arrays se mapean en memoria (np.load mmap_mode='r')."""
+        with open(os.path.join(directory, "nodes.json"), "r", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        arrays = {a: np.load(os.path.join(directory, f"{a}.npy"), mmap_mode="r" if mmap else None) for a in _ARRAYS}
+        return cls(nodes=meta["nodes"], stats=meta.get("stats", {}), **arrays)
+
+
+# =========================================================
+# Construcción: pruned landmark labeling
+# =========================================================
+def _pruned_dijkstra(
+    root: int,
+    graph: List[List[Tuple[int, float]]],
+    own: List[List[Tuple[int, float]]],
+    other: List[List[Tuple[int, float]]],
+    tmp: List[float],
+) -> int:
+    """
+    Dijkstra podado desde `root` (rango k) sobre `graph`.
+    own[root]: etiqueta de root del lado de la búsqueda (L_out si es hacia delante).
+    other[u]: etiqueta que se amplía en los nodos alcanzados (L_in si es hacia delante).
+    Se poda u cuando las etiquetas ya existentes dan una distancia <= la encontrada.
+    Devuelve el nº de entradas añadidas.
+    """
+    for h, d in own[root]:
+        tmp[h] = d
+
+    added = 0
+    dist: Dict[int, float] = {root: 0.0}
+    pq: List[Tuple[float, int]] = [(0.0, root)]
+    done = set()
+    while pq:
+        d_u, u = heapq.heappop(pq)
+        if u in done:
+            continue
+        done.add(u)
+        covered = INF
+        for h, dh in other[u]:
+            c = tmp[h] + dh
+            if c < covered:
+                covered = c
+        if covered <= d_u:
+            continue
+        other[u].append((root, d_u))
+        added += 1
+        for v, w in graph[u]:
+            nd = d_u + w
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                heapq.heappush(pq, (nd, v))
+
+    for h, _ in own[root]:
+        tmp[h] = INF
+    return added
+
+
+def build_hub_labels(adj: Adjacency) -> HubLabels:
+    """
+    Pruned landmark labeling (Akiba et al.) para grafos dirigidos con pesos:
+    - orden de importancia: grado total (entrada + salida) decreciente;
+    - para cada nodo k en ese orden, Dijkstra podado hacia delante (amplía L_in) y hacia
+      atrás (amplía L_out). Los hubs se añaden en orden de rango, así que las etiquetas salen
+      ya ordenadas.
+    """
+    t0 = time.perf_counter()
+    names = list(dict.fromkeys(list(adj) + [v for lst in adj.values() for v, _ in lst]))
+    degree = {n: 0 for n in names}
+    for u, lst in adj.items():
+        degree[u] += len(lst)
+        for v, _ in lst:
+            degree[v] += 1
+    nodes = sorted(names, key=lambda n: -degree[n])       # sort estable: empates por inserción
+    rank = {n: i for i, n in enumerate(nodes)}
+    N = len(nodes)
+
+    fwd: List[List[Tuple[int, float]]] = [[] for _ in range(N)]
+    bwd: List[List[Tuple[int, float]]] = [[] for _ in range(N)]
+    for u, lst in adj.items():
+        for v, w in lst:
+            if w < 0:
+                raise ValueError("Negative edge cost is not allowed.")
+            fwd[rank[u]].append((rank[v], float(w)))
+            bwd[rank[v]].append((rank[u], float(w)))
+
+    L_out: List[List[Tuple[int, float]]] = [[] for _ in range(N)]
+    L_in: List[List[Tuple[int, float]]] = [[] for _ in range(N)]
+    tmp = [INF] * N
+    for k in range(N):
+        _pruned_dijkstra(k, fwd, L_out, L_in, tmp)      # d(k, u) -> L_in(u)
+        _pruned_dijkstra(k, bwd, L_in, L_out, tmp)      # d(u, k) -> L_out(u)
+
+    def flatten(labels: List[List[Tuple[int, float]]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        ptr = np.zeros(N + 1, dtype=np.int64)
+        np.cumsum([len(x) for x in labels], out=ptr[1:])
+        hub = np.fromiter((h for x in labels for h, _ in x), dtype=np.int32, count=int(ptr[-1]))
+        dist = np.fromiter((d for x in labels for _, d in x), dtype=np.float64, count=int(ptr[-1]))
+        return ptr, hub, dist
+
+    out_ptr, out_hub, out_dist = flatten(L_out)
+    in_ptr, in_hub, in_dist = flatten(L_in)
+    hl = HubLabels(nodes, out_ptr, out_hub, out_dist, in_ptr, in_hub, in_dist)
+    avg_out, avg_in = hl.label_sizes()
+    hl.stats = {
+        "nodes": N,
+        "label_entries": int(len(out_hub) + len(in_hub)),
+        "avg_out_label": avg_out,
+        "avg_in_label": avg_in,
+        "index_bytes": hl.nbytes(),
+        "preprocess_ms": (time.perf_counter() - t0) * 1000.0,
+    }
+    return hl
+
+
+def build_hub_labels_from_dataframe(distance_df: pd.DataFrame) -> HubLabels:
+    return build_hub_labels(build_adjacency(distance_df))
@@ -0,0 +1,455 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .algorithms import Adjacency, AStarFastResult, a_star_fast, dijkstra
+from .heuristics import Coords, HeuristicRegistry
+from .reachability import ReachabilityIndex
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# u -> {v: (dist_km, FCC)}
+EdgeTable = Dict[str, Dict[str, Tuple[float, float]]]
+
+
+# =========================================================
+# Deltas
+# =========================================================
+@dataclass(frozen=True)
+class EdgeUpdate:
+    """
+    Un cambio de una línea u->v:
+    - remove=True: la línea sale de servicio (se elimina la arista);
+    - si no, dist_km y/o FCC nuevos (None = se conserva el valor actual). Una arista nueva
+      necesita los dos.
+    """
+    start_node: str
+    end_node: str
+    dist_km: Optional[float] = None
+    FCC: Optional[float] = None
+    remove: bool = False
+
+    @classmethod
+    def from_mapping(cls, row: Mapping) -> "EdgeUpdate":
+        """Fila del feed ({start_node, end_node, dist_km?, FCC?, remove?}), p.ej. de csv.DictReader."""
+        def num(key: str) -> Optional[float]:
+            val = row.get(key)
+            return None if val is None or val == "" else float(val)
+
+        remove = str(row.get("remove", "")).strip().lower() in {"1", "true", "yes"}
+        return cls(str(row["start_node"]), str(row["end_node"]), num("dist_km"), num("FCC"), remove)
+
+
+@dataclass(frozen=True)
+class EdgeChange:
+    """Cambio efectivo de coste real de u->v (None = la arista no existe)."""
+    start_node: str
+    end_node: str
+    old_cost: Optional[float]
+    new_cost: Optional[float]
+
+
+@dataclass(frozen=True)
+class GraphDelta:
+    version: int
+    changes: Tuple[EdgeChange, ...]
+    ignored: int = 0                 # actualizaciones sin efecto (mismo valor, baja de una arista ausente)
+
+    @property
+    def added(self) -> List[EdgeChange]:
+        return [c for c in self.changes if c.old_cost is None]
+
+    @property
+    def removed(self) -> List[EdgeChange]:
+        return [c for c in self.changes if c.new_cost is None]
+
+    @property
+    def only_worse(self) -> bool:
+        """Ninguna arista aparece ni se abarata: ningún camino mínimo puede mejorar."""
+        return all(c.old_cost is not None and (c.new_cost is None or c.new_cost >= c.old_cost) for c in self.changes)
+
+    def worsened_edges(self) -> set:
+        return {(c.start_node, c.end_node) for c in self.changes
+                if c.old_cost is not None and (c.new_cost is None or c.new_cost > c.old_cost)}
+
+    def as_tuples(self) -> List[Tuple[str, str, Optional[float], Optional[float]]]:
+        return [(c.start_node, c.end_node, c.old_cost, c.new_cost) for c in self.changes]
+
+
+# =========================================================
+# Snapshot inmutable
+# =========================================================
+class GraphSnapshot:
+    """
+    Una versión publicada del grafo. No se modifica nunca después de publicarse:
+    - edges / adj comparten con la versión anterior las listas de los nodos que no cambiaron
+      (copy-on-write por nodo de origen);
+    - derived: estructuras derivadas de ESTA versión (registry de heurísticas, índice de
+      alcanzabilidad, caché de rutas...), construidas antes de publicarla;
+    - distance_df se construye la primera vez que se pide.
+    Una consulta que empezó sobre un snapshot lo sigue viendo entero aunque se publiquen otros.
+    """
+    __slots__ = ("version", "edges", "adj", "coords", "derived", "delta", "published_at", "_df")
+
+    def __init__(
+        self,
+        version: int,
+        edges: EdgeTable,
+        adj: Adjacency,
+        coords: Optional[Coords],
+        delta: Optional[GraphDelta] = None,
+    ):
+        self.version = version
+        self.edges = edges
+        self.adj = adj
+        self.coords = coords
+        self.delta = delta
+        self.derived: Dict[str, object] = {}
+        self.published_at: Optional[float] = None
+        self._df: Optional[pd.DataFrame] = None
+
+    @property
+    def n_edges(self) -> int:
+        return sum(len(d) for d in self.edges.values())
+
+    @property
+    def distance_df(self) -> pd.DataFrame:
+        if self._df is None:
+            import pandas as pd
+
+            rows = [(u, v, km, fcc) for u, d in self.edges.items() for v, (km, fcc) in d.items()]
+            df = pd.DataFrame(rows, columns=["start_node", "end_node", "dist_km", "FCC"])
+            df["real"] = df["dist_km"] * df["FCC"]
+            self._df = df
+        return self._df
+
+    def edge(self, u: str, v: str) -> Optional[Tuple[float, float]]:
+        return self.edges.get(u, {}).get(v)
+
+    def graph_hash(self) -> str:
+        """Mismo hash que sweep.graph_hash: las celdas cacheadas de otra versión no se reutilizan."""
+        from .sweep import graph_hash
+
+        return graph_hash(self.distance_df, self.coords or {})
+
+    def route(
+        self,
+        start: str,
+        goal: str,
+        engine: str = "astar",
+        heuristic: str = "region_scaled",
+    ) -> AStarFastResult:
+        """
+        Ruta sobre esta versión con sus estructuras derivadas: índice de alcanzabilidad
+        ("reach"), heurística del registry ("heuristics") y caché de rutas ("routes") si están.
+        En la caché, A* lleva también la heurística en la clave: (start, goal, "astar", heurística).
+        """
+        cache: Optional[RouteCache] = self.derived.get("routes")  # type: ignore[assignment]
+        if engine == "astar":
+            key: Tuple[str, ...] = (start, goal, engine, HeuristicRegistry.canonical(heuristic))
+        else:
+            key = (start, goal, engine)
+        if cache is not None:
+            hit = cache.get(key)
+            if hit is not None:
+                return hit
+        reach = self.derived.get("reach")
+        registry: Optional[HeuristicRegistry] = self.derived.get("heuristics")  # type: ignore[assignment]
+        if engine == "astar" and registry is not None:
+            res = a_star_fast(start, goal, None, registry.get(heuristic, goal).h, adj=self.adj, reach=reach)
+        elif engine in ("astar", "dijkstra"):
+            res = dijkstra(start, goal, None, adj=self.adj, reach=reach)
+        else:
+            raise ValueError(f"Unknown engine: {engine}")
+        if cache is not None:
+            cache.put(key, res)
+        return res
+
+
+# =========================================================
+# Estructuras derivadas (refreshers)
+# =========================================================
+# refresher(previa o None, snapshot anterior o None, snapshot nuevo, delta o None) -> estructura nueva
+Refresher = Callable[[Optional[object], Optional[GraphSnapshot], GraphSnapshot, Optional[GraphDelta]], object]
+
+
+class RouteCache:
+    """LRU de rutas (start, goal, engine[, heurística]) -> resultado, ligada a una versión del grafo (thread-safe)."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = int(max_entries)
+        self._lock = threading.Lock()
+        self._d: "OrderedDict[Tuple[str, ...], AStarFastResult]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.carried = 0             # entradas heredadas de la versión anterior
+
+    def __len__(self) -> int:
+        return len(self._d)
+
+    def get(self, key: Tuple[str, ...]) -> Optional[AStarFastResult]:
+        with self._lock:
+            res = self._d.get(key)
+            if res is None:
+                self.misses += 1
+                return None
+            self._d.move_to_end(key)
+            self.hits += 1
+            return res
+
+    def put(self, key: Tuple[str, ...], res: AStarFastResult) -> None:
+        with self._lock:
+            self._d[key] = res
+            self._d.move_to_end(key)
+            if len(self._d) > self.max_entries:
+                self._d.popitem(last=False)
+
+    def items(self) -> Iterator[Tuple[Tuple[str, ...], AStarFastResult]]:
+        with self._lock:
+            return iter(list(self._d.items()))
+
+
+def heuristics_refresher(fcc_min: float = 2.0, region_grid: Tuple[int, int] = (4, 4)) -> Refresher:
+    """HeuristicRegistry por versión; las constantes k se actualizan con el delta (HeuristicRegistry.derive)."""
+    def refresh(prev, old, new, delta):
+        if prev is None:
+            return HeuristicRegistry(new.distance_df, new.coords or {}, fcc_min=fcc_min, region_grid=region_grid)
+        return prev.derive(new.distance_df, delta.as_tuples() if delta is not None else [])
+    return refresh
+
+
+def reachability_refresher() -> Refresher:
+    """
+    ReachabilityIndex por versión: copia del de la versión anterior + remove_edge / add_edge de
+    las aristas que desaparecen o aparecen (los cambios de coste no le afectan).
+    """
+    def refresh(prev, old, new, delta):
+        if prev is None or delta is None:
+            return ReachabilityIndex(new.adj)
+        if not delta.added and not delta.removed:
+            return prev                                    # inmutable en la práctica: se comparte
+        idx = prev.copy()
+        for c in delta.removed:
+            idx.remove_edge(c.start_node, c.end_node)
+        for c in delta.added:
+            idx.add_edge(c.start_node, c.end_node, c.new_cost)
+        return idx
+    return refresh
+
+
+def route_cache_refresher(max_entries: int = 4096) -> Refresher:
+    """
+    Caché de rutas por versión. Si el delta solo encarece o quita aristas, una ruta cacheada
+    que no usa ninguna de ellas sigue siendo óptima y se hereda (igual que un "sin camino").
+    Cualquier arista nueva o más barata vacía la caché (puede haber caminos mejores en
+    cualquier sitio).
+    """
+    def refresh(prev, old, new, delta):
+        cache = RouteCache(max_entries)
+        if prev is None or delta is None or not delta.only_worse:
+            return cache
+        worse = delta.worsened_edges()
+        for key, res in prev.items():
+            path = res.path or []
+            if not any((u, v) in worse for u, v in zip(path, path[1:])):
+                cache.put(key, res)
+                cache.carried += 1
+        return cache
+    return refresh
+
+
+STANDARD_REFRESHERS: Dict[str, Callable[..., Refresher]] = {
+    "heuristics": heuristics_refresher,
+    "reach": reachability_refresher,
+    "routes": route_cache_refresher,
+}
+
+
+# =========================================================
+# Grafo vivo: versiones copy-on-write con publicación atómica
+# =========================================================
+class LiveGraph:
+    """
+    Grafo en memoria que ingiere lotes de EdgeUpdate:
+    - apply(batch) construye la versión N+1 sin tocar la N (copy-on-write por nodo de origen),
+      ejecuta los refreshers sobre ella y solo entonces la publica (cambio de una referencia,
+      bajo lock). Si un update o un refresher falla no se publica nada;
+    - snapshot() devuelve la versión publicada; quien la tenga la sigue viendo completa;
+    - se conservan las últimas keep_versions versiones (get(version));
+    - subscribe(fn): fn(snapshot) tras cada publicación (p.ej. para vaciar cachés externas).
+    """
+
+    def __init__(
+        self,
+        distance_df: pd.DataFrame,
+        coords: Optional[Coords] = None,
+        refreshers: Sequence[str] = ("heuristics", "reach", "routes"),
+        keep_versions: int = 8,
+        fcc_min: float = 2.0,
+        region_grid: Tuple[int, int] = (4, 4),
+    ):
+        edges: EdgeTable = {}
+        for u, v, km, fcc in distance_df[["start_node", "end_node", "dist_km", "FCC"]].itertuples(index=False):
+            u, v, km, fcc = str(u), str(v), float(km), float(fcc)
+            cur = edges.setdefault(u, {}).get(v)
+            # aristas paralelas: se queda la de menor coste real
+            if cur is None or km * fcc < cur[0] * cur[1]:
+                edges[u][v] = (km, fcc)
+            edges.setdefault(v, {})
+        for n in coords or {}:
+            edges.setdefault(n, {})
+        adj: Adjacency = {u: [(v, km * fcc) for v, (km, fcc) in d.items()] for u, d in edges.items()}
+
+        self.coords = coords
+        self.keep_versions = int(keep_versions)
+        self._lock = threading.Lock()
+        self._refreshers: Dict[str, Refresher] = {}
+        self._subscribers: List[Callable[[GraphSnapshot], None]] = []
+        snap = GraphSnapshot(0, edges, adj, coords)
+        snap.published_at = time.time()
+        self._current = snap
+        self._history: "deque[GraphSnapshot]" = deque([snap], maxlen=self.keep_versions)
+        self.stats: Dict[str, float | int] = {"batches": 0, "updates": 0, "changes": 0, "ignored": 0, "publish_ms": 0.0}
+
+        kwargs = {"heuristics": {"fcc_min": fcc_min, "region_grid": region_grid}}
+        for name in refreshers:
+            if name not in STANDARD_REFRESHERS:
+                raise ValueError(f"Unknown refresher: {name}")
+            self.add_refresher(name, STANDARD_REFRESHERS[name](**kwargs.get(name, {})))
+
+    # --- lectura ---
+    def snapshot(self) -> GraphSnapshot:
+        return self._current
+
+    @property
+    def version(self) -> int:
+        return self._current.version
+
+    def get(self, version: int) -> GraphSnapshot:
+        for snap in self._history:
+            if snap.version == version:
+                return snap
+        raise KeyError(f"Version {version} is no longer retained (keep_versions={self.keep_versions}).")
+
+    # --- extensiones ---
+    def add_refresher(self, name: str, fn: Refresher) -> None:
+        """Registra una estructura derivada y la construye ya para la versión publicada."""
+        with self._lock:
+            self._refreshers[name] = fn
+            cur = self._current
+            cur.derived[name] = fn(None, None, cur, None)
+
+    def subscribe(self, fn: Callable[[GraphSnapshot], None]) -> None:
+        self._subscribers.append(fn)
+
+    # --- escritura ---
+    def _next_edges(
+        self, base: GraphSnapshot, updates: Iterable[EdgeUpdate]
+    ) -> Tuple[EdgeTable, Dict[Tuple[str, str], Optional[float]], int, int]:
+        """Tabla de aristas nueva (copy-on-write) + coste previo de cada arista tocada."""
+        edges = dict(base.edges)
+        copied = set()
+        before: Dict[Tuple[str, str], Optional[float]] = {}
+        n = ignored = 0
+        for up in updates:
+            n += 1
+            u, v = up.start_node, up.end_node
+            if self.coords is not None and (u not in self.coords or v not in self.coords):
+                raise ValueError(f"Update {u}->{v} references a node without coordinates.")
+            cur = edges.get(u, {}).get(v)
+            if up.remove:
+                if cur is None:
+                    ignored += 1
+                    continue
+                new = None
+            else:
+                km = up.dist_km if up.dist_km is not None else (cur[0] if cur else None)
+                fcc = up.FCC if up.FCC is not None else (cur[1] if cur else None)
+                if km is None or fcc is None:
+                    raise ValueError(f"New edge {u}->{v} needs both dist_km and FCC.")
+                if km < 0 or fcc < 0:
+                    raise ValueError(f"Negative dist_km/FCC for {u}->{v}.")
+                new = (float(km), float(fcc))
+                if new == cur:
+                    ignored += 1
+                    continue
+            if u not in copied:
+                edges[u] = dict(edges.get(u, {}))
+                copied.add(u)
+            if v not in edges:
+                edges[v] = {}
+            before.setdefault((u, v), cur[0] * cur[1] if cur is not None else None)
+            if new is None:
+                del edges[u][v]
+            else:
+                edges[u][v] = new
+        return edges, before, n, ignored
+
+    def apply(self, updates: Iterable[Union[EdgeUpdate, Mapping]]) -> GraphSnapshot:
+        """
+        Aplica un lote y publica la versión nueva (o devuelve la actual si el lote no cambia nada).
+        Dentro del lote, el último update de cada arista manda.
+        """
+        ups = [u if isinstance(u, EdgeUpdate) else EdgeUpdate.from_mapping(u) for u in updates]
+        with self._lock:
+            t0 = time.perf_counter()
+            base = self._current
+            edges, before, n, ignored = self._next_edges(base, ups)
+
+            changes: List[EdgeChange] = []
+            touched = set()
+            for (u, v), old_cost in before.items():
+                cur = edges[u].get(v)
+                new_cost = cur[0] * cur[1] if cur is not None else None
+                if new_cost != old_cost:
+                    changes.append(EdgeChange(u, v, old_cost, new_cost))
+                    touched.add(u)
+            self.stats["batches"] += 1
+            self.stats["updates"] += n
+            self.stats["ignored"] += ignored
+            if not changes:
+                return base
+
+            adj = dict(base.adj)
+            for u in touched:
+                adj[u] = [(v, km * fcc) for v, (km, fcc) in edges[u].items()]
+            for c in changes:
+                adj.setdefault(c.end_node, [])
+            delta = GraphDelta(base.version + 1, tuple(changes), ignored)
+            snap = GraphSnapshot(base.version + 1, edges, adj, self.coords, delta)
+            for name, fn in self._refreshers.items():
+                snap.derived[name] = fn(base.derived.get(name), base, snap, delta)
+
+            snap.published_at = time.time()
+            self._current = snap                     # publicación: un solo cambio de referencia
+            self._history.append(snap)
+            self.stats["changes"] += len(changes)
+            self.stats["publish_ms"] += (time.perf_counter() - t0) * 1000.0
+
+        for fn in self._subscribers:
+            fn(snap)
+        return snap
+
+    def ingest(self, feed: Iterable[Union[EdgeUpdate, Mapping]], batch_size: int = 256) -> List[int]:
+        """Consume un feed continuo en lotes de batch_size; devuelve las versiones publicadas."""
+        published: List[int] = []
+        last = self.version
+        batch: List[Union[EdgeUpdate, Mapping]] = []
+        for up in feed:
+            batch.append(up)
+            if len(batch) >= batch_size:
+                snap = self.apply(batch)
+                if snap.version > last:
+                    published.append(snap.version)
+                    last = snap.version
+                batch = []
+        if batch:
+            snap = self.apply(batch)
+            if snap.version > last:
+                published.append(snap.version)
+        return published
@@ -1,22 +1,85 @@
 from __future__ import annotations
 
+import argparse
+import json
 import os
+from typing import Dict, List, Optional
+
 import pandas as pd
 
-from .heuristics import build_coords_map, make_heuristic
+from .heuristics import build_coords_map, HeuristicRegistry
 from .benchmark import (
-    benchmark_heuristics,
-    benchmark_algorithms,
+    ALGORITHM_ENGINES,
+    DEFAULT_SMA_MAX_NODES,
+    DEFAULT_WEIGHTS,
     run_single,
     pick_best_label_overall,
 )
-from .plots import generate_images
-from .tree_viz import draw_search_tree
-
+from .sweep import CellCache, graph_hash, sweep_algorithms, sweep_heuristics
+from .results_store import ResultsStore, new_run_id
+from .history import RunHistory, compare_runs, write_report
+from .pareto import build_biobjective_adjacency, pareto_search
+from .render import FigureJob, RenderQueue, phase_image_jobs, reports_frame
+
+
+# Configuración por defecto (equivale a configs/default.json)
+DEFAULT_CONFIG: Dict = {
+    "data_csv": os.path.join("data", "nodes_distance.csv"),
+    "nodes": {
+        "A": [200, 700],
+        "B": [400, 800],
+        "C": [700, 800],
+        "D": [800, 500],
+        "E": [600, 300],
+        "F": [300, 400],
+        "G": [200, 100],
+        "H": [800, 100],
+    },
+    "cases": [["A", "H"], ["D", "A"], ["C", "G"], ["E", "A"]],
+    # Heurísticas A* (SIN dijkstra)
+    "heuristics": ["euclidean", "manhattan_scaled", "chebyshev_scaled", "region_scaled"],
+    "region_grid": [4, 4],                 # rejilla de regiones de region_scaled (gx, gy)
+    "engines": list(ALGORITHM_ENGINES),
+    "weights": list(DEFAULT_WEIGHTS),      # weighted A* (una fila por peso) y w inicial de ARA*
+    "sma_max_nodes": DEFAULT_SMA_MAX_NODES,  # presupuesto de nodos en memoria de SMA*
+    "repeats": 50,
+    "fcc_min": 2.0,
+    "export_formats": ["csv", "xlsx"],   # [] para no generar vistas
+    "export_per_case": False,
+    "render_workers": None,              # procesos de render de figuras (None = nº de CPUs)
+}
+
+
+def load_config(path: Optional[str]) -> Dict:
+    """DEFAULT_CONFIG actualizado con las claves del JSON (si se da)."""
+    cfg = json.loads(json.dumps(DEFAULT_CONFIG))
+    if path:
+        with open(path, "r", encoding="utf-8") as fh:
+            user = json.load(fh)
+        unknown = set(user) - set(DEFAULT_CONFIG)
+        if unknown:
+            raise ValueError(f"Unknown config keys: {sorted(unknown)}")
+        cfg.update(user)
+    return cfg
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Benchmark de heurísticas y algoritmos (sweep reanudable).")
+    ap.add_argument("--config", default=None, help="JSON con cases/heuristics/repeats/... (ver configs/default.json)")
+    ap.add_argument("--repeats", type=int, default=None, help="sobrescribe repeats del config")
+    ap.add_argument("--no-cache", action="store_true", help="recalcular todas las celdas")
+    ap.add_argument("--force-render", action="store_true", help="renderizar también las figuras sin cambios")
+    return ap.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    cfg = load_config(args.config)
+    if args.repeats is not None:
+        cfg["repeats"] = args.repeats
 
-def main():
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    CSV_PATH = os.path.join(BASE_DIR, "data", "nodes_distance.csv")
+    CSV_PATH = cfg["data_csv"] if os.path.isabs(cfg["data_csv"]) else os.path.join(BASE_DIR, cfg["data_csv"])
 
     RESULTS_DIR = os.path.join(BASE_DIR, "results")
 
@@ -30,38 +93,49 @@ def main():
     ALG_BENCH_DIR = os.path.join(ALG_DIR, "benchmarks")
     ALG_IMG_DIR = os.path.join(ALG_DIR, "images")
 
-    for d in [HEUR_SEARCH_DIR, HEUR_BENCH_DIR, HEUR_IMG_DIR, ALG_BENCH_DIR, ALG_IMG_DIR]:
+    PARETO_DIR = os.path.join(RESULTS_DIR, "pareto")
+
+    STORE_DIR = os.path.join(RESULTS_DIR, "store")
+    CACHE_DIR = os.path.join(RESULTS_DIR, "cache")
+    HISTORY_DIR = os.path.join(RESULTS_DIR, "history")
+
+    for d in [HEUR_SEARCH_DIR, HEUR_BENCH_DIR, HEUR_IMG_DIR, ALG_BENCH_DIR, ALG_IMG_DIR, PARETO_DIR]:
         os.makedirs(d, exist_ok=True)
 
+    # --- Resultados: store columnar (cada fila se escribe una vez) + vistas opcionales ---
+    store = ResultsStore(STORE_DIR)
+    run_id = new_run_id()
+    export_formats = cfg["export_formats"]
+    export_per_case = cfg["export_per_case"]
+
+    # --- Celdas terminadas (hash de contenido): un rerun solo calcula lo nuevo ---
+    cache = CellCache(CACHE_DIR, enabled=not args.no_cache)
+
+    # --- Figuras: cola con pool de procesos (Agg); se saltan las que no cambian de datos ---
+    render = RenderQueue(
+        os.path.join(RESULTS_DIR, "render_manifest.json"), workers=cfg["render_workers"], force=args.force_render
+    )
+
     # --- Nodos y coordenadas ---
-    nodes = ["A", "B", "C", "D", "E", "F", "G", "H"]
-    coord = [
-        [200, 700],
-        [400, 800],
-        [700, 800],
-        [800, 500],  # D
-        [600, 300],
-        [300, 400],
-        [200, 100],
-        [800, 100],
-    ]
+    nodes = list(cfg["nodes"])
+    coord = [cfg["nodes"][n] for n in nodes]
     coords_map = build_coords_map([nodes, coord])
 
     # --- Dataset ---
     dist = pd.read_csv(CSV_PATH, delimiter=";")
     dist["real"] = dist["dist_km"] * dist["FCC"]
+    ghash = graph_hash(dist, coords_map)
 
     # --- Casos ---
-    cases = [("A", "H"), ("D", "A"), ("C", "G"), ("E", "A")]
+    cases = [tuple(c) for c in cfg["cases"]]
 
-    # --- Heurísticas A* (SIN dijkstra) ---
-    heuristic_names = [
-        "euclidean",
-        "manhattan_scaled",
-        "chebyshev_scaled",
-    ]
+    heuristic_names = cfg["heuristics"]
+    repeats = int(cfg["repeats"])
 
-    repeats = 50
+    # Bundles perezosos: constantes del grafo compartidas entre goals, cada bundle se construye una vez
+    registry = HeuristicRegistry(
+        dist, coords_map, fcc_min=float(cfg["fcc_min"]), region_grid=tuple(cfg["region_grid"])
+    )
 
     # =========================================================
     # 1) BENCHMARK HEURÍSTICAS (A*)
@@ -69,26 +143,24 @@ def main():
     all_case_dfs = []
 
     for start, goal in cases:
-        bundles = [make_heuristic(hn, dist, coords_map, goal=goal, fcc_min=2.0) for hn in heuristic_names]
-
-        df_case = benchmark_heuristics(
+        df_case = sweep_heuristics(
             cases=[(start, goal)],
-            heuristics=bundles,
+            heuristic_names=heuristic_names,
             distance_df=dist,
+            registry=registry,
+            cache=cache,
+            ghash=ghash,
             repeats=repeats,
         )
         all_case_dfs.append(df_case)
-
-        out_case_xlsx = os.path.join(HEUR_BENCH_DIR, f"benchmark_{start}_to_{goal}.xlsx")
-        out_case_csv = os.path.join(HEUR_BENCH_DIR, f"benchmark_{start}_to_{goal}.csv")
-        df_case.to_excel(out_case_xlsx, index=False)
-        df_case.to_csv(out_case_csv, sep=";", decimal=",", index=False, encoding="utf-8-sig")
+        store.append(df_case.drop(columns=["times_ms", "cached"]), run=run_id, phase="heuristics")
 
         # --- Search trees por heurística ---
         case_dir = os.path.join(HEUR_SEARCH_DIR, f"{start}_to_{goal}")
         os.makedirs(case_dir, exist_ok=True)
 
-        for hb in bundles:
+        for hn in heuristic_names:
+            hb = registry.get(hn, goal)
             res = run_single(start, goal, dist, hb)
             df_events = res.event_info.copy()
 
@@ -96,7 +168,9 @@ def main():
             df_events.to_csv(out_csv, sep=";", decimal=",", index=False, encoding="utf-8-sig")
 
             out_png = os.path.join(case_dir, f"{hb.name}.png")
-            draw_search_tree(node_info=df_events, start=start, goal=goal, out_png=out_png, path=None)
+            render.submit(FigureJob("search_tree", out_png, {
+                "node_info": df_events, "start": start, "goal": goal, "path": None,
+            }))
 
             if res.path:
                 df_nodes = res.node_info.copy()
@@ -114,63 +188,97 @@ def main():
                 df_path.to_csv(out_path_csv, sep=";", decimal=",", index=False, encoding="utf-8-sig")
 
     df_heur_all = pd.concat(all_case_dfs, ignore_index=True)
+    if export_formats:
+        store.export(run_id, "heuristics", HEUR_BENCH_DIR, formats=export_formats, per_case=export_per_case)
 
-    out_all_xlsx = os.path.join(HEUR_BENCH_DIR, "benchmark_all_cases.xlsx")
-    out_all_csv = os.path.join(HEUR_BENCH_DIR, "benchmark_all_cases.csv")
-    df_heur_all.to_excel(out_all_xlsx, index=False)
-    df_heur_all.to_csv(out_all_csv, sep=";", decimal=",", index=False, encoding="utf-8-sig")
-
-    generate_images(df_heur_all, HEUR_IMG_DIR, label_col="label", title_prefix="Heurísticas (A*)")
+    df_heur_all = df_heur_all.drop(columns=["times_ms", "cached"])
+    render.extend(phase_image_jobs(df_heur_all, HEUR_IMG_DIR, label_col="label", title_prefix="Heurísticas (A*)"))
 
     # Elegir heurística ganadora global
     winner_label = pick_best_label_overall(df_heur_all)
+    try:
+        winner_name = registry.canonical(winner_label)
+    except ValueError:
+        # fallback razonable
+        winner_name = "manhattan_scaled"
 
-    # reconstruir el bundle ganador por caso (depende de goal)
-    # (lo hacemos en el benchmark_algorithms por cada caso)
     # =========================================================
-    # 2) BENCHMARK ALGORITMOS (A* vs Dijkstra vs UCS)
+    # 2) BENCHMARK ALGORITMOS (A* vs Dijkstra vs UCS vs weighted A* / ARA*)
     # =========================================================
     alg_case_dfs = []
     for start, goal in cases:
-        # bundle ganador para ESTE goal (mismo nombre label => necesitamos mapearlo)
-        # winner_label coincide con hb.name (ej: "manhattan_scaled")
-        # pero euclidean devuelve "euclidean_x_fccmin"
-        # por eso mapeamos:
-        if winner_label == "euclidean_x_fccmin":
-            wn = "euclidean"
-        elif winner_label == "manhattan_scaled":
-            wn = "manhattan_scaled"
-        elif winner_label == "chebyshev_scaled":
-            wn = "chebyshev_scaled"
-        else:
-            # fallback razonable
-            wn = "manhattan_scaled"
-
-        winner_bundle = make_heuristic(wn, dist, coords_map, goal=goal, fcc_min=2.0)
-
-        df_alg_case = benchmark_algorithms(
+        # el bundle ganador depende del goal: se pide por nombre al registro (ya cacheado)
+        df_alg_case = sweep_algorithms(
             cases=[(start, goal)],
+            astar_heuristic=winner_name,
             distance_df=dist,
-            astar_heuristic=winner_bundle,
+            registry=registry,
+            cache=cache,
+            ghash=ghash,
             repeats=repeats,
+            engines=cfg["engines"],
+            weights=[float(w) for w in cfg["weights"]],
+            sma_max_nodes=int(cfg["sma_max_nodes"]),
         )
         alg_case_dfs.append(df_alg_case)
-
-        out_case_xlsx = os.path.join(ALG_BENCH_DIR, f"benchmark_{start}_to_{goal}.xlsx")
-        out_case_csv = os.path.join(ALG_BENCH_DIR, f"benchmark_{start}_to_{goal}.csv")
-        df_alg_case.to_excel(out_case_xlsx, index=False)
-        df_alg_case.to_csv(out_case_csv, sep=";", decimal=",", index=False, encoding="utf-8-sig")
+        store.append(df_alg_case.drop(columns=["times_ms", "cached"]), run=run_id, phase="algorithms")
 
     df_alg_all = pd.concat(alg_case_dfs, ignore_index=True)
+    if export_formats:
+        store.export(run_id, "algorithms", ALG_BENCH_DIR, formats=export_formats, per_case=export_per_case)
+
+    df_alg_all = df_alg_all.drop(columns=["times_ms", "cached"])
+    render.extend(phase_image_jobs(df_alg_all, ALG_IMG_DIR, label_col="label", title_prefix="Algoritmos"))
+
+    # =========================================================
+    # 3) FRENTE DE PARETO (km vs coste real)
+    # =========================================================
+    bi_adj = build_biobjective_adjacency(dist)
+    fronts = []
+    for start, goal in cases:
+        pres = pareto_search(start, goal, dist, adj=bi_adj)
+        fronts.append(pres.to_frame())
+    df_front = pd.concat(fronts, ignore_index=True)
+    df_front.to_csv(os.path.join(PARETO_DIR, "pareto_front.csv"), sep=";", decimal=",", index=False, encoding="utf-8-sig")
+    render.submit(FigureJob("pareto_front", os.path.join(PARETO_DIR, "pareto_front.png"), {"front": df_front}))
 
-    out_all_xlsx = os.path.join(ALG_BENCH_DIR, "benchmark_all_cases.xlsx")
-    out_all_csv = os.path.join(ALG_BENCH_DIR, "benchmark_all_cases.csv")
-    df_alg_all.to_excel(out_all_xlsx, index=False)
-    df_alg_all.to_csv(out_all_csv, sep=";", decimal=",", index=False, encoding="utf-8-sig")
+    # =========================================================
+    # 4) HISTORIAL DE RUNS Y REGRESIONES
+    # =========================================================
+    history = RunHistory(HISTORY_DIR)
+    cells = pd.concat(
+        [d.assign(phase=ph) for ph, dfs in (("heuristics", all_case_dfs), ("algorithms", alg_case_dfs)) for d in dfs],
+        ignore_index=True,
+    )
+    history.record(run_id, cells)
+
+    n_regressions = 0
+    if len(history.runs()) > 1:
+        baseline_id = history.resolve("previous", current=run_id)
+        report = compare_runs(history.load(baseline_id), history.load(run_id))
+        write_report(report, os.path.join(HISTORY_DIR, run_id), baseline_id, run_id,
+                     history.meta(baseline_id), history.meta(run_id))
+        n_regressions = int((report["status"] == "regression").sum())
+
+    trends = history.trends()
+    for ph, img_dir, title in (("heuristics", HEUR_IMG_DIR, "Heurísticas (A*)"), ("algorithms", ALG_IMG_DIR, "Algoritmos")):
+        render.submit(FigureJob("trends", os.path.join(img_dir, "06_trend_exec_time.png"), {
+            "trends": trends[trends["phase"] == ph],
+            "title": f"{title} - Tendencia: mediana de tiempo (ms) por run",
+        }))
 
-    generate_images(df_alg_all, ALG_IMG_DIR, label_col="label", title_prefix="Algoritmos")
+    # =========================================================
+    # 5) RENDER DE FIGURAS
+    # =========================================================
+    df_render = reports_frame(render.run())
+    df_render.to_csv(os.path.join(RESULTS_DIR, "render_report.csv"), sep=";", decimal=",", index=False, encoding="utf-8-sig")
+    n_rendered = int((df_render["status"] == "rendered").sum())
+    n_skipped = int((df_render["status"] == "skipped").sum())
+    n_failed = int((df_render["status"] == "failed").sum())
 
     print("✅ Resultados guardados en:")
+    print(" - Store:", STORE_DIR, f"(run={run_id})")
+    print(" - Cache:", CACHE_DIR, f"(reutilizadas={cache.hits}, calculadas={cache.misses})")
     print(" - Heuristics:")
     print("   - Search trees:", HEUR_SEARCH_DIR)
     print("   - Benchmarks:", HEUR_BENCH_DIR)
@@ -178,6 +286,11 @@ def main():
     print(" - Algorithms:")
     print("   - Benchmarks:", ALG_BENCH_DIR)
     print("   - Images:", ALG_IMG_DIR)
+    print(" - Pareto:", PARETO_DIR, f"(rutas no dominadas: {len(df_front)})")
+    print(" - Figuras:", os.path.join(RESULTS_DIR, "render_report.csv"),
+          f"(renderizadas={n_rendered}, sin cambios={n_skipped}, fallidas={n_failed}, "
+          f"{df_render['render_ms'].sum():.0f} ms)")
+    print(" - History:", os.path.join(HISTORY_DIR, run_id), f"(regresiones vs run anterior: {n_regressions})")
     print(f"🏆 Heurística ganadora global: {winner_label}")
 
 
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import heapq
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from .delta_stepping import DeltaSteppingEngine
+from .graph import build_csr
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# u -> [(v, coste1, coste2)]
+BiAdjacency = Dict[str, List[Tuple[str, float, float]]]
+
+OBJECTIVES = ("dist_km", "real")
+
+
+# =========================================================
+# Utilidades
+# =========================================================
+def build_biobjective_adjacency(distance_df: pd.DataFrame, objectives: Tuple[str, str] = OBJECTIVES) -> BiAdjacency:
+    """Adjacency con dos costes por arista (por defecto km y coste real = km * FCC)."""
+    c1, c2 = objectives
+    u = distance_df["start_node"].astype(str).tolist()
+    v = distance_df["end_node"].astype(str).tolist()
+    w1 = distance_df[c1].astype(float).tolist()
+    w2 = distance_df[c2].astype(float).tolist()
+    adj: BiAdjacency = {n: [] for n in set(u).union(v)}
+    for a, b, x, y in zip(u, v, w1, w2):
+        if x < 0 or y < 0:
+            raise ValueError("Negative edge cost is not allowed.")
+        adj[a].append((b, x, y))
+    return adj
+
+
+def reverse_lower_bounds(goal: str, distance_df: pd.DataFrame, objective: str) -> Dict[str, float]:
+    """
+    h(n) = coste mínimo n -> goal para un objetivo: una búsqueda uno-a-todos (delta-stepping)
+    desde goal sobre el grafo traspuesto. Exacta, luego admisible y consistente.
+    """
+    graph = build_csr(distance_df, weight_col=objective).reversed()
+    if goal not in graph.index:
+        return {}
+    with DeltaSteppingEngine(graph) as eng:
+        return eng.run(goal).dist
+
+
+# =========================================================
+# Resultado
+# =========================================================
+@dataclass
+class ParetoRoute:
+    dist_km: float
+    cost: float
+    path: List[str]
+
+
+@dataclass
+class ParetoResult:
+    found: bool
+    start: str
+    goal: str
+    front: List[ParetoRoute]            # ordenado por dist_km creciente (coste decreciente)
+    stats: Dict[str, float | int]
+
+    def to_frame(self) -> pd.DataFrame:
+        import pandas as pd
+
+        return pd.DataFrame([
+            {
+                "start": self.start,
+                "goal": self.goal,
+                "dist_km": r.dist_km,
+                "total_cost": r.cost,
+                "path_length": len(r.path) - 1,
+                "path": " -> ".join(r.path),
+            }
+            for r in self.front
+        ])
+
+
+class _Label:
+    __slots__ = ("node", "g1", "g2", "parent")
+
+    def __init__(self, node: str, g1: float, g2: float, parent: Optional["_Label"]):
+        self.node = node
+        self.g1 = g1
+        self.g2 = g2
+        self.parent = parent
+
+
+def _label_path(lab: _Label) -> List[str]:
+    path = []
+    cur: Optional[_Label] = lab
+    while cur is not None:
+        path.append(cur.node)
+        cur = cur.parent
+    path.reverse()
+    return path
+
+
+# =========================================================
+# Búsqueda bi-objetivo (label-setting)
+# =========================================================
+def pareto_search(
+    start: str,
+    goal: str,
+    distance_df: Optional[pd.DataFrame],
+    adj: Optional[BiAdjacency] = None,
+    h1: Optional[Dict[str, float]] = None,
+    h2: Optional[Dict[str, float]] = None,
+    objectives: Tuple[str, str] = OBJECTIVES,
+) -> ParetoResult:
+    """
+    Frente de Pareto de (km totales, coste real total) entre start y goal.
+
+    Label-setting bi-objetivo (estilo BOA*):
+    - OPEN ordenada lexicográficamente por (f1, f2) con f = g + h.
+    - Las etiquetas de cada nodo se asientan en orden creciente de g1, así que la lista de
+      etiquetas asentadas está ordenada por g1 y la comprobación de dominancia se reduce a
+      comparar g2 con el último g2 asentado en el nodo (O(1), sin guardar la lista).
+    - Poda contra el frente: una etiqueta con g2 + h2 >= mejor g2 en goal está dominada.
+    - Una etiqueta en goal con g1 <= el del último punto del frente lo sustituye (empates de g1
+      que el redondeo de f1 saca en desorden): el frente devuelto no tiene puntos dominados.
+    - h1 / h2: cotas inferiores de un solo objetivo (reverse_lower_bounds); los nodos que no
+      alcanzan goal se descartan al generarse.
+    """
+    t0 = time.perf_counter()
+    if adj is None:
+        adj = build_biobjective_adjacency(distance_df, objectives)
+    if h1 is None:
+        h1 = reverse_lower_bounds(goal, distance_df, objectives[0])
+    if h2 is None:
+        h2 = reverse_lower_bounds(goal, distance_df, objectives[1])
+    t_bounds = time.perf_counter()
+
+    INF = float("inf")
+    stats: Dict[str, float | int] = {
+        "labels_generated": 0,
+        "labels_expanded": 0,
+        "labels_pruned": 0,
+        "max_open": 0,
+        "front_size": 0,
+        "bounds_ms": (t_bounds - t0) * 1000.0,
+        "search_ms": 0.0,
+    }
+
+    if start not in h1 or start not in h2:
+        stats["search_ms"] = (time.perf_counter() - t_bounds) * 1000.0
+        return ParetoResult(False, start, goal, [], stats)
+
+    # etiquetas asentadas por nodo ordenadas por g1 y g2 estrictamente decreciente:
+    # basta guardar el último g2 para saber si una etiqueta nueva está dominada
+    g2_min: Dict[str, float] = {}
+    front: List[_Label] = []
+
+    tie = 0
+    open_heap: List[Tuple[float, float, int, _Label]] = [(h1[start], h2[start], tie, _Label(start, 0.0, 0.0, None))]
+    stats["labels_generated"] = 1
+
+    while open_heap:
+        if len(open_heap) > int(stats["max_open"]):
+            stats["max_open"] = len(open_heap)
+        _, _, _, lab = heapq.heappop(open_heap)
+
+        node = lab.node
+        goal_g2 = g2_min.get(goal, INF)
+        if lab.g2 >= g2_min.get(node, INF) or lab.g2 + h2[node] >= goal_g2:
+            stats["labels_pruned"] = int(stats["labels_pruned"]) + 1
+            continue
+
+        g2_min[node] = lab.g2
+        stats["labels_expanded"] = int(stats["labels_expanded"]) + 1
+
+        if node == goal:
+            # el redondeo de g1 + h1 en nodos intermedios puede sacar en goal una etiqueta con
+            # el mismo g1 (o una milésima menos) y menor g2: domina a las últimas del frente
+            while front and front[-1].g1 >= lab.g1:
+                front.pop()
+            front.append(lab)
+            continue
+
+        for nxt, c1, c2 in adj.get(node, []):
+            hb1 = h1.get(nxt)
+            if hb1 is None:
+                continue
+            ng2 = lab.g2 + c2
+            hb2 = h2[nxt]
+            if ng2 >= g2_min.get(nxt, INF) or ng2 + hb2 >= goal_g2:
+                stats["labels_pruned"] = int(stats["labels_pruned"]) + 1
+                continue
+            ng1 = lab.g1 + c1
+            tie += 1
+            heapq.heappush(open_heap, (ng1 + hb1, ng2 + hb2, tie, _Label(nxt, ng1, ng2, lab)))
+            stats["labels_generated"] = int(stats["labels_generated"]) + 1
+
+    stats["front_size"] = len(front)
+    stats["search_ms"] = (time.perf_counter() - t_bounds) * 1000.0
+    routes = [ParetoRoute(dist_km=lab.g1, cost=lab.g2, path=_label_path(lab)) for lab in front]
+    return ParetoResult(bool(routes), start, goal, routes, stats)
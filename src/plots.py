@@ -5,6 +5,9 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from .benchmark import metrics_long
+from .render import phase_image_jobs
+
 
 def _grouped_bar(df: pd.DataFrame, value_col: str, title: str, outpath: str, label_col: str = "label"):
     pivot = df.pivot(index="case", columns=label_col, values=value_col)
@@ -31,28 +34,28 @@ def _grouped_bar(df: pd.DataFrame, value_col: str, title: str, outpath: str, lab
     plt.close(fig)
 
 
-def _heatmap_winners(df: pd.DataFrame, outpath: str, label_col: str = "label"):
-    metrics = ["expanded_nodes", "exec_time_ms_mean", "ms_per_expanded", "max_frontier"]
-
+def winner_counts(df: pd.DataFrame, label_col: str = "label") -> pd.DataFrame:
+    """
+    Nº de métricas ganadas por (caso, label), agrupado en una pasada:
+    gana todo label cuyo valor iguala el mínimo del caso en esa métrica.
+    """
     cases = sorted(df["case"].unique().tolist())
     labels = sorted(df[label_col].unique().tolist())
 
-    wins = pd.DataFrame(0, index=cases, columns=labels, dtype=int)
+    long = metrics_long(df, label_col=label_col)
+    if long.empty:
+        return pd.DataFrame(0, index=cases, columns=labels, dtype=int)
+    best = long.groupby(["case", "metric"], sort=False)["value"].transform("min")
+    winners = long[long["value"] == best]
+    wins = pd.crosstab(winners["case"], winners[label_col])
+    return wins.reindex(index=cases, columns=labels, fill_value=0).astype(int)
 
-    for c in cases:
-        df_c = df[df["case"] == c].copy()
-        df_c = df_c[df_c["found"] == True]
-        if df_c.empty:
-            continue
 
-        for m in metrics:
-            df_m = df_c.dropna(subset=[m])
-            if df_m.empty:
-                continue
-            best_val = df_m[m].min()
-            winners = df_m[df_m[m] == best_val][label_col].tolist()
-            for w in winners:
-                wins.loc[c, w] += 1
+def _heatmap_winners(df: pd.DataFrame, outpath: str, label_col: str = "label"):
+    cases = sorted(df["case"].unique().tolist())
+    labels = sorted(df[label_col].unique().tolist())
+
+    wins = winner_counts(df, label_col=label_col)
 
     data = wins.values.astype(float)
 
@@ -76,43 +79,82 @@ def _heatmap_winners(df: pd.DataFrame, outpath: str, label_col: str = "label"):
 
 
 def generate_images(df_all: pd.DataFrame, images_dir: str, label_col: str = "label", title_prefix: str = ""):
+    """Gráficas de una fase, en serie. Para renderizarlas en paralelo: render.phase_image_jobs + RenderQueue."""
     os.makedirs(images_dir, exist_ok=True)
-    p = (title_prefix + " - ") if title_prefix else ""
-
-    _grouped_bar(
-        df_all,
-        value_col="expanded_nodes",
-        title=f"{p}Nodos expandidos por caso",
-        outpath=os.path.join(images_dir, "01_expanded_nodes.png"),
-        label_col=label_col,
-    )
+    for job in phase_image_jobs(df_all, images_dir, label_col=label_col, title_prefix=title_prefix):
+        job.render()
 
-    _grouped_bar(
-        df_all,
-        value_col="exec_time_ms_mean",
-        title=f"{p}Tiempo medio de ejecución (ms) por caso",
-        outpath=os.path.join(images_dir, "02_exec_time_ms_mean.png"),
-        label_col=label_col,
-    )
 
-    _grouped_bar(
-        df_all,
-        value_col="ms_per_expanded",
-        title=f"{p}Eficiencia: ms por nodo expandido",
-        outpath=os.path.join(images_dir, "03_ms_per_expanded.png"),
-        label_col=label_col,
-    )
+def plot_cost_gap(df: pd.DataFrame, outpath: str, label_col: str = "label", title: str = ""):
+    """
+    Dispersión cost_gap (%) frente a expanded_nodes: un punto por (caso, label),
+    un color por label (p.ej. cada peso de weighted A*).
+    """
+    d = df.dropna(subset=["cost_gap"])
+    if d.empty:
+        return
+
+    fig, ax = plt.subplots()
+    for lb, g in d.groupby(label_col, sort=False):
+        ax.scatter(g["expanded_nodes"], 100.0 * g["cost_gap"], label=lb)
+
+    ax.set_title(title or "Coste extra vs nodos expandidos")
+    ax.set_xlabel("expanded_nodes")
+    ax.set_ylabel("cost_gap (%)")
+    ax.legend(fontsize=7)
+
+    fig.tight_layout()
+    fig.savefig(outpath, dpi=200)
+    plt.close(fig)
 
-    _grouped_bar(
-        df_all,
-        value_col="max_frontier",
-        title=f"{p}Tamaño máximo de frontera (max_frontier)",
-        outpath=os.path.join(images_dir, "04_max_frontier.png"),
-        label_col=label_col,
-    )
 
-    _heatmap_winners(
-        df_all,
-        outpath=os.path.join(images_dir, "05_heatmap_winners.png"),
-        label_col=label_col,
+def plot_trends(trends: pd.DataFrame, outpath: str, label_col: str = "label", title: str = ""):
+    """
+    Evolución entre runs de la mediana de tiempo (media sobre casos) por label.
+    `trends` = RunHistory.trends() filtrado a una fase.
+    """
+    if trends.empty:
+        return
+    agg = (
+        trends.groupby(["run_index", "run_id", label_col], as_index=False)["time_ms_median"].mean()
+        .sort_values("run_index")
     )
+    runs = agg[["run_index", "run_id"]].drop_duplicates().sort_values("run_index")
+
+    fig, ax = plt.subplots()
+    for lb, d in agg.groupby(label_col):
+        ax.plot(d["run_index"], d["time_ms_median"], marker="o", label=lb)
+
+    ax.set_xticks(runs["run_index"].tolist())
+    ax.set_xticklabels(runs["run_id"].tolist(), rotation=45, ha="right", fontsize=7)
+    ax.set_title(title or "Tendencia: mediana de tiempo (ms) por run")
+    ax.set_ylabel("time_ms_median")
+    ax.legend()
+
+    fig.tight_layout()
+    fig.savefig(outpath, dpi=200)
+    plt.close(fig)
+
+
+def plot_pareto_front(front: pd.DataFrame, outpath: str, title: str = ""):
+    """
+    Frente de Pareto (dist_km, total_cost) de uno o varios casos: escalera por caso.
+    `front` = concatenación de ParetoResult.to_frame().
+    """
+    if front.empty:
+        return
+
+    fig, ax = plt.subplots()
+    for (s, g), d in front.groupby(["start", "goal"], sort=False):
+        d = d.sort_values("dist_km")
+        ax.step(d["dist_km"], d["total_cost"], where="post", alpha=0.5)
+        ax.scatter(d["dist_km"], d["total_cost"], label=f"{s}->{g}")
+
+    ax.set_title(title or "Frente de Pareto: km vs coste real")
+    ax.set_xlabel("dist_km")
+    ax.set_ylabel("total_cost (km * FCC)")
+    ax.legend(fontsize=7)
+
+    fig.tight_layout()
+    fig.savefig(outpath, dpi=200)
+    plt.close(fig)
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from .algorithms import Adjacency, build_adjacency
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def strongly_connected_components(adj: Adjacency) -> Dict[str, int]:
+    """
+    Tarjan iterativo (sin recursión). Devuelve node -> id de componente.
+    Los ids salen en orden topológico inverso del DAG de condensación:
+    si hay arista C_i -> C_j entre componentes distintas, entonces j < i.
+    """
+    nodes = list(adj)
+    for lst in adj.values():
+        for v, _ in lst:
+            if v not in adj:
+                nodes.append(v)
+    nodes = list(dict.fromkeys(nodes))
+
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    comp: Dict[str, int] = {}
+    counter = 0
+    n_comp = 0
+
+    for root in nodes:
+        if root in index:
+            continue
+        # pila de trabajo: (nodo, iterador de sucesores)
+        work: List[Tuple[str, int]] = [(root, 0)]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            v, i = work[-1]
+            succ = adj.get(v, [])
+            if i < len(succ):
+                work[-1] = (v, i + 1)
+                w = succ[i][0]
+                if w not in index:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, 0))
+                elif w in on_stack:
+                    low[v] = min(low[v], index[w])
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[v])
+            if low[v] == index[v]:
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    comp[w] = n_comp
+                    if w == v:
+                        break
+                n_comp += 1
+
+    return comp
+
+
+class ReachabilityIndex:
+    """
+    Índice de alcanzabilidad construido con el grafo:
+    - SCC (Tarjan) + DAG de condensación con multiplicidad de aristas.
+    - Para cada componente, bitset (int de Python) con las componentes alcanzables.
+    - reachable(s, g): O(1) -> comparación de componentes + test de un bit.
+    - remove_edge / add_edge mantienen el índice: solo se reconstruye entero cuando
+      una SCC se parte (o dos se funden); si no, basta con tocar el DAG.
+
+    Pensado para redes con pocas componentes grandes (islas): la memoria de los bitsets
+    es O(C^2) bits con C = nº de componentes.
+    """
+
+    def __init__(self, adj: Adjacency):
+        # copia propia: el índice debe seguir al grafo aunque el llamante mute el suyo
+        self._adj: Adjacency = {u: list(lst) for u, lst in adj.items()}
+        for lst in adj.values():
+            for v, _ in lst:
+                self._adj.setdefault(v, [])
+        self.rebuilds = 0
+        self._rebuild()
+
+    @classmethod
+    def from_dataframe(cls, distance_df: pd.DataFrame) -> "ReachabilityIndex":
+        return cls(build_adjacency(distance_df))
+
+    def copy(self) -> "ReachabilityIndex":
+        """Copia independiente (sin recalcular SCC): base para actualizar una versión nueva del grafo."""
+        new = ReachabilityIndex.__new__(ReachabilityIndex)
+        new._adj = {u: list(lst) for u, lst in self._adj.items()}
+        new.comp = dict(self.comp)
+        new.n_components = self.n_components
+        new._dag = dict(self._dag)
+        new._reach = list(self._reach)
+        new.rebuilds = self.rebuilds
+        return new
+
+    # --- construcción ---
+    def _rebuild(self) -> None:
+        self.comp = strongly_connected_components(self._adj)
+        self.n_components = (max(self.comp.values()) + 1) if self.comp else 0
+        self._dag: Dict[Tuple[int, int], int] = {}
+        for u, lst in self._adj.items():
+            cu = self.comp[u]
+            for v, _ in lst:
+                cv = self.comp[v]
+                if cu != cv:
+                    self._dag[(cu, cv)] = self._dag.get((cu, cv), 0) + 1
+        self._recompute_bitsets()
+        self.rebuilds += 1
+
+    def _recompute_bitsets(self) -> None:
+        """Bitsets en orden topológico inverso (Kahn sobre el DAG; add_edge puede romper el de Tarjan)."""
+        succ: List[List[int]] = [[] for _ in range(self.n_components)]
+        indeg = [0] * self.n_components
+        for (cu, cv) in self._dag:
+            succ[cu].append(cv)
+            indeg[cv] += 1
+        order = [c for c in range(self.n_components) if indeg[c] == 0]
+        for c in order:
+            for d in succ[c]:
+                indeg[d] -= 1
+                if indeg[d] == 0:
+                    order.append(d)
+        reach = [0] * self.n_components
+        for c in reversed(order):
+            bits = 1 << c
+            for d in succ[c]:
+                bits |= reach[d]
+            reach[c] = bits
+        self._reach = reach
+
+    # --- consultas ---
+    def reachable(self, start: str, goal: str) -> bool:
+        if start == goal:
+            return True
+        cs = self.comp.get(start)
+        cg = self.comp.get(goal)
+        if cs is None or cg is None:
+            return False
+        return cs == cg or bool((self._reach[cs] >> cg) & 1)
+
+    def component_sizes(self) -> Dict[int, int]:
+        sizes: Dict[int, int] = {}
+        for c in self.comp.values():
+            sizes[c] = sizes.get(c, 0) + 1
+        return sizes
+
+    # --- actualizaciones ---
+    def _reaches_within(self, src: str, dst: str, comp_id: int) -> bool:
+        """BFS de src a dst sin salir de la componente comp_id."""
+        seen = {src}
+        q = deque([src])
+        while q:
+            u = q.popleft()
+            if u == dst:
+                return True
+            for v, _ in self._adj.get(u, []):
+                if v not in seen and self.comp.get(v) == comp_id:
+                    seen.add(v)
+                    q.append(v)
+        return False
+
+    def remove_edge(self, u: str, v: str, weight: Optional[float] = None) -> bool:
+        """
+        Elimina una arista u->v (la de peso `weight` si se indica). Devuelve False si no existía.
+        - Entre componentes distintas: decrementa la multiplicidad en el DAG y, si desaparece
+          la arista del DAG, recalcula los bitsets.
+        - Dentro de una SCC: si u sigue alcanzando a v la SCC no cambia; si no, se parte
+          y se reconstruye el índice.
+        """
+        lst = self._adj.get(u, [])
+        for i, (x, w) in enumerate(lst):
+            if x == v and (weight is None or w == weight):
+                del lst[i]
+                break
+        else:
+            return False
+
+        cu, cv = self.comp[u], self.comp[v]
+        if cu != cv:
+            self._dag[(cu, cv)] -= 1
+            if self._dag[(cu, cv)] == 0:
+                del self._dag[(cu, cv)]
+                self._recompute_bitsets()
+        elif not self._reaches_within(u, v, cu):
+            self._rebuild()
+        return True
+
+    def add_edge(self, u: str, v: str, weight: float) -> None:
+        """Añade u->v: si cierra un ciclo entre componentes se funden (reconstrucción)."""
+        new_nodes = u not in self._adj or v not in self._adj
+        self._adj.setdefault(u, []).append((v, weight))
+        self._adj.setdefault(v, [])
+        if new_nodes:
+            self._rebuild()
+            return
+
+        cu, cv = self.comp[u], self.comp[v]
+        if cu == cv:
+            return
+        if self.reachable(v, u):
+            self._rebuild()
+            return
+        self._dag[(cu, cv)] = self._dag.get((cu, cv), 0) + 1
+        if self._dag[(cu, cv)] == 1:
+            self._recompute_bitsets()
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple
+
+from .algorithms import Adjacency, a_star_fast, build_adjacency, dijkstra, intern_path, ucs
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+INF = float("inf")
+
+# (u, v) -> (coste, nodos intermedios originales en orden u -> v)
+Segments = Dict[Tuple[str, str], Tuple[float, List[str]]]
+
+
+@dataclass
+class _Chain:
+    """Cadena de nodos de grado 2: nodes = [a, v1, ..., vk, b] con a, b nodos de ramificación."""
+    nodes: List[str]
+    fwd: List[float]        # fwd[i] = coste nodes[i] -> nodes[i+1] (inf si no existe)
+    bwd: List[float]        # bwd[i] = coste nodes[i+1] -> nodes[i]
+
+
+@dataclass
+class ReducedGraph:
+    """
+    Grafo reducido + contabilidad para volver al grafo original:
+    - adj: núcleo (nodos de ramificación) con super-aristas para las cadenas contraídas.
+    - segments: (u, v) -> (coste, intermedios) de cada arista del núcleo.
+    - Regiones podadas (árboles radiales / callejones sin salida) con sus aristas, para
+      consultas cuyo origen o destino cae dentro.
+    - Cadenas contraídas, para consultas cuyo origen o destino es un nodo intermedio.
+    """
+    adj: Adjacency
+    segments: Segments
+    chains: List[_Chain]
+    chain_of: Dict[str, Tuple[int, int]]                        # nodo intermedio -> (cadena, posición)
+    region_of: Dict[str, int]                                   # nodo podado -> región
+    region_out: Dict[int, List[Tuple[str, str, float]]]         # aristas con origen en la región
+    region_in: Dict[int, List[Tuple[str, str, float]]]          # aristas con destino en la región
+    stats: Dict[str, float | int] = field(default_factory=dict)
+
+    # --- consultas ---
+    def query_adjacency(self, start: str, goal: str) -> Tuple[Adjacency, Segments]:
+        """
+        Adjacency para la consulta (start, goal). Si ambos extremos son nodos del núcleo se
+        devuelve el núcleo tal cual; si no, una copia con aristas virtuales:
+        - extremo en región podada: aristas de esa región (salida para start, entrada para goal)
+        - extremo intermedio de cadena: aristas prefijo/sufijo hacia los extremos de la cadena
+        """
+        extra: Segments = {}
+
+        def add(u: str, v: str, cost: float, interior: List[str]) -> None:
+            if u == v or cost == INF:
+                return
+            best = extra.get((u, v)) or self.segments.get((u, v))
+            if best is None or cost < best[0]:
+                extra[(u, v)] = (cost, interior)
+
+        terminals: Set[str] = set()
+        if start in self.region_of:
+            for u, v, w in self.region_out[self.region_of[start]]:
+                add(u, v, w, [])
+                if v in self.chain_of:
+                    terminals.add(v)
+        if goal in self.region_of:
+            for u, v, w in self.region_in[self.region_of[goal]]:
+                add(u, v, w, [])
+                if u in self.chain_of:
+                    terminals.add(u)
+        for t in (start, goal):
+            if t in self.chain_of:
+                terminals.add(t)
+
+        by_chain: Dict[int, List[Tuple[int, str]]] = {}
+        for t in terminals:
+            cid, i = self.chain_of[t]
+            by_chain.setdefault(cid, []).append((i, t))
+
+        for cid, items in by_chain.items():
+            ch = self.chains[cid]
+            nodes, fwd, bwd = ch.nodes, ch.fwd, ch.bwd
+            a, b = nodes[0], nodes[-1]
+            for i, t in items:
+                add(t, b, sum(fwd[i:]), nodes[i + 1:-1])
+                add(t, a, sum(bwd[:i]), nodes[1:i][::-1])
+                add(a, t, sum(fwd[:i]), nodes[1:i])
+                add(b, t, sum(bwd[i:]), nodes[i + 1:-1][::-1])
+            for i, t1 in items:
+                for j, t2 in items:
+                    if i < j:
+                        add(t1, t2, sum(fwd[i:j]), nodes[i + 1:j])
+                        add(t2, t1, sum(bwd[i:j]), nodes[i + 1:j][::-1])
+
+        if not extra:
+            return self.adj, extra
+
+        q_adj: Adjacency = dict(self.adj)
+        touched: Dict[str, Dict[str, float]] = {}
+        for (u, v), (cost, _) in extra.items():
+            if u not in touched:
+                touched[u] = {x: w for x, w in self.adj.get(u, [])}
+            touched[u][v] = cost
+        for u, lst in touched.items():
+            q_adj[u] = list(lst.items())
+        return q_adj, extra
+
+    def expand_path(self, path: List[str], overlay: Optional[Segments] = None) -> List[str]:
+        """Camino del grafo reducido -> camino con todos los nodos originales."""
+        overlay = overlay or {}
+        out = [path[0]]
+        for u, v in zip(path, path[1:]):
+            seg = overlay.get((u, v)) or self.segments.get((u, v))
+            if seg is not None:
+                out.extend(seg[1])
+            out.append(v)
+        return out
+
+    def search(
+        self,
+        start: str,
+        goal: str,
+        engine: str = "dijkstra",
+        heuristic_h: Optional[Callable[[str], float]] = None,
+    ):
+        """
+        Ejecuta `engine` (astar / dijkstra / ucs) sobre el grafo reducido y devuelve su
+        resultado con el camino expandido. expanded_nodes cuenta nodos del grafo reducido.
+        """
+        q_adj, overlay = self.query_adjacency(start, goal)
+        if engine == "astar":
+            if heuristic_h is None:
+                raise ValueError("engine='astar' needs heuristic_h.")
+            res = a_star_fast(start, goal, None, heuristic_h, adj=q_adj)
+        elif engine == "dijkstra":
+            res = dijkstra(start, goal, None, adj=q_adj)
+        elif engine == "ucs":
+            res = ucs(start, goal, None, adj=q_adj)
+        else:
+            raise ValueError(f"Unknown engine: {engine}")
+        if res.path:
+            res = replace(res, path_ids=intern_path(self.expand_path(res.path, overlay)))
+        return res
+
+
+# =========================================================
+# Construcción
+# =========================================================
+def _min_edges(adj: Adjacency) -> Tuple[Dict[str, Dict[str, float]], Dict[str, Dict[str, float]]]:
+    """out[u][v] / inn[v][u] = coste mínimo entre aristas paralelas (sin bucles u->u)."""
+    out: Dict[str, Dict[str, float]] = {}
+    inn: Dict[str, Dict[str, float]] = {}
+    for u, lst in adj.items():
+        out.setdefault(u, {})
+        inn.setdefault(u, {})
+        for v, w in lst:
+            out.setdefault(v, {})
+            inn.setdefault(v, {})
+            if u == v:
+                continue
+            if w < out[u].get(v, INF):
+                out[u][v] = w
+                inn[v][u] = w
+    return out, inn
+
+
+def _prune_dead_ends(out: Dict[str, Dict[str, float]], inn: Dict[str, Dict[str, float]]) -> Set[str]:
+    """
+    Poda iterativa de nodos que no pueden ser intermedios de un camino simple:
+    sin entradas, sin salidas, o con un único vecino (hojas de árboles radiales).
+    """
+    nb = {u: set(out[u]) | set(inn[u]) for u in out}
+    out_deg = {u: len(out[u]) for u in out}
+    in_deg = {u: len(inn[u]) for u in out}
+    nb_deg = {u: len(nb[u]) for u in out}
+
+    def dead(u: str) -> bool:
+        return out_deg[u] == 0 or in_deg[u] == 0 or nb_deg[u] <= 1
+
+    pruned: Set[str] = set()
+    queue = deque(u for u in out if dead(u))
+    while queue:
+        u = queue.popleft()
+        if u in pruned or not dead(u):
+            continue
+        pruned.add(u)
+        for x in inn[u]:
+            if x not in pruned:
+                out_deg[x] -= 1
+        for x in out[u]:
+            if x not in pruned:
+                in_deg[x] -= 1
+        for x in nb[u]:
+            if x not in pruned:
+                nb_deg[x] -= 1
+                if dead(x):
+                    queue.append(x)
+    return pruned
+
+
+def reduce_graph(adj: Adjacency) -> ReducedGraph:
+    """
+    Preprocesado sobre build_adjacency:
+    1) poda de callejones sin salida (árboles radiales, nodos sin entrada/salida)
+    2) contracción de cadenas de nodos de grado 2 en super-aristas con coste acumulado
+    Los caminos óptimos entre nodos del núcleo no cambian de coste.
+    """
+    t0 = time.perf_counter()
+    out, inn = _min_edges(adj)
+    pruned = _prune_dead_ends(out, inn)
+
+    # --- regiones podadas (componentes conexas no dirigidas) y sus aristas ---
+    region_of: Dict[str, int] = {}
+    n_regions = 0
+    for root in sorted(pruned):
+        if root in region_of:
+            continue
+        rid = n_regions
+        n_regions += 1
+        region_of[root] = rid
+        stack = [root]
+        while stack:
+            u = stack.pop()
+            for x in list(out[u]) + list(inn[u]):
+                if x in pruned and x not in region_of:
+                    region_of[x] = rid
+                    stack.append(x)
+    region_out: Dict[int, List[Tuple[str, str, float]]] = {r: [] for r in range(n_regions)}
+    region_in: Dict[int, List[Tuple[str, str, float]]] = {r: [] for r in range(n_regions)}
+    for u, lst in out.items():
+        for v, w in lst.items():
+            if u in region_of:
+                region_out[region_of[u]].append((u, v, w))
+            if v in region_of:
+                region_in[region_of[v]].append((u, v, w))
+
+    # --- núcleo: nodos de ramificación y cadenas de grado 2 ---
+    core = [u for u in out if u not in pruned]
+    core_nb = {u: {x for x in set(out[u]) | set(inn[u]) if x not in pruned} for u in core}
+    branch = {u for u in core if len(core_nb[u]) != 2}
+
+    chains: List[_Chain] = []
+    chain_of: Dict[str, Tuple[int, int]] = {}
+
+    def walk(a: str, first: str) -> None:
+        nodes = [a]
+        prev, cur = a, first
+        while cur not in branch:
+            nodes.append(cur)
+            (nxt,) = core_nb[cur] - {prev}
+            prev, cur = cur, nxt
+        nodes.append(cur)
+        cid = len(chains)
+        for i, v in enumerate(nodes[1:-1], start=1):
+            chain_of[v] = (cid, i)
+        chains.append(_Chain(
+            nodes=nodes,
+            fwd=[out[nodes[i]].get(nodes[i + 1], INF) for i in range(len(nodes) - 1)],
+            bwd=[out[nodes[i + 1]].get(nodes[i], INF) for i in range(len(nodes) - 1)],
+        ))
+
+    def walk_from(a: str) -> None:
+        for x in sorted(core_nb[a]):
+            if x not in branch and x not in chain_of:
+                walk(a, x)
+
+    for a in sorted(branch):
+        walk_from(a)
+    # anillos sin ramificación: un nodo cualquiera hace de ancla
+    for u in core:
+        if u not in branch and u not in chain_of:
+            branch.add(u)
+            walk_from(u)
+
+    # --- segmentos del núcleo ---
+    segments: Segments = {}
+
+    def put(u: str, v: str, cost: float, interior: List[str]) -> None:
+        if u != v and cost < segments.get((u, v), (INF, []))[0]:
+            segments[(u, v)] = (cost, interior)
+
+    for u in branch:
+        for v, w in out[u].items():
+            if v in branch:
+                put(u, v, w, [])
+    for ch in chains:
+        put(ch.nodes[0], ch.nodes[-1], sum(ch.fwd), ch.nodes[1:-1])
+        put(ch.nodes[-1], ch.nodes[0], sum(ch.bwd), ch.nodes[1:-1][::-1])
+
+    red_adj: Adjacency = {u: [] for u in branch}
+    for (u, v), (cost, _) in segments.items():
+        red_adj[u].append((v, cost))
+
+    n_nodes = len(out)
+    n_edges = sum(len(lst) for lst in out.values())
+    stats: Dict[str, float | int] = {
+        "original_nodes": n_nodes,
+        "original_edges": n_edges,
+        "pruned_nodes": len(pruned),
+        "pruned_regions": n_regions,
+        "contracted_nodes": len(chain_of),
+        "chains": len(chains),
+        "reduced_nodes": len(red_adj),
+        "reduced_edges": len(segments),
+        "node_reduction": (1.0 - len(red_adj) / n_nodes) if n_nodes else 0.0,
+        "edge_reduction": (1.0 - len(segments) / n_edges) if n_edges else 0.0,
+        "preprocess_ms": (time.perf_counter() - t0) * 1000.0,
+    }
+    return ReducedGraph(
+        adj=red_adj,
+        segments=segments,
+        chains=chains,
+        chain_of=chain_of,
+        region_of=region_of,
+        region_out=region_out,
+        region_in=region_in,
+        stats=stats,
+    )
+
+
+def reduce_dataframe(distance_df: pd.DataFrame) -> ReducedGraph:
+    return reduce_graph(build_adjacency(distance_df))
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .delta_stepping import DeltaSteppingEngine
+from .graph import build_csr
+from .heuristics import compute_scaling_k
+from .spatial import CoordStore, metric_distances
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# =========================================================
+# Tabla de factores por par de regiones
+# =========================================================
+@dataclass
+class RegionScaling:
+    """
+    h_g(n) = K[region(n), region(g)] * d_metric(n, g)
+
+    - region: celda de una rejilla gx x gy sobre el bounding box de las coordenadas.
+    - K (R x R): cota inferior admisible de coste / distancia para cada par de regiones,
+      nunca por debajo del k global de compute_scaling_k (que sigue siendo admisible).
+    """
+    metric: str
+    grid: Tuple[int, int]
+    k_global: float
+    K: np.ndarray                     # (R, R)
+    region: np.ndarray                # región de cada fila de `store`
+    store: CoordStore
+    stats: Dict[str, float | int] = field(default_factory=dict)
+
+    def table(self, goal: str) -> np.ndarray:
+        """h_goal para todas las filas de `store` (vectorizado)."""
+        gi = int(self.store.index_of([goal])[0])
+        return self.K[self.region, self.region[gi]] * self.store.distances_to([goal], self.metric)
+
+    def h(self, goal: str) -> Callable[[str], float]:
+        table = dict(zip(self.store.names, self.table(goal).tolist()))
+
+        def h(n: str) -> float:
+            return table[n]
+        return h
+
+
+def _regions(store: CoordStore, grid: Tuple[int, int]) -> np.ndarray:
+    gx, gy = int(grid[0]), int(grid[1])
+    lo = store.xy.min(axis=0)
+    span = np.maximum(store.xy.max(axis=0) - lo, 1e-12)
+    ij = np.floor((store.xy - lo) / span * np.array([gx, gy])).astype(np.int64)
+    ij[:, 0] = np.clip(ij[:, 0], 0, gx - 1)
+    ij[:, 1] = np.clip(ij[:, 1], 0, gy - 1)
+    return ij[:, 1] * gx + ij[:, 0]
+
+
+def _bbox_corners(xy: np.ndarray) -> np.ndarray:
+    lo, hi = xy.min(axis=0), xy.max(axis=0)
+    return np.array([[lo[0], lo[1]], [lo[0], hi[1]], [hi[0], lo[1]], [hi[0], hi[1]]])
+
+
+def _edge_arrays(distance_df: pd.DataFrame, store: CoordStore) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(fila u, fila v, coste real) de las aristas con ambos extremos con coordenadas."""
+    u = distance_df["start_node"].astype(str)
+    v = distance_df["end_node"].astype(str)
+    keep = (u.map(store.__contains__) & v.map(store.__contains__)).to_numpy()
+    return (
+        store.index_of(u[keep]),
+        store.index_of(v[keep]),
+        distance_df["real"].to_numpy(dtype=np.float64)[keep],
+    )
+
+
+def _enforce_consistency(
+    rs: RegionScaling,
+    edges: Tuple[np.ndarray, np.ndarray, np.ndarray],
+    max_iter: int = 50,
+    chunk_cells: int = 4_000_000,
+) -> int:
+    """
+    Baja K[a, b] hasta que h_g(u) <= c(u,v) + h_g(v) en todas las aristas y todos los goals g.
+    Cada pasada (vectorizada por bloques de goals) calcula, por región del origen, el mayor
+    factor que respeta las aristas violadas. Bajar una región puede romper aristas que entran
+    en ella, así que se repite hasta que no hay violaciones. El suelo k_global es consistente:
+    tras max_iter pasadas las regiones que aún violan se llevan al suelo. Devuelve las pasadas.
+    """
+    iu, iv, c = edges
+    if len(iu) == 0:
+        return 0
+    xy, region, K, kg = rs.store.xy, rs.region, rs.K, rs.k_global
+    xu, xv, ru, rv = xy[iu][:, None, :], xy[iv][:, None, :], region[iu], region[iv]
+    step = max(1, chunk_cells // len(iu))
+    R = K.shape[0]
+
+    passes = 0
+    same = (ru == rv)[:, None]
+    for b in range(R):
+        goals = np.flatnonzero(region == b)
+        if len(goals) == 0:
+            continue
+        it = 0
+        while True:
+            passes += 1
+            bound = np.full(R, np.inf)
+            for lo in range(0, len(goals), step):
+                g = xy[goals[lo:lo + step]]
+                du = metric_distances(xu, g[None, :, :], rs.metric)
+                dv = metric_distances(xv, g[None, :, :], rs.metric)
+                ku = K[ru, b][:, None]
+                kv = K[rv, b][:, None]
+                rhs = c[:, None] + kv * dv
+                viol = ku * du > rhs * (1.0 + 1e-12) + 1e-12
+                if not viol.any():
+                    continue
+                # misma región: K*du <= c + K*dv  <=>  K <= c / (du - dv)
+                need = np.where(same, c[:, None] / np.maximum(du - dv, 1e-300), rhs / np.maximum(du, 1e-300))
+                e_idx, g_idx = np.nonzero(viol)
+                np.minimum.at(bound, ru[e_idx], need[e_idx, g_idx])
+            bad = np.isfinite(bound)
+            if not bad.any():
+                break
+            new = np.maximum(kg, np.minimum(K[:, b], bound * (1.0 - 1e-12)))
+            if it >= max_iter:
+                new[bad] = kg
+            K[:, b] = new
+            it += 1
+    return passes
+
+
+def build_region_scaling(
+    distance_df: pd.DataFrame,
+    coords: Dict[str, Tuple[float, float]] | CoordStore,
+    metric: str = "euclidean",
+    grid: Tuple[int, int] = (4, 4),
+    consistent: bool = True,
+) -> RegionScaling:
+    """
+    Construye la tabla K por par de regiones (a, b):
+
+      K[a, b] = max(k_global, min_{n in a, g in b} dist(n, g) / d(n, g))
+
+    dist(·, g) sale de una búsqueda uno-a-todos hacia atrás desde cada nodo g (delta-stepping
+    sobre el grafo traspuesto), así que K es admisible por construcción para cualquier par
+    (n, g) de esas regiones. Coste del preproceso: N búsquedas + N² cocientes vectorizados;
+    pensado para redes de hasta unos miles de subestaciones.
+
+    Con consistent=True además se fuerza la consistencia sobre todas las aristas
+    (_enforce_consistency), necesaria para a_star_fast e IDA*/SMA*.
+    """
+    t0 = time.perf_counter()
+    store = coords if isinstance(coords, CoordStore) else CoordStore(coords)
+    metric = metric.lower().strip()
+    k_global = compute_scaling_k(distance_df, store, metric=metric)
+    region = _regions(store, grid)
+    R = int(grid[0]) * int(grid[1])
+    K = np.full((R, R), np.inf, dtype=np.float64)
+
+    rev = build_csr(distance_df).reversed()
+    rows = np.fromiter((rev.index.get(n, -1) for n in store.names), dtype=np.int64, count=len(store))
+    with DeltaSteppingEngine(rev) as eng:
+        for gi, g in enumerate(store.names):
+            if rows[gi] < 0:
+                continue
+            dist_map = eng.run(g).dist
+            d_to_g = np.array([dist_map.get(rev.nodes[r], np.inf) if r >= 0 else np.inf for r in rows])
+            d = metric_distances(store.xy, store.xy[gi], metric)
+            ok = np.isfinite(d_to_g) & (d > 0)
+            if not ok.any():
+                continue
+            b = region[gi]
+            np.minimum.at(K[:, b], region[ok], d_to_g[ok] / d[ok])
+    K = np.where(np.isfinite(K), np.maximum(K, k_global), k_global)
+
+    rs = RegionScaling(metric=metric, grid=(int(grid[0]), int(grid[1])), k_global=k_global,
+                       K=K, region=region, store=store)
+    used = np.unique(region)
+    k_before = float(K[np.ix_(used, used)].mean())
+    passes = _enforce_consistency(rs, _edge_arrays(distance_df, store)) if consistent else 0
+    rs.stats = {
+        "regions": R,
+        "regions_used": int(len(used)),
+        "k_global": k_global,
+        "k_mean_admissible": k_before,
+        "k_mean": float(rs.K[np.ix_(used, used)].mean()),
+        "consistency_passes": passes,
+        "build_ms": (time.perf_counter() - t0) * 1000.0,
+    }
+    return rs
+
+
+# =========================================================
+# Validador vectorizado (cualquier heurística tabulable)
+# =========================================================
+def validate_heuristic(
+    distance_df: pd.DataFrame,
+    store: CoordStore,
+    table: Callable[[str], np.ndarray],
+    goals: Optional[Sequence[str]] = None,
+    tol: float = 1e-9,
+) -> pd.DataFrame:
+    """
+    Comprueba, para cada goal, sobre todas las aristas y nodos a la vez:
+    - admisibilidad: h(n) <= dist(n, goal) (dist exacta por delta-stepping hacia atrás);
+    - consistencia: h(u) <= c(u,v) + h(v) y h(goal) == 0.
+    `table(goal)` devuelve h para las filas de `store` (p.ej. RegionScaling.table o
+    lambda g: registry.table(name, [g])). Una fila por goal con el nº de violaciones y
+    el peor exceso.
+    """
+    import pandas as pd
+
+    iu, iv, c = _edge_arrays(distance_df, store)
+    rev = build_csr(distance_df).reversed()
+    rows = np.fromiter((rev.index.get(n, -1) for n in store.names), dtype=np.int64, count=len(store))
+    out: List[Dict] = []
+    with DeltaSteppingEngine(rev) as eng:
+        for g in (goals if goals is not None else store.names):
+            h = np.asarray(table(g), dtype=np.float64)
+            dist_map = eng.run(g).dist if g in rev.index else {g: 0.0}
+            d = np.array([dist_map.get(rev.nodes[r], np.inf) if r >= 0 else np.inf for r in rows])
+            adm_excess = h - d
+            cons_excess = h[iu] - (c + h[iv])
+            gi = int(store.index_of([g])[0])
+            out.append({
+                "goal": g,
+                "admissibility_violations": int((adm_excess > tol).sum()),
+                "max_admissibility_excess": float(max(adm_excess.max(initial=0.0), 0.0)),
+                "consistency_violations": int((cons_excess > tol).sum()) + int(abs(h[gi]) > tol),
+                "max_consistency_excess": float(max(cons_excess.max(initial=0.0), 0.0)),
+                "h_mean": float(h[np.isfinite(d)].mean()) if np.isfinite(d).any() else 0.0,
+            })
+    return pd.DataFrame(out)
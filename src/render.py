@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import hashlib
+import importlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+PACKAGE = __package__ or "src"
+
+# renderer -> (módulo, función, nombre del kwarg de salida)
+RENDERERS: Dict[str, Tuple[str, str, str]] = {
+    "grouped_bar": ("plots", "_grouped_bar", "outpath"),
+    "heatmap_winners": ("plots", "_heatmap_winners", "outpath"),
+    "cost_gap": ("plots", "plot_cost_gap", "outpath"),
+    "trends": ("plots", "plot_trends", "outpath"),
+    "pareto_front": ("plots", "plot_pareto_front", "outpath"),
+    "search_tree": ("tree_viz", "draw_search_tree", "out_png"),
+}
+
+# columnas que usa cada gráfica de fase (solo esas entran en el hash)
+_RANK_COLUMNS = ["found", "expanded_nodes", "exec_time_ms_mean", "ms_per_expanded", "max_frontier"]
+
+
+# =========================================================
+# Trabajos de render
+# =========================================================
+@dataclass
+class FigureJob:
+    """
+    Una figura = renderer + kwargs (datos incluidos) + fichero de salida.
+    Se serializa tal cual hacia los workers; el renderer se resuelve allí por nombre, así que
+    el proceso principal no importa matplotlib.
+    """
+    renderer: str
+    outpath: str
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    def data_hash(self) -> str:
+        """Hash de los datos de entrada + código del módulo del renderer."""
+        mod, fn, _ = RENDERERS[self.renderer]
+        h = hashlib.sha256()
+        h.update(f"{self.renderer}:{fn}:{_module_digest(mod)}".encode("utf-8"))
+        for k in sorted(self.kwargs):
+            h.update(k.encode("utf-8"))
+            _hash_value(h, self.kwargs[k])
+        return h.hexdigest()
+
+    def render(self) -> None:
+        mod, fn, out_kw = RENDERERS[self.renderer]
+        func = getattr(importlib.import_module(f"{PACKAGE}.{mod}"), fn)
+        os.makedirs(os.path.dirname(self.outpath) or ".", exist_ok=True)
+        func(**self.kwargs, **{out_kw: self.outpath})
+
+
+def _module_digest(mod: str) -> str:
+    """Hash del fichero fuente del módulo (sin importarlo)."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{mod}.py")
+    try:
+        with open(path, "rb") as fh:
+            return hashlib.sha256(fh.read()).hexdigest()[:16]
+    except OSError:
+        return mod
+
+
+def _hash_value(h: "hashlib._Hash", v: Any) -> None:
+    if hasattr(v, "columns") and hasattr(v, "index"):          # DataFrame
+        import pandas as pd
+
+        h.update(json.dumps([str(c) for c in v.columns]).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(v, index=True).to_numpy().tobytes())
+    elif isinstance(v, dict):
+        for k in sorted(v, key=str):
+            h.update(str(k).encode("utf-8"))
+            _hash_value(h, v[k])
+    elif isinstance(v, (list, tuple)):
+        h.update(b"[")
+        for x in v:
+            _hash_value(h, x)
+        h.update(b"]")
+    else:
+        h.update(repr(v).encode("utf-8"))
+
+
+def phase_image_jobs(
+    df_all: pd.DataFrame,
+    images_dir: str,
+    label_col: str = "label",
+    title_prefix: str = "",
+) -> List[FigureJob]:
+    """Las gráficas de una fase (las de plots.generate_images), una por trabajo."""
+    p = (title_prefix + " - ") if title_prefix else ""
+    bars = [
+        ("expanded_nodes", "Nodos expandidos por caso", "01_expanded_nodes.png"),
+        ("exec_time_ms_mean", "Tiempo medio de ejecución (ms) por caso", "02_exec_time_ms_mean.png"),
+        ("ms_per_expanded", "Eficiencia: ms por nodo expandido", "03_ms_per_expanded.png"),
+        ("max_frontier", "Tamaño máximo de frontera (max_frontier)", "04_max_frontier.png"),
+    ]
+    jobs = [
+        FigureJob("grouped_bar", os.path.join(images_dir, fname), {
+            "df": df_all[["case", label_col, col]],
+            "value_col": col,
+            "title": f"{p}{title}",
+            "label_col": label_col,
+        })
+        for col, title, fname in bars
+    ]
+    jobs.append(FigureJob("heatmap_winners", os.path.join(images_dir, "05_heatmap_winners.png"), {
+        "df": df_all[["case", label_col, *_RANK_COLUMNS]],
+        "label_col": label_col,
+    }))
+    if "cost_gap" in df_all.columns:
+        jobs.append(FigureJob("cost_gap", os.path.join(images_dir, "07_cost_gap_vs_expanded.png"), {
+            "df": df_all[[label_col, "expanded_nodes", "cost_gap"]],
+            "label_col": label_col,
+            "title": f"{p}Coste extra vs nodos expandidos",
+        }))
+    return jobs
+
+
+# =========================================================
+# Cola con pool de procesos + manifiesto de hashes
+# =========================================================
+def _init_worker() -> None:
+    # backend sin ventana antes de que nadie importe pyplot
+    os.environ["MPLBACKEND"] = "Agg"
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def _run_job(job: FigureJob) -> Tuple[float, Optional[str]]:
+    t0 = time.perf_counter()
+    try:
+        job.render()
+        err = None
+    except Exception as e:  # noqa: BLE001  (una figura rota no tumba la cola)
+        err = f"{type(e).__name__}: {e}"
+    return (time.perf_counter() - t0) * 1000.0, err
+
+
+@dataclass
+class RenderReport:
+    figure: str
+    renderer: str
+    status: str                  # rendered | skipped | failed
+    render_ms: float
+    data_hash: str
+    error: Optional[str] = None
+
+
+class RenderQueue:
+    """
+    Encola figuras y las renderiza en un ProcessPoolExecutor con backend Agg.
+
+    - manifest (<manifest_path>, JSON): figura -> hash de sus datos. Una figura cuyo hash no
+      cambió y cuyo PNG sigue en disco se salta. El manifiesto se reescribe de forma atómica
+      (fichero temporal + os.replace) al terminar.
+    - workers <= 1 renderiza en el propio proceso (sin coste de arranque de workers).
+    - run() devuelve un RenderReport por figura con su tiempo de render.
+    """
+
+    def __init__(self, manifest_path: str, workers: Optional[int] = None, force: bool = False):
+        self.manifest_path = manifest_path
+        self.workers = (os.cpu_count() or 1) if workers is None else int(workers)
+        self.force = force
+        self.jobs: List[FigureJob] = []
+        self.manifest: Dict[str, Dict] = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_manifest(self) -> None:
+        os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+        tmp = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.manifest, fh, indent=1, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+    def _key(self, job: FigureJob) -> str:
+        base = os.path.dirname(os.path.abspath(self.manifest_path))
+        return os.path.relpath(os.path.abspath(job.outpath), base).replace(os.sep, "/")
+
+    def submit(self, job: FigureJob) -> None:
+        self.jobs.append(job)
+
+    def extend(self, jobs: List[FigureJob]) -> None:
+        self.jobs.extend(jobs)
+
+    def run(self) -> List[RenderReport]:
+        reports: List[RenderReport] = []
+        todo: List[Tuple[FigureJob, str, str]] = []
+        for job in self.jobs:
+            key, h = self._key(job), job.data_hash()
+            entry = self.manifest.get(key)
+            if not self.force and entry and entry.get("hash") == h and os.path.exists(job.outpath):
+                reports.append(RenderReport(key, job.renderer, "skipped", 0.0, h))
+            else:
+                todo.append((job, key, h))
+        self.jobs = []
+
+        if self.workers > 1 and len(todo) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as ex:
+                results = list(ex.map(_run_job, [j for j, _, _ in todo]))
+        else:
+            _init_worker()
+            results = [_run_job(j) for j, _, _ in todo]
+
+        for (job, key, h), (ms, err) in zip(todo, results):
+            if err is None:
+                self.manifest[key] = {"hash": h, "renderer": job.renderer, "render_ms": ms}
+            else:
+                self.manifest.pop(key, None)
+            reports.append(RenderReport(key, job.renderer, "failed" if err else "rendered", ms, h, err))
+        self._save_manifest()
+        return reports
+
+
+def reports_frame(reports: List[RenderReport]) -> pd.DataFrame:
+    import pandas as pd
+
+    return pd.DataFrame([asdict(r) for r in reports])
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import time
+import uuid
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# Esquema tipado de una fila de benchmark (run_benchmark_case_astar / _bench_algo).
+# Columnas extra (p.ej. de motores nuevos) se conservan con el tipo inferido.
+RESULT_COLUMNS: Dict[str, str] = {
+    "case": "string",
+    "start": "string",
+    "goal": "string",
+    "label": "string",
+    "kind": "string",
+    "found": "bool",
+    "exec_time_ms_mean": "float64",
+    "exec_time_ms_min": "float64",
+    "expanded_nodes": "int64",
+    "generated_nodes": "int64",
+    "max_frontier": "int64",
+    "reopen_updates": "int64",
+    "total_cost": "float64",
+    "path_length": "int64",
+    "path": "string",
+    "ms_per_expanded": "float64",
+}
+
+def _pa():
+    """pyarrow se importa solo al usar el store (dependencia pesada)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:  # pragma: no cover - depende del entorno
+        raise ImportError("ResultsStore requires pyarrow (pip install pyarrow).") from exc
+    return pa, pq
+
+
+def case_key(case: str) -> str:
+    """'A->H' -> 'A_to_H' (valor seguro como nombre de directorio)."""
+    key = case.replace("->", "_to_")
+    return re.sub(r"[^0-9A-Za-z_.\-]", "_", key)
+
+
+def new_run_id() -> str:
+    return time.strftime("%Y%m%dT%H%M%S") + "_" + uuid.uuid4().hex[:6]
+
+
+def _schema_for(df: pd.DataFrame):
+    pa, _ = _pa()
+    types = {
+        "string": pa.string(),
+        "bool": pa.bool_(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+    }
+    fields = []
+    for col in df.columns:
+        if col in RESULT_COLUMNS:
+            fields.append(pa.field(col, types[RESULT_COLUMNS[col]], nullable=True))
+        else:
+            fields.append(pa.Schema.from_pandas(df[[col]], preserve_index=False).field(col))
+    return pa.schema(fields)
+
+
+class ResultsStore:
+    """
+    Almacén columnar (Parquet) de filas de benchmark, particionado estilo hive:
+
+        <root>/run=<run>/phase=<phase>/case_key=<A_to_H>/part-<ns>-<id>.parquet
+
+    - append(): escribe cada fila una sola vez (un fichero por partición tocada).
+    - read(): lee con filtros por partición y selección de columnas.
+    - export(): vistas CSV/XLSX bajo demanda, con el mismo formato que antes.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    # --- escritura ---
+    def append(self, df: pd.DataFrame, run: str, phase: str) -> List[str]:
+        pa, pq = _pa()
+        if df.empty:
+            return []
+        written = []
+        for case, part in df.groupby("case", sort=False):
+            d = os.path.join(self.root, f"run={run}", f"phase={phase}", f"case_key={case_key(str(case))}")
+            os.makedirs(d, exist_ok=True)
+            part = part.reset_index(drop=True)
+            table = pa.Table.from_pandas(part, schema=_schema_for(part), preserve_index=False)
+            # prefijo temporal: al leer se respeta el orden de inserción
+            out = os.path.join(d, f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet")
+            pq.write_table(table, out)
+            written.append(out)
+        return written
+
+    # --- lectura ---
+    def partitions(self, run: Optional[str] = None, phase: Optional[str] = None) -> Iterator[Tuple[str, str, str, str]]:
+        """(run, phase, case_key, dir) de cada partición existente."""
+        for r in sorted(os.listdir(self.root)):
+            if not r.startswith("run=") or (run is not None and r != f"run={run}"):
+                continue
+            rdir = os.path.join(self.root, r)
+            for p in sorted(os.listdir(rdir)):
+                if not p.startswith("phase=") or (phase is not None and p != f"phase={phase}"):
+                    continue
+                pdir = os.path.join(rdir, p)
+                for c in sorted(os.listdir(pdir)):
+                    if c.startswith("case_key="):
+                        yield r[4:], p[6:], c[9:], os.path.join(pdir, c)
+
+    def runs(self) -> List[str]:
+        return sorted({r for r, _, _, _ in self.partitions()})
+
+    @staticmethod
+    def _files(path: str) -> List[str]:
+        return sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith(".parquet"))
+
+    def read_partition(self, path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        pa, pq = _pa()
+        files = self._files(path)
+        if not files:
+            return pd.DataFrame(columns=list(columns) if columns else None)
+        tables = [pq.read_table(f, columns=list(columns) if columns else None) for f in files]
+        return pa.concat_tables(tables, promote_options="default").to_pandas()
+
+    def read(
+        self,
+        run: Optional[str] = None,
+        phase: Optional[str] = None,
+        cases: Optional[Sequence[str]] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> pd.DataFrame:
+        """Filas en orden de inserción; con columns=None añade las columnas run y phase."""
+        pa, pq = _pa()
+        wanted = {case_key(c) for c in cases} if cases is not None else None
+        files: List[Tuple[str, str, str]] = []
+        for r, p, ck, path in self.partitions(run, phase):
+            if wanted is None or ck in wanted:
+                files.extend((f, r, p) for f in self._files(path))
+        if not files:
+            return pd.DataFrame(columns=list(columns) if columns else None)
+
+        files.sort(key=lambda t: os.path.basename(t[0]))
+        tables = []
+        for f, r, p in files:
+            t = pq.read_table(f, columns=list(columns) if columns else None)
+            if columns is None:
+                t = t.add_column(0, "phase", pa.array([p] * t.num_rows, pa.string()))
+                t = t.add_column(0, "run", pa.array([r] * t.num_rows, pa.string()))
+            tables.append(t)
+        return pa.concat_tables(tables, promote_options="default").to_pandas()
+
+    # --- vistas ---
+    def export(
+        self,
+        run: str,
+        phase: str,
+        out_dir: str,
+        formats: Sequence[str] = ("csv", "xlsx"),
+        per_case: bool = False,
+    ) -> List[str]:
+        """
+        Genera benchmark_all_cases.<fmt> (y benchmark_<s>_to_<g>.<fmt> si per_case)
+        a partir del store. CSV con ';' y coma decimal, como el resto del proyecto.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        df = self.read(run=run, phase=phase).drop(columns=["run", "phase"])
+        if df.empty:
+            return []
+
+        views: List[Tuple[str, pd.DataFrame]] = [("benchmark_all_cases", df)]
+        if per_case:
+            for (s, g), d in df.groupby(["start", "goal"], sort=False):
+                views.append((f"benchmark_{s}_to_{g}", d))
+
+        written = []
+        for name, d in views:
+            for fmt in formats:
+                out = os.path.join(out_dir, f"{name}.{fmt}")
+                if fmt == "csv":
+                    d.to_csv(out, sep=";", decimal=",", index=False, encoding="utf-8-sig")
+                elif fmt == "xlsx":
+                    d.to_excel(out, index=False)
+                else:
+                    raise ValueError(f"Unknown export format: {fmt}")
+                written.append(out)
+        return written
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Exporta vistas CSV/XLSX desde el ResultsStore.")
+    ap.add_argument("--root", required=True)
+    ap.add_argument("--run", default=None, help="por defecto, el último run")
+    ap.add_argument("--phase", required=True)
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--formats", nargs="+", default=["csv", "xlsx"])
+    ap.add_argument("--per-case", action="store_true")
+    args = ap.parse_args(argv)
+
+    store = ResultsStore(args.root)
+    run = args.run or (store.runs()[-1] if store.runs() else None)
+    if run is None:
+        raise SystemExit("No runs in store.")
+    for path in store.export(run, args.phase, args.out, formats=args.formats, per_case=args.per_case):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
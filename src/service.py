@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from typing import TYPE_CHECKING, Callable, Deque, Dict, List, Optional, Tuple
+
+from .algorithms import Adjacency, SearchLimits, a_star_fast, build_adjacency, dijkstra, ucs
+from .heuristics import Coords, HeuristicRegistry
+from .reachability import ReachabilityIndex
+from .spatial import CoordStore
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+ENGINES = ("astar", "dijkstra", "ucs")
+
+
+# =========================================================
+# Estado de consulta: uno por servicio (hilos) o por worker (procesos)
+# =========================================================
+QueryResult = Tuple[bool, Optional[float], Optional[List[str]], Dict[str, float | int], Optional[Dict]]
+
+# Solo lo usan los workers de un ProcessPoolExecutor (un servicio por proceso hijo)
+_STATE: Dict[str, object] = {}
+
+
+def _make_state(
+    adj: Adjacency,
+    coords: Coords,
+    metric: str,
+    k: float,
+    h_cache_size: int,
+    reach: Optional[ReachabilityIndex] = None,
+    limits: Optional[SearchLimits] = None,
+) -> Dict[str, object]:
+    """Grafo, índice de alcanzabilidad, límites y constantes de la heurística, construidos una vez."""
+    return {
+        "adj": adj,
+        "reach": reach,
+        "limits": limits,
+        "coords": CoordStore(coords),
+        "metric": metric,
+        "k": k,
+        "h_cache_size": h_cache_size,
+        "h_tables": {},
+    }
+
+
+def _init_worker(*args) -> None:
+    """initializer del pool de procesos: carga el estado en el global del worker."""
+    _STATE.clear()
+    _STATE.update(_make_state(*args))
+
+
+def _h_table(state: Dict[str, object], goal: str) -> Dict[str, float]:
+    """Tabla h(n) para `goal`, calculada una vez y cacheada (FIFO acotada)."""
+    tables: Dict[str, Dict[str, float]] = state["h_tables"]  # type: ignore[assignment]
+    table = tables.get(goal)
+    if table is None:
+        store: CoordStore = state["coords"]  # type: ignore[assignment]
+        k = float(state["k"])  # type: ignore[arg-type]
+        table = dict(zip(store.names, (k * store.distances_to([goal], str(state["metric"]))).tolist()))
+        if tables and len(tables) >= int(state["h_cache_size"]):  # type: ignore[arg-type]
+            tables.pop(next(iter(tables)), None)
+        tables[goal] = table
+    return table
+
+
+def _run_query(state: Dict[str, object], start: str, goal: str, engine: str) -> QueryResult:
+    adj: Adjacency = state["adj"]  # type: ignore[assignment]
+    reach: Optional[ReachabilityIndex] = state.get("reach")  # type: ignore[assignment]
+    limits: Optional[SearchLimits] = state.get("limits")  # type: ignore[assignment]
+    if limits is not None and engine != "astar" and limits.goal_distance is None:
+        # closest_node del resultado parcial: la tabla h del estado (cacheada por goal)
+        table_g = _h_table(state, goal)
+        limits = replace(limits, goal_distance=lambda n: table_g.get(n, 0.0))
+    if engine == "astar":
+        # sin camino: ni siquiera se calcula la tabla h del destino
+        table = _h_table(state, goal) if reach is None or reach.reachable(start, goal) else {}
+        res = a_star_fast(start, goal, None, lambda n: table.get(n, 0.0), adj=adj, reach=reach, limits=limits)
+    elif engine == "dijkstra":
+        res = dijkstra(start, goal, None, adj=adj, reach=reach, limits=limits)
+    else:
+        res = ucs(start, goal, None, adj=adj, reach=reach, limits=limits)
+    partial = asdict(res.partial) if res.partial is not None else None
+    return res.found, res.total_cost, res.path, res.stats.to_dict(), partial
+
+
+def _run_query_worker(start: str, goal: str, engine: str) -> QueryResult:
+    """Tarea de un worker de procesos: consulta sobre el estado cargado por _init_worker."""
+    return _run_query(_STATE, start, goal, engine)
+
+
+# =========================================================
+# Servicio
+# =========================================================
+@dataclass
+class RouteResponse:
+    found: bool
+    start: str
+    goal: str
+    engine: str
+    path: Optional[List[str]]
+    total_cost: Optional[float]
+    stats: Dict[str, float | int]
+    latency_ms: float
+    coalesced: bool
+    partial: Optional[Dict] = None     # PartialResult (como dict) si se agotó SearchLimits
+
+
+class RoutingService:
+    """
+    Front-end asyncio para consultas de ruta:
+    - Grafo (adjacency) y constantes de la heurística residentes en cada worker (procesos)
+      o en el propio servicio (hilos): dos servicios en el mismo proceso no se pisan.
+    - Índice de alcanzabilidad (SCC): los pares sin camino se responden en O(1).
+    - `limits` (SearchLimits) acota cada consulta: al agotarse se responde best-effort (partial).
+    - Las búsquedas se despachan a un pool (procesos por defecto, hilos para tests).
+    - Peticiones idénticas en vuelo (start, goal, engine) se funden en un único cálculo.
+    - metrics(): contadores de throughput y latencia.
+    """
+
+    def __init__(
+        self,
+        distance_df: pd.DataFrame,
+        coords: Coords,
+        heuristic: str = "manhattan_scaled",
+        fcc_min: float = 2.0,
+        workers: Optional[int] = None,
+        executor_kind: str = "process",
+        h_cache_size: int = 256,
+        latency_window: int = 10_000,
+        limits: Optional[SearchLimits] = None,
+    ):
+        heuristic = HeuristicRegistry.canonical(heuristic)
+        ms = HeuristicRegistry(distance_df, coords, fcc_min=fcc_min).metric_scale(heuristic)
+        if ms is None:
+            raise ValueError(f"Heuristic '{heuristic}' is not a scaled coordinate metric.")
+        metric, k = ms
+
+        executor_kind = executor_kind.lower().strip()
+        if executor_kind not in {"process", "thread"}:
+            raise ValueError(f"executor_kind must be process/thread, got {executor_kind}")
+
+        self.heuristic = heuristic
+        adj = build_adjacency(distance_df)
+        self.reach = ReachabilityIndex(adj)
+        self._init_args = (adj, coords, metric, k, h_cache_size, self.reach, limits)
+        self._workers = workers
+        self._executor_kind = executor_kind
+        self._pool: Optional[Executor] = None
+        self._query: Optional[Callable[[str, str, str], QueryResult]] = None
+
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self._counters: Dict[str, int] = {
+            "requests": 0,
+            "computations": 0,
+            "coalesced": 0,
+            "completed": 0,
+            "errors": 0,
+            "partial": 0,
+        }
+        self._t_started: Optional[float] = None
+
+    # --- ciclo de vida ---
+    async def start(self) -> None:
+        if self._pool is not None:
+            return
+        if self._executor_kind == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._workers, initializer=_init_worker, initargs=self._init_args
+            )
+            self._query = _run_query_worker
+        else:
+            # hilos: el estado es de esta instancia y viaja con la tarea
+            self._query = functools.partial(_run_query, _make_state(*self._init_args))
+            self._pool = ThreadPoolExecutor(max_workers=self._workers)
+        self._t_started = time.perf_counter()
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.get_running_loop().run_in_executor(None, pool.shutdown)
+
+    async def __aenter__(self) -> "RoutingService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    # --- consultas ---
+    async def route(self, start: str, goal: str, engine: str = "astar") -> RouteResponse:
+        engine = engine.lower().strip()
+        if engine not in ENGINES:
+            raise ValueError(f"engine must be one of {ENGINES}, got {engine}")
+        if self._pool is None:
+            await self.start()
+
+        t0 = time.perf_counter()
+        self._counters["requests"] += 1
+        key = (start, goal, engine)
+
+        fut = self._inflight.get(key)
+        coalesced = fut is not None
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = loop.run_in_executor(self._pool, self._query, start, goal, engine)
+            self._counters["computations"] += 1
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda _f, key=key: self._inflight.pop(key, None))
+        else:
+            self._counters["coalesced"] += 1
+
+        try:
+            found, cost, path, stats, partial = await asyncio.shield(fut)
+        except Exception:
+            self._counters["errors"] += 1
+            raise
+
+        latency_ms = (time.perf_counter() - t0) * 1000.0
+        self._latencies.append(latency_ms)
+        self._counters["completed"] += 1
+        if partial is not None:
+            self._counters["partial"] += 1
+        return RouteResponse(
+            found=found,
+            start=start,
+            goal=goal,
+            engine=engine,
+            path=list(path) if path else None,
+            total_cost=cost,
+            stats=dict(stats),
+            latency_ms=latency_ms,
+            coalesced=coalesced,
+            partial=partial,
+        )
+
+    def metrics(self) -> Dict[str, float | int]:
+        """Contadores + latencia (ms) sobre la ventana reciente + throughput (req/s)."""
+        out: Dict[str, float | int] = dict(self._counters)
+        out["inflight"] = len(self._inflight)
+        lat = sorted(self._latencies)
+        if lat:
+            out["latency_ms_mean"] = sum(lat) / len(lat)
+            out["latency_ms_p50"] = lat[len(lat) // 2]
+            out["latency_ms_p95"] = lat[min(len(lat) - 1, int(0.95 * len(lat)))]
+            out["latency_ms_max"] = lat[-1]
+        if self._t_started is not None:
+            elapsed = time.perf_counter() - self._t_started
+            out["throughput_rps"] = (self._counters["completed"] / elapsed) if elapsed > 0 else 0.0
+        return out
+
+
+class LocalClient:
+    """Cliente en el mismo proceso (sin red), útil para tests y scripts."""
+
+    def __init__(self, service: RoutingService):
+        self.service = service
+
+    async def route(self, start: str, goal: str, engine: str = "astar") -> RouteResponse:
+        return await self.service.route(start, goal, engine)
+
+    async def route_many(self, queries: List[Tuple[str, str, str]]) -> List[RouteResponse]:
+        return list(await asyncio.gather(*(self.route(s, g, e) for s, g, e in queries)))
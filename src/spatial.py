@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+METRICS = ("euclidean", "manhattan", "chebyshev")
+
+
+# =========================================================
+# Distancias vectorizadas
+# =========================================================
+def metric_distances(a: np.ndarray, b: np.ndarray, metric: str) -> np.ndarray:
+    """Distancias elemento a elemento entre a (...,2) y b (...,2); admite broadcasting."""
+    diff = np.abs(a - b)
+    if metric == "euclidean":
+        return np.hypot(diff[..., 0], diff[..., 1])
+    if metric == "manhattan":
+        return diff.sum(axis=-1)
+    if metric == "chebyshev":
+        return diff.max(axis=-1)
+    raise ValueError(f"metric must be one of manhattan/chebyshev/euclidean, got {metric}")
+
+
+def pairwise_distances(a: np.ndarray, b: np.ndarray, metric: str) -> np.ndarray:
+    """Distancias (N,M) entre puntos a (N,2) y b (M,2) con la métrica dada."""
+    return metric_distances(a[:, None, :], b[None, :, :], metric)
+
+
+def _as_points(points) -> np.ndarray:
+    return np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+
+# =========================================================
+# Almacén de coordenadas con índice de rejilla
+# =========================================================
+class CoordStore:
+    """
+    Coordenadas de subestaciones en arrays NumPy + índice de rejilla uniforme:
+    - names[i] <-> xy[i]; index_of / xy_of traducen nombres a filas.
+    - Rejilla: cada punto cae en una celda de lado `cell_size`; los ids de punto se guardan
+      ordenados por celda (estilo CSR: cell_start[c]:cell_start[c+1]).
+    - nearest / within: consultas por lotes. Cada consulta solo visita las celdas cercanas;
+      con pocos nodos (<= brute_threshold) se resuelve todo con una matriz de distancias.
+
+    Las cotas de parada usan el hueco por eje hasta el borde de las celdas visitadas,
+    válido para las tres métricas (todas son >= |dx| y >= |dy|).
+    """
+
+    def __init__(
+        self,
+        coords: Mapping[str, Tuple[float, float]],
+        cell_size: Optional[float] = None,
+        points_per_cell: float = 2.0,
+        brute_threshold: int = 64,
+    ):
+        self.names: List[str] = list(coords)
+        self.xy: np.ndarray = _as_points([coords[n] for n in self.names]) if self.names else np.empty((0, 2))
+        self._pos: Dict[str, int] = {n: i for i, n in enumerate(self.names)}
+        self.brute_threshold = int(brute_threshold)
+        self._build_grid(cell_size, points_per_cell)
+
+    @classmethod
+    def from_arrays(cls, names: Sequence[str], xy: np.ndarray, **kwargs) -> "CoordStore":
+        xy = _as_points(xy)
+        return cls({str(n): (float(x), float(y)) for n, (x, y) in zip(names, xy)}, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, node: str) -> bool:
+        return node in self._pos
+
+    def as_dict(self) -> Dict[str, Tuple[float, float]]:
+        return {n: (float(x), float(y)) for n, (x, y) in zip(self.names, self.xy)}
+
+    # --- rejilla ---
+    def _build_grid(self, cell_size: Optional[float], points_per_cell: float) -> None:
+        n = len(self.names)
+        if n == 0:
+            self.origin = np.zeros(2)
+            self.cell_size = 1.0
+            self.shape = (1, 1)
+            self._cell_order = np.empty(0, dtype=np.int64)
+            self._cell_start = np.zeros(2, dtype=np.int64)
+            return
+
+        lo = self.xy.min(axis=0)
+        span = np.maximum(self.xy.max(axis=0) - lo, 1e-12)
+        if cell_size is None:
+            # ~points_per_cell puntos por celda en media
+            cell_size = float(np.sqrt(span[0] * span[1] * points_per_cell / n)) or float(span.max())
+            cell_size = max(cell_size, float(span.max()) / 4096.0)
+        self.origin = lo
+        self.cell_size = float(cell_size)
+        nx_, ny_ = (np.floor(span / self.cell_size).astype(np.int64) + 1).tolist()
+        self.shape = (int(nx_), int(ny_))
+
+        cell = self._cell_ids(self.xy)
+        self._cell_order = np.argsort(cell, kind="stable")
+        counts = np.bincount(cell, minlength=self.shape[0] * self.shape[1])
+        self._cell_start = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+    def _cell_coords(self, pts: np.ndarray) -> np.ndarray:
+        """(ix, iy) de cada punto, recortado a la rejilla."""
+        ij = np.floor((pts - self.origin) / self.cell_size).astype(np.int64)
+        ij[:, 0] = np.clip(ij[:, 0], 0, self.shape[0] - 1)
+        ij[:, 1] = np.clip(ij[:, 1], 0, self.shape[1] - 1)
+        return ij
+
+    def _cell_ids(self, pts: np.ndarray) -> np.ndarray:
+        ij = self._cell_coords(pts)
+        return ij[:, 1] * self.shape[0] + ij[:, 0]
+
+    def _block(self, x0: int, x1: int, y0: int, y1: int) -> np.ndarray:
+        """Ids de punto en las celdas [x0..x1] x [y0..y1] (ya recortadas)."""
+        parts = []
+        nx_ = self.shape[0]
+        start = self._cell_start
+        for iy in range(y0, y1 + 1):
+            a = start[iy * nx_ + x0]
+            b = start[iy * nx_ + x1 + 1]
+            if b > a:
+                parts.append(self._cell_order[a:b])
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    # --- nombres <-> filas ---
+    def index_of(self, nodes: Iterable[str]) -> np.ndarray:
+        """Fila de cada nodo (KeyError si alguno no tiene coordenadas)."""
+        return np.fromiter((self._pos[n] for n in nodes), dtype=np.int64)
+
+    def xy_of(self, nodes: Iterable[str]) -> np.ndarray:
+        return self.xy[self.index_of(nodes)]
+
+    # --- consultas ---
+    def nearest(self, points, k: int = 1, metric: str = "euclidean") -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k vecinos más cercanos de cada punto de `points` (M,2).
+        Devuelve (idx (M,k), dist (M,k)) ordenados por distancia; si hay menos de k nodos
+        se rellena con idx=-1, dist=inf.
+        """
+        q = _as_points(points)
+        m, n = len(q), len(self.names)
+        idx = np.full((m, k), -1, dtype=np.int64)
+        dist = np.full((m, k), np.inf)
+        if m == 0 or n == 0 or k <= 0:
+            return idx, dist
+        kk = min(k, n)
+
+        if n <= self.brute_threshold:
+            d = pairwise_distances(q, self.xy, metric)
+            part = np.argsort(d, axis=1, kind="stable")[:, :kk]
+            idx[:, :kk] = part
+            dist[:, :kk] = np.take_along_axis(d, part, axis=1)
+            return idx, dist
+
+        cells = self._cell_coords(q)
+        nx_, ny_ = self.shape
+        x_lo_edge = self.origin[0]
+        y_lo_edge = self.origin[1]
+        cs = self.cell_size
+        for i in range(m):
+            cx, cy = int(cells[i, 0]), int(cells[i, 1])
+            px, py = float(q[i, 0]), float(q[i, 1])
+            cand = np.empty(0, dtype=np.int64)
+            r = 0
+            while True:
+                x0, x1 = max(cx - r, 0), min(cx + r, nx_ - 1)
+                y0, y1 = max(cy - r, 0), min(cy + r, ny_ - 1)
+                if r == 0:
+                    new = self._block(x0, x1, y0, y1)
+                else:
+                    # solo el anillo r (las celdas interiores ya se vieron)
+                    ring = []
+                    if cy - r >= 0:
+                        ring.append(self._block(x0, x1, cy - r, cy - r))
+                    if cy + r <= ny_ - 1:
+                        ring.append(self._block(x0, x1, cy + r, cy + r))
+                    yi0, yi1 = max(cy - r + 1, 0), min(cy + r - 1, ny_ - 1)
+                    if yi0 <= yi1:
+                        if cx - r >= 0:
+                            ring.append(self._block(cx - r, cx - r, yi0, yi1))
+                        if cx + r <= nx_ - 1:
+                            ring.append(self._block(cx + r, cx + r, yi0, yi1))
+                    new = np.concatenate(ring) if ring else np.empty(0, dtype=np.int64)
+                if len(new):
+                    cand = np.concatenate((cand, new))
+
+                covers = x0 == 0 and y0 == 0 and x1 == nx_ - 1 and y1 == ny_ - 1
+                if len(cand) >= kk:
+                    d = metric_distances(q[i], self.xy[cand], metric)
+                    kth = np.partition(d, kk - 1)[kk - 1]
+                    # hueco mínimo hasta cualquier punto fuera del bloque visitado
+                    gaps = [np.inf]
+                    if x0 > 0:
+                        gaps.append(px - (x_lo_edge + x0 * cs))
+                    if x1 < nx_ - 1:
+                        gaps.append(x_lo_edge + (x1 + 1) * cs - px)
+                    if y0 > 0:
+                        gaps.append(py - (y_lo_edge + y0 * cs))
+                    if y1 < ny_ - 1:
+                        gaps.append(y_lo_edge + (y1 + 1) * cs - py)
+                    if covers or kth <= min(gaps):
+                        order = np.argsort(d, kind="stable")[:kk]
+                        idx[i, :kk] = cand[order]
+                        dist[i, :kk] = d[order]
+                        break
+                r += 1
+        return idx, dist
+
+    def snap(self, points, metric: str = "euclidean") -> List[Optional[str]]:
+        """Subestación más cercana a cada punto de campo."""
+        idx, _ = self.nearest(points, k=1, metric=metric)
+        return [self.names[i] if i >= 0 else None for i in idx[:, 0]]
+
+    def within(self, points, radius: float, metric: str = "euclidean") -> List[np.ndarray]:
+        """Para cada punto, filas de los nodos a distancia <= radius, ordenadas por distancia."""
+        q = _as_points(points)
+        out: List[np.ndarray] = []
+        if len(self.names) == 0:
+            return [np.empty(0, dtype=np.int64) for _ in range(len(q))]
+
+        if len(self.names) <= self.brute_threshold:
+            d = pairwise_distances(q, self.xy, metric)
+            for row in d:
+                hit = np.flatnonzero(row <= radius)
+                out.append(hit[np.argsort(row[hit], kind="stable")])
+            return out
+
+        lo = self._cell_coords(q - radius)
+        hi = self._cell_coords(q + radius)
+        for i in range(len(q)):
+            cand = self._block(int(lo[i, 0]), int(hi[i, 0]), int(lo[i, 1]), int(hi[i, 1]))
+            d = metric_distances(q[i], self.xy[cand], metric)
+            keep = d <= radius
+            cand, d = cand[keep], d[keep]
+            out.append(cand[np.argsort(d, kind="stable")])
+        return out
+
+    def nodes_within(self, point, radius: float, metric: str = "euclidean") -> List[str]:
+        """Nodos dentro del radio (p.ej. zona de un corte) alrededor de un punto."""
+        return [self.names[i] for i in self.within([point], radius, metric)[0]]
+
+    # --- tablas para heurísticas ---
+    def distances_to(self, goals: Sequence[str], metric: str, chunk: int = 4096) -> np.ndarray:
+        """
+        d(n) = min_{g in goals} d_metric(n, g) para todas las filas (N,).
+        Base de las tablas h = k * d de HeuristicRegistry y del servicio.
+        """
+        gxy = self.xy_of(goals)
+        out = np.empty(len(self.names), dtype=np.float64)
+        if len(gxy) == 1:
+            out[:] = metric_distances(self.xy, gxy[0], metric)
+            return out
+        for lo in range(0, len(self.names), chunk):
+            out[lo:lo + chunk] = pairwise_distances(self.xy[lo:lo + chunk], gxy, metric).min(axis=1)
+        return out
+
+    def edge_lengths(self, u: Iterable[str], v: Iterable[str], metric: str) -> np.ndarray:
+        """d_metric(u_i, v_i) para listas paralelas de extremos (aristas)."""
+        return metric_distances(self.xy_of(u), self.xy_of(v), metric)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+PACKAGE = __package__ or "src"
+
+# Módulos pesados cuya carga se registra en cada escenario
+HEAVY_MODULES = ("pandas", "matplotlib", "networkx", "pydot")
+
+# escenario -> (imports, carga del grafo, primera consulta); `adj`, CSV, S y G quedan definidos
+SCENARIOS: Dict[str, tuple] = {
+    # solo motores + lector csv: sin pandas ni matplotlib
+    "core": (
+        "from {pkg}.graph import read_edges_csv\nfrom {pkg}.algorithms import dijkstra",
+        "adj = read_edges_csv(CSV)",
+        "dijkstra(S, G, None, adj=adj)",
+    ),
+    # mismo camino, pero cargando el grafo con pandas
+    "core_pandas": (
+        "import pandas as pd\nfrom {pkg}.algorithms import build_adjacency, dijkstra",
+        "df = pd.read_csv(CSV, delimiter=';')\ndf['real'] = df['dist_km'] * df['FCC']\nadj = build_adjacency(df)",
+        "dijkstra(S, G, None, adj=adj)",
+    ),
+    # import del módulo de benchmarks (pandas solo al pedir un DataFrame)
+    "benchmark": (
+        "from {pkg}.graph import read_edges_csv\nfrom {pkg}.benchmark import dijkstra",
+        "adj = read_edges_csv(CSV)",
+        "dijkstra(S, G, None, adj=adj)",
+    ),
+    # import de main: pandas sí (lee el CSV), figuras no (se importan dentro de main())
+    "main": (
+        "import {pkg}.main\nfrom {pkg}.graph import read_edges_csv\nfrom {pkg}.algorithms import dijkstra",
+        "adj = read_edges_csv(CSV)",
+        "dijkstra(S, G, None, adj=adj)",
+    ),
+    # stack completo de main con las figuras (lo que se pagaba antes en cualquier consulta)
+    "full_stack": (
+        "import {pkg}.main\nimport {pkg}.plots\nimport {pkg}.tree_viz\nfrom {pkg}.graph import read_edges_csv\n"
+        "from {pkg}.algorithms import dijkstra",
+        "adj = read_edges_csv(CSV)",
+        "dijkstra(S, G, None, adj=adj)",
+    ),
+}
+
+_TEMPLATE = """\
+import json, sys, time
+t0 = time.perf_counter()
+{imports}
+t1 = time.perf_counter()
+CSV, S, G = {csv!r}, {start!r}, {goal!r}
+{load}
+t2 = time.perf_counter()
+{query}
+t3 = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (t1 - t0) * 1000.0,
+    "load_ms": (t2 - t1) * 1000.0,
+    "first_query_ms": (t3 - t2) * 1000.0,
+    "heavy_modules": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure_cold_start(
+    scenario: str,
+    csv_path: str,
+    start: str,
+    goal: str,
+    cwd: Optional[str] = None,
+) -> Dict:
+    """
+    Un arranque en frío en un intérprete nuevo (sin caché de módulos):
+    import_ms / load_ms / first_query_ms medidos dentro del proceso y wall_ms desde fuera
+    (incluye el arranque del intérprete). heavy_modules: módulos pesados cargados al final.
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Unknown scenario: {scenario}")
+    imports, load, query = SCENARIOS[scenario]
+    code = _TEMPLATE.format(
+        imports=imports.format(pkg=PACKAGE),
+        load=load,
+        query=query,
+        csv=csv_path,
+        start=start,
+        goal=goal,
+        heavy=HEAVY_MODULES,
+    )
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True)
+    wall = (time.perf_counter() - t0) * 1000.0
+    if out.returncode != 0:
+        raise RuntimeError(f"Scenario {scenario} failed:\n{out.stderr}")
+    row = json.loads(out.stdout.strip().splitlines()[-1])
+    row["wall_ms"] = wall
+    row["heavy_modules"] = ",".join(row["heavy_modules"])
+    return {"scenario": scenario, **row}
+
+
+def benchmark_startup(
+    csv_path: str,
+    start: str,
+    goal: str,
+    scenarios: Sequence[str] = tuple(SCENARIOS),
+    repeats: int = 5,
+    cwd: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Una fila por (escenario, repetición). Los escenarios se intercalan en cada repetición para
+    que la caché de disco del SO afecte a todos por igual.
+    """
+    import pandas as pd
+
+    rows: List[Dict] = []
+    for r in range(repeats):
+        for sc in scenarios:
+            rows.append({**measure_cold_start(sc, csv_path, start, goal, cwd=cwd), "run": r})
+    return pd.DataFrame(rows)
+
+
+def summarize_startup(df: pd.DataFrame) -> pd.DataFrame:
+    """Mediana por escenario de cada tiempo (ms)."""
+    cols = ["import_ms", "load_ms", "first_query_ms", "wall_ms"]
+    out = df.groupby("scenario", sort=False)[cols].median()
+    out["heavy_modules"] = df.groupby("scenario", sort=False)["heavy_modules"].last()
+    return out.reset_index()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Arranque en frío: import + carga del grafo + primera consulta.")
+    ap.add_argument("--csv", default=os.path.join("data", "nodes_distance.csv"))
+    ap.add_argument("--start", default="A")
+    ap.add_argument("--goal", default="H")
+    ap.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--out", default=None, help="CSV con todas las repeticiones")
+    args = ap.parse_args(argv)
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    csv_path = args.csv if os.path.isabs(args.csv) else os.path.join(base_dir, args.csv)
+    df = benchmark_startup(csv_path, args.start, args.goal, args.scenarios, args.repeats, cwd=base_dir)
+    if args.out:
+        df.to_csv(args.out, index=False)
+    print(summarize_startup(df).to_string(index=False, float_format=lambda x: f"{x:.1f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from . import algorithms
+from .benchmark import (
+    ALGORITHM_ENGINES,
+    DEFAULT_SMA_MAX_NODES,
+    DEFAULT_WEIGHTS,
+    HEURISTIC_ENGINES,
+    benchmark_algorithms,
+    benchmark_heuristics,
+)
+from .heuristics import Coords, HeuristicRegistry
+from .region_scaling import build_region_scaling
+
+# Motor -> función cuyo código entra en la huella de la celda
+_ENGINE_FUNCS: Dict[str, Callable] = {
+    "astar": algorithms.a_star_fast,
+    "dijkstra": algorithms.dijkstra,
+    "ucs": algorithms.ucs,
+    "wastar": algorithms.weighted_a_star,
+    "arastar": algorithms.ara_star,
+    "idastar": algorithms.ida_star,
+    "smastar": algorithms.sma_star,
+}
+
+
+# =========================================================
+# Huellas (hash de contenido)
+# =========================================================
+def _sha(obj) -> str:
+    payload = json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _code_fingerprint(fn: Callable) -> str:
+    """
+    Hash del código fuente del módulo de fn: un cambio en cualquier helper que la función
+    llame (no solo en su cuerpo) invalida la celda.
+    """
+    try:
+        src = inspect.getsource(inspect.getmodule(fn))
+    except (OSError, TypeError):
+        src = f"{getattr(fn, '__module__', '')}.{getattr(fn, '__qualname__', repr(fn))}"
+    return hashlib.sha256(src.encode("utf-8")).hexdigest()[:16]
+
+
+def graph_hash(distance_df: pd.DataFrame, coords: Coords) -> str:
+    """Hash del grafo (aristas con coste real, en orden canónico) y de las coordenadas."""
+    edges = (
+        distance_df[["start_node", "end_node", "real"]]
+        .astype({"start_node": str, "end_node": str, "real": float})
+        .sort_values(["start_node", "end_node", "real"])
+        .to_numpy()
+        .tolist()
+    )
+    return _sha({"edges": edges, "coords": sorted((k, list(v)) for k, v in coords.items())})
+
+
+def heuristic_fingerprint(name: str, fcc_min: float, region_grid: Tuple[int, int] = (4, 4)) -> str:
+    name = HeuristicRegistry.canonical(name)
+    _, factory, metric_scale = HeuristicRegistry.spec(name)
+    parts = [_code_fingerprint(factory)]
+    if metric_scale is not None:
+        parts.append(_code_fingerprint(metric_scale))
+    payload = {"name": name, "code": parts, "fcc_min": fcc_min}
+    if name == "region_scaled":
+        # la tabla K depende de la rejilla y de region_scaling (módulo entero), no solo de la fábrica
+        parts.append(_code_fingerprint(build_region_scaling))
+        payload["region_grid"] = list(region_grid)
+    return _sha(payload)
+
+
+def cell_key(
+    phase: str,
+    ghash: str,
+    case: Tuple[str, str],
+    label: str,
+    engine: str,
+    repeats: int,
+    extra: str = "",
+) -> str:
+    """Clave de una celda de benchmark: (fase, grafo, caso, label, motor, repeats, huellas de código)."""
+    return _sha({
+        "phase": phase,
+        "graph": ghash,
+        "case": list(case),
+        "label": label,
+        "engine": engine,
+        "engine_code": _code_fingerprint(_ENGINE_FUNCS[engine]),
+        "repeats": repeats,
+        "extra": extra,
+    })
+
+
+# =========================================================
+# Caché de celdas persistente
+# =========================================================
+class CellCache:
+    """
+    Una celda terminada = un JSON <root>/<key[:2]>/<key>.json, escrito de forma atómica
+    (fichero temporal + os.replace) en cuanto la celda acaba. Un sweep que muere a la
+    mitad conserva todo lo ya calculado.
+    """
+
+    def __init__(self, root: str, enabled: bool = True):
+        self.root = root
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                row = json.load(fh)["row"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row
+
+    def put(self, key: str, row: Dict, meta: Optional[Dict] = None) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"row": row, "meta": meta or {}}, fh, default=_json_default)
+        os.replace(tmp, path)
+
+
+def _json_default(o):
+    # numpy / pandas escalares -> tipos Python
+    if hasattr(o, "item"):
+        return o.item()
+    return str(o)
+
+
+def _rows_to_df(rows: List[Dict]) -> pd.DataFrame:
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    return df.sort_values(["start", "goal", "label"]).reset_index(drop=True)
+
+
+# =========================================================
+# Sweeps reanudables
+# =========================================================
+def sweep_heuristics(
+    cases: Sequence[Tuple[str, str]],
+    heuristic_names: Sequence[str],
+    distance_df: pd.DataFrame,
+    registry: HeuristicRegistry,
+    cache: CellCache,
+    ghash: str,
+    repeats: int = 50,
+) -> pd.DataFrame:
+    """
+    Como benchmark_heuristics, pero celda a celda: solo calcula las que faltan.
+    Las filas incluyen times_ms (distribución de tiempos) para el historial de runs y
+    cached=True si la celda viene de la caché (tiempos de un run anterior, no medidos ahora).
+    """
+    rows = []
+    for s, g in cases:
+        for hn in heuristic_names:
+            key = cell_key("heuristics", ghash, (s, g), HeuristicRegistry.label(hn), "astar", repeats,
+                           extra=heuristic_fingerprint(hn, registry.fcc_min, registry.region_grid))
+            row = cache.get(key)
+            cached = row is not None and "times_ms" in row
+            if not cached:
+                row = benchmark_heuristics([(s, g)], [hn], distance_df, repeats=repeats, registry=registry,
+                                           keep_times=True).iloc[0].to_dict()
+                cache.put(key, row, meta={"phase": "heuristics", "case": [s, g], "heuristic": hn})
+            rows.append({**row, "cached": cached})
+    return _rows_to_df(rows)
+
+
+def sweep_algorithms(
+    cases: Sequence[Tuple[str, str]],
+    astar_heuristic: str,
+    distance_df: pd.DataFrame,
+    registry: HeuristicRegistry,
+    cache: CellCache,
+    ghash: str,
+    repeats: int = 50,
+    engines: Sequence[str] = ALGORITHM_ENGINES,
+    weights: Sequence[float] = DEFAULT_WEIGHTS,
+    sma_max_nodes: int = DEFAULT_SMA_MAX_NODES,
+) -> pd.DataFrame:
+    """Como benchmark_algorithms, con una celda por (caso, motor) y por peso en wastar (misma columna cached)."""
+    rows = []
+    for s, g in cases:
+        for eng in engines:
+            heuristic_based = eng in HEURISTIC_ENGINES
+            label = HeuristicRegistry.label(astar_heuristic) if heuristic_based else ""
+            extra = heuristic_fingerprint(astar_heuristic, registry.fcc_min, registry.region_grid) if heuristic_based else ""
+            # wastar: una celda por peso; arastar arranca en max(weights)
+            variants = [[w] for w in weights] if eng == "wastar" else [list(weights)]
+            for ws in variants:
+                params = {"wastar": f"|w={ws}", "arastar": f"|w={ws}", "smastar": f"|m={sma_max_nodes}"}.get(eng, "")
+                key = cell_key("algorithms", ghash, (s, g), label, eng, repeats, extra=extra + params)
+                row = cache.get(key)
+                cached = row is not None and "times_ms" in row
+                if not cached:
+                    df = benchmark_algorithms([(s, g)], distance_df, astar_heuristic, repeats=repeats,
+                                              registry=registry, engines=[eng], keep_times=True, weights=ws,
+                                              sma_max_nodes=sma_max_nodes)
+                    row = df.iloc[0].to_dict()
+                    cache.put(key, row, meta={"phase": "algorithms", "case": [s, g], "engine": eng, "weights": ws})
+                rows.append({**row, "cached": cached})
+    return _rows_to_df(rows)
@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .algorithms import AStarFastResult, DijkstraResult, SearchStats, intern_path, reconstruct_path
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+PERIOD_H = 24.0
+
+
+# =========================================================
+# Grafo con perfiles de coste dependientes del tiempo
+# =========================================================
+@dataclass
+class TimeDependentGraph:
+    """
+    Grafo dirigido cuyas aristas tienen un perfil periódico lineal a trozos de FCC:
+
+      c_e(t) = dist_km_e * FCC_e(t mod period)
+
+    Todo en arrays planos (estilo CSR):
+    - aristas salientes de i: edge ids indptr[i]:indptr[i+1]; destino dst[e], longitud dist_km[e]
+    - perfil de e: puntos (bp_t, bp_v)[prof_ptr[e]:prof_ptr[e+1]], t en horas dentro del periodo.
+      Una arista con FCC estático ocupa un solo punto.
+
+    El tiempo avanza con el propio coste: recorrer e saliendo en t dura c_e(t) / cost_rate horas
+    (cost_rate = unidades de coste real, km · FCC, recorridas por hora; sin valor por defecto:
+    con uno demasiado grande una ruta dura minutos y los perfiles horarios no cambian nada).
+    Así minimizar coste == llegar antes, y con perfiles FIFO (salir más tarde nunca hace
+    llegar antes) Dijkstra/A* dependientes del tiempo son exactos.
+    """
+    nodes: List[str]
+    index: Dict[str, int]
+    indptr: np.ndarray
+    dst: np.ndarray
+    dist_km: np.ndarray
+    prof_ptr: np.ndarray
+    bp_t: np.ndarray
+    bp_v: np.ndarray
+    cost_rate: float
+    period: float = PERIOD_H
+
+    def __post_init__(self) -> None:
+        if not self.cost_rate > 0:
+            raise ValueError(f"cost_rate must be > 0 (real cost per hour), got {self.cost_rate}")
+        # copias en listas para la evaluación escalar del bucle de búsqueda
+        self._t_lists = [self.bp_t[a:b].tolist() for a, b in zip(self.prof_ptr[:-1], self.prof_ptr[1:])]
+        self._v_lists = [self.bp_v[a:b].tolist() for a, b in zip(self.prof_ptr[:-1], self.prof_ptr[1:])]
+        self._dst_names = [self.nodes[int(j)] for j in self.dst]
+        self._dist = self.dist_km.tolist()
+
+    @property
+    def n_edges(self) -> int:
+        return int(self.dst.shape[0])
+
+    # --- construcción ---
+    @classmethod
+    def from_dataframe(
+        cls,
+        distance_df: pd.DataFrame,
+        profiles: Optional[pd.DataFrame] = None,
+        *,
+        cost_rate: float,
+        period: float = PERIOD_H,
+        check_fifo: bool = True,
+    ) -> "TimeDependentGraph":
+        """
+        distance_df: aristas (start_node, end_node, dist_km, FCC).
+        profiles (formato largo): start_node, end_node, hour, FCC. Las aristas sin perfil
+        mantienen su FCC estático. Con check_fifo=True se rechazan perfiles no FIFO.
+        cost_rate: coste real (km · FCC) recorrido por hora; fija cuánto avanza el reloj.
+        """
+        u = distance_df["start_node"].astype(str).to_numpy()
+        v = distance_df["end_node"].astype(str).to_numpy()
+        nodes = sorted(set(u).union(set(v)))
+        index = {n: i for i, n in enumerate(nodes)}
+        src = np.fromiter((index[x] for x in u), dtype=np.int64, count=len(u))
+        dst = np.fromiter((index[x] for x in v), dtype=np.int64, count=len(v))
+        dist_km = distance_df["dist_km"].to_numpy(dtype=np.float64)
+        fcc = distance_df["FCC"].to_numpy(dtype=np.float64)
+        if np.any(dist_km < 0) or np.any(fcc < 0):
+            raise ValueError("Negative edge cost is not allowed.")
+
+        # perfiles por (u, v): si hay aristas paralelas comparten perfil
+        by_edge: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
+        if profiles is not None and len(profiles):
+            p = profiles.assign(
+                start_node=profiles["start_node"].astype(str),
+                end_node=profiles["end_node"].astype(str),
+                hour=profiles["hour"].astype(float) % period,
+            ).sort_values(["start_node", "end_node", "hour"])
+            if (p["FCC"] < 0).any():
+                raise ValueError("Negative edge cost is not allowed.")
+            for (a, b), d in p.groupby(["start_node", "end_node"], sort=False):
+                d = d.drop_duplicates("hour", keep="last")
+                by_edge[(a, b)] = (d["hour"].to_numpy(dtype=np.float64), d["FCC"].to_numpy(dtype=np.float64))
+
+        order = np.argsort(src, kind="stable")
+        counts = np.zeros(len(order) + 1, dtype=np.int64)
+        ts: List[np.ndarray] = []
+        vs: List[np.ndarray] = []
+        for k, e in enumerate(order):
+            prof = by_edge.get((u[e], v[e]))
+            if prof is None:
+                prof = (np.zeros(1), fcc[e:e + 1])
+            ts.append(prof[0])
+            vs.append(prof[1])
+            counts[k + 1] = len(prof[0])
+
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=len(nodes)), out=indptr[1:])
+        tdg = cls(
+            nodes=nodes,
+            index=index,
+            indptr=indptr,
+            dst=dst[order],
+            dist_km=dist_km[order],
+            prof_ptr=np.cumsum(counts),
+            bp_t=np.concatenate(ts) if ts else np.empty(0),
+            bp_v=np.concatenate(vs) if vs else np.empty(0),
+            cost_rate=float(cost_rate),
+            period=float(period),
+        )
+        if check_fifo:
+            bad = tdg.fifo_violations()
+            if len(bad):
+                raise ValueError(f"Non-FIFO cost profile on {len(bad)} edge(s), e.g. edge {int(bad[0])}.")
+        return tdg
+
+    # --- evaluación ---
+    def edge_cost(self, e: int, t: float) -> float:
+        """c_e(t) escalar (interpolación lineal periódica)."""
+        ts, vs = self._t_lists[e], self._v_lists[e]
+        if len(ts) == 1:
+            return self._dist[e] * vs[0]
+        P = self.period
+        x = t % P
+        i = bisect_right(ts, x)
+        if i == 0:
+            t0, v0, t1, v1 = ts[-1] - P, vs[-1], ts[0], vs[0]
+        elif i == len(ts):
+            t0, v0, t1, v1 = ts[-1], vs[-1], ts[0] + P, vs[0]
+        else:
+            t0, v0, t1, v1 = ts[i - 1], vs[i - 1], ts[i], vs[i]
+        fcc = v0 + (v1 - v0) * (x - t0) / (t1 - t0)
+        return self._dist[e] * fcc
+
+    def edge_cost_batch(self, e: int, t: np.ndarray) -> np.ndarray:
+        """c_e(t) para un vector de instantes (np.interp periódico)."""
+        a, b = int(self.prof_ptr[e]), int(self.prof_ptr[e + 1])
+        fcc = np.interp(t, self.bp_t[a:b], self.bp_v[a:b], period=self.period)
+        return self.dist_km[e] * fcc
+
+    def fifo_violations(self) -> np.ndarray:
+        """
+        Aristas no FIFO: llegada(t) = t + c_e(t) / cost_rate debe ser no decreciente, es decir
+        cada tramo del perfil con pendiente dist_km * dFCC/dt >= -cost_rate (incluye el tramo
+        que cierra el periodo). Vectorizado sobre todos los tramos.
+        """
+        n_pts = np.diff(self.prof_ptr)
+        multi = np.flatnonzero(n_pts > 1)
+        if len(multi) == 0:
+            return np.empty(0, dtype=np.int64)
+        edge_of_pt = np.repeat(np.arange(self.n_edges), n_pts)
+        # siguiente punto de cada punto dentro de su perfil (el último enlaza con el primero + P)
+        nxt = np.arange(len(self.bp_t)) + 1
+        last = self.prof_ptr[1:] - 1
+        nxt[last] = self.prof_ptr[:-1]
+        dt = self.bp_t[nxt] - self.bp_t
+        dt[last] += self.period
+        dv = self.bp_v[nxt] - self.bp_v
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = self.dist_km[edge_of_pt] * dv / dt
+        bad_pt = (n_pts[edge_of_pt] > 1) & (slope < -self.cost_rate)
+        return np.unique(edge_of_pt[bad_pt])
+
+    def snapshot(self, t: float) -> pd.DataFrame:
+        """Grafo estático en el instante t (mismo formato que distance_df, con `real`)."""
+        import pandas as pd
+
+        src = np.repeat(np.arange(len(self.nodes)), np.diff(self.indptr))
+        fcc = np.array([np.interp(t, self.bp_t[a:b], self.bp_v[a:b], period=self.period)
+                        for a, b in zip(self.prof_ptr[:-1], self.prof_ptr[1:])])
+        names = np.asarray(self.nodes, dtype=object)
+        return pd.DataFrame({
+            "start_node": names[src],
+            "end_node": names[self.dst],
+            "dist_km": self.dist_km,
+            "FCC": fcc,
+            "real": self.dist_km * fcc,
+        })
+
+    def lower_bound_dataframe(self) -> pd.DataFrame:
+        """
+        Grafo estático con el FCC mínimo de cada perfil: cualquier heurística admisible y
+        consistente sobre él (HeuristicRegistry) lo es también para el grafo dependiente del tiempo.
+        """
+        df = self.snapshot(0.0)
+        fcc_min = np.minimum.reduceat(self.bp_v, self.prof_ptr[:-1]) if self.n_edges else np.empty(0)
+        df["FCC"] = fcc_min
+        df["real"] = self.dist_km * fcc_min
+        return df
+
+
+def hourly_profiles(distance_df: pd.DataFrame, factors: Sequence[float]) -> pd.DataFrame:
+    """
+    Perfiles en formato largo a partir de un factor por hora común a toda la red:
+    FCC_e(h) = FCC_e * factors[h]. Útil para curvas de carga diarias (24 valores).
+    """
+    import pandas as pd
+
+    f = np.asarray(factors, dtype=np.float64)
+    hours = np.arange(len(f), dtype=np.float64) * (PERIOD_H / len(f))
+    base = distance_df[["start_node", "end_node", "FCC"]].drop_duplicates(["start_node", "end_node"])
+    n = len(base)
+    return pd.DataFrame({
+        "start_node": np.repeat(base["start_node"].to_numpy(), len(f)),
+        "end_node": np.repeat(base["end_node"].to_numpy(), len(f)),
+        "hour": np.tile(hours, n),
+        "FCC": np.repeat(base["FCC"].to_numpy(dtype=np.float64), len(f)) * np.tile(f, n),
+    })
+
+
+# =========================================================
+# Búsqueda dependiente del tiempo
+# =========================================================
+def td_a_star(
+    tdg: TimeDependentGraph,
+    start: str,
+    goal: str,
+    depart: float = 0.0,
+    heuristic_h: Optional[Callable[[str], float]] = None,
+) -> AStarFastResult:
+    """
+    A* dependiente del tiempo (Dijkstra si heuristic_h es None) saliendo de start en `depart`
+    (horas). Al relajar u->v el coste se evalúa en el instante de llegada a u:
+    depart + g(u) / cost_rate. Con perfiles FIFO y h consistente sobre
+    tdg.lower_bound_dataframe() el resultado es óptimo.
+    Mismo contrato que a_star_fast (stats + "depart" / "arrival").
+    """
+    if start not in tdg.index or goal not in tdg.index:
+        return AStarFastResult(False, start, goal, None, None, SearchStats(depart=float(depart)))
+
+    h = heuristic_h if heuristic_h is not None else (lambda _n: 0.0)
+    INF = float("inf")
+    rate = tdg.cost_rate
+    indptr, dst_names, nodes = tdg.indptr, tdg._dst_names, tdg.nodes
+    g_score: Dict[str, float] = {start: 0.0}
+    came_from: Dict[str, Optional[str]] = {start: None}
+
+    tie = 0
+    frontier: List[Tuple[float, int, str]] = [(float(h(start)), tie, start)]
+    generated = max_front = 1
+    reopen = 0
+    closed = set()
+
+    while frontier:
+        if len(frontier) > max_front:
+            max_front = len(frontier)
+        _, _, current = heapq.heappop(frontier)
+        if current in closed:
+            continue
+        g_cur = g_score[current]
+        closed.add(current)
+
+        if current == goal:
+            stats = SearchStats(
+                len(closed), generated, max_front, reopen, depart=float(depart), arrival=float(depart) + g_cur / rate,
+            )
+            return AStarFastResult(True, start, goal, intern_path(reconstruct_path(came_from, goal)), g_cur, stats)
+
+        t_cur = depart + g_cur / rate
+        i = tdg.index[current]
+        for e in range(int(indptr[i]), int(indptr[i + 1])):
+            nxt = dst_names[e]
+            cand_g = g_cur + tdg.edge_cost(e, t_cur)
+            if cand_g < g_score.get(nxt, INF):
+                if nxt in g_score:
+                    reopen += 1
+                g_score[nxt] = cand_g
+                came_from[nxt] = current
+                tie += 1
+                heapq.heappush(frontier, (cand_g + float(h(nxt)), tie, nxt))
+                generated += 1
+
+    stats = SearchStats(len(closed), generated, max_front, reopen, depart=float(depart))
+    return AStarFastResult(False, start, goal, None, None, stats)
+
+
+def td_dijkstra(tdg: TimeDependentGraph, start: str, goal: str, depart: float = 0.0) -> DijkstraResult:
+    """Dijkstra dependiente del tiempo (td_a_star sin heurística), contrato de DijkstraResult."""
+    r = td_a_star(tdg, start, goal, depart)
+    return DijkstraResult(r.found, r.start, r.goal, r.path_ids, r.total_cost, r.stats)
+
+
+# =========================================================
+# Evaluación por lotes de una ruta
+# =========================================================
+def evaluate_route(tdg: TimeDependentGraph, path: Sequence[str], departures) -> pd.DataFrame:
+    """
+    Coste y llegada de la misma ruta para todas las salidas `departures` (horas) a la vez:
+    una pasada por arista con np.interp vectorizado sobre las M salidas.
+    Entre aristas paralelas se toma la más barata en cada instante.
+    """
+    import pandas as pd
+
+    t0 = np.asarray(departures, dtype=np.float64).reshape(-1)
+    t = t0.copy()
+    cost = np.zeros_like(t0)
+    for a, b in zip(path[:-1], path[1:]):
+        i = tdg.index[a]
+        lo, hi = int(tdg.indptr[i]), int(tdg.indptr[i + 1])
+        edges = [e for e in range(lo, hi) if tdg._dst_names[e] == b]
+        if not edges:
+            raise ValueError(f"Edge {a}->{b} not in graph.")
+        step = tdg.edge_cost_batch(edges[0], t)
+        for e in edges[1:]:
+            step = np.minimum(step, tdg.edge_cost_batch(e, t))
+        cost += step
+        t += step / tdg.cost_rate
+    return pd.DataFrame({"depart": t0, "total_cost": cost, "arrival": t, "duration_h": t - t0})
@@ -3,45 +3,84 @@ from __future__ import annotations
 import os
 from typing import Optional, List, Dict, Tuple
 
+import numpy as np
 import pandas as pd
 import networkx as nx
 import matplotlib.pyplot as plt
 
 
+def _tree_layout(parent: np.ndarray, dx: float = 1.0, dy: float = 1.0) -> np.ndarray:
+    """
+    Layout jerárquico iterativo sobre arrays enteros (sin recursión):
+    - parent[i] = índice del padre o -1 (raíces; varias raíces se colocan lado a lado)
+    - Cada subárbol ocupa su propio intervalo horizontal, hijos una fila por debajo.
+    Devuelve pos (n, 2).
+    """
+    n = int(parent.shape[0])
+    if n == 0:
+        return np.zeros((0, 2), dtype=np.float64)
+
+    # raíz virtual = n, para tratar bosques como un único árbol
+    par = np.where(parent < 0, n, parent).astype(np.int64)
+
+    # hijos agrupados por padre (orden estable = orden de aparición)
+    order = np.argsort(par, kind="stable")
+    child_ptr = np.zeros(n + 2, dtype=np.int64)
+    np.cumsum(np.bincount(par, minlength=n + 1), out=child_ptr[1:])
+
+    # niveles por BFS desde la raíz virtual
+    levels: List[np.ndarray] = []
+    cur = np.array([n], dtype=np.int64)
+    seen = 0
+    while cur.size and seen <= n:
+        starts, ends = child_ptr[cur], child_ptr[cur + 1]
+        counts = ends - starts
+        if counts.sum() == 0:
+            break
+        idx = np.repeat(starts, counts) + (
+            np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+        )
+        cur = order[idx]
+        levels.append(cur)
+        seen += int(cur.size)
+
+    # anchura de subárbol: de abajo arriba
+    width = np.zeros(n + 1, dtype=np.float64)
+    for lvl in reversed(levels):
+        width[lvl] = np.maximum(width[lvl], 1.0)
+        np.add.at(width, par[lvl], width[lvl])
+
+    # x: de arriba abajo; los hijos de un mismo padre son contiguos en cada nivel
+    x = np.zeros(n + 1, dtype=np.float64)
+    y = np.zeros(n + 1, dtype=np.float64)
+    for depth, lvl in enumerate(levels):
+        p = par[lvl]
+        w = width[lvl]
+        csum = np.cumsum(w)
+        group_start = np.r_[True, p[1:] != p[:-1]]
+        offset = np.maximum.accumulate(np.where(group_start, csum - w, 0.0))
+        left = x[p] - width[p] / 2.0
+        x[lvl] = left + (csum - offset) - w / 2.0
+        y[lvl] = -float(depth)
+
+    pos = np.column_stack([x[:n] * dx, y[:n] * dy])
+    return pos
+
+
 def _hierarchy_pos(G: nx.DiGraph, root: str, dx=1.0, dy=1.0) -> Dict[str, Tuple[float, float]]:
     """
     Posiciona nodos como árbol jerárquico real:
     - Cada subárbol ocupa su propio intervalo horizontal
     - Los hijos se dibujan debajo del padre
+    (iterativo: sin límite de recursión en árboles profundos)
     """
-    pos: Dict[str, Tuple[float, float]] = {}
-    widths: Dict[str, float] = {}
-
-    def _subtree_width(n: str) -> float:
-        children = list(G.successors(n))
-        if not children:
-            widths[n] = 1.0
-            return 1.0
-        w = sum(_subtree_width(c) for c in children)
-        widths[n] = w
-        return w
-
-    def _assign_pos(n: str, x: float, y: float) -> None:
-        pos[n] = (x * dx, y * dy)
-        children = list(G.successors(n))
-        if not children:
-            return
-
-        cur_x = x - widths[n] / 2.0
-        for c in children:
-            cw = widths[c]
-            cx = cur_x + cw / 2.0
-            _assign_pos(c, cx, y - 1)
-            cur_x += cw
-
-    _subtree_width(root)
-    _assign_pos(root, 0.0, 0.0)
-    return pos
+    names = [root] + [n for n in nx.bfs_tree(G, root) if n != root]
+    idx = {n: i for i, n in enumerate(names)}
+    parent = np.full(len(names), -1, dtype=np.int64)
+    for u, v in nx.bfs_edges(G, root):
+        parent[idx[v]] = idx[u]
+    pos = _tree_layout(parent, dx=dx, dy=dy)
+    return {n: (float(pos[i, 0]), float(pos[i, 1])) for i, n in enumerate(names)}
 
 
 def _fmt_es(x: float, nd: int = 2) -> str:
@@ -55,6 +94,7 @@ def draw_search_tree(
     goal: str,
     out_png: str,
     path: Optional[List[str]] = None,
+    fast_threshold: int = 300,
 ) -> None:
     """
     Dibuja el árbol de eventos (event_id) parent_event_id -> event_id.
@@ -62,7 +102,13 @@ def draw_search_tree(
     - Dentro del nodo: letra (state)
     - A la izquierda: f = g + h (con valores)
     - A la derecha-arriba: orden de expansión (si existe)
+
+    Con más de `fast_threshold` eventos delega en draw_search_tree_fast.
     """
+    if len(node_info) > fast_threshold:
+        draw_search_tree_fast(node_info, start=start, goal=goal, out_path=out_png)
+        return
+
     df = node_info.copy()
 
     required = {"event_id", "state", "parent_event_id", "g", "h", "f", "expansion_order"}
@@ -154,3 +200,156 @@ def draw_search_tree(
     os.makedirs(os.path.dirname(out_png), exist_ok=True)
     fig.savefig(out_png, dpi=200)
     plt.close(fig)
+
+
+# =========================================================
+# Renderizado escalable (miles de eventos)
+# =========================================================
+_STATUS_COLORS = {
+    3: "tab:red",      # en el camino final
+    2: "tab:blue",     # expandido
+    1: "tab:green",    # aceptado (no expandido)
+    0: "lightgray",    # descartado
+}
+
+
+def _event_arrays(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """event_id -> índice entero; devuelve (parent[i], índices) sin iterrows."""
+    eids = df["event_id"].astype(str).to_numpy()
+    index = pd.Index(eids)
+    peid = df["parent_event_id"]
+    parent = np.full(len(df), -1, dtype=np.int64)
+    has_parent = peid.notna().to_numpy()
+    if has_parent.any():
+        loc = index.get_indexer(peid[has_parent].astype(str).to_numpy())
+        parent[has_parent] = loc  # -1 si el padre no está en la tabla
+    return parent, np.arange(len(df), dtype=np.int64)
+
+
+def _goal_event(df: pd.DataFrame, goal: str) -> Optional[int]:
+    """Fila del evento del goal que se expandió (o el último generado si no se expandió)."""
+    is_goal = (df["state"].astype(str) == str(goal)).to_numpy()
+    expanded = df["expansion_order"].notna().to_numpy()
+    cand = np.flatnonzero(is_goal & expanded)
+    if cand.size == 0:
+        cand = np.flatnonzero(is_goal)
+    return int(cand[-1]) if cand.size else None
+
+
+def _ancestors(parent: np.ndarray, node: int) -> np.ndarray:
+    chain = []
+    cur = node
+    while cur >= 0 and len(chain) <= parent.shape[0]:
+        chain.append(cur)
+        cur = int(parent[cur])
+    return np.asarray(chain[::-1], dtype=np.int64)
+
+
+def draw_search_tree_fast(
+    event_info: pd.DataFrame,
+    start: str,
+    goal: str,
+    out_path: str,
+    path_subtree: bool = False,
+    max_labels: int = 150,
+    min_label_importance: int = 2,
+    dpi: int = 150,
+) -> Dict[str, int]:
+    """
+    Versión escalable de draw_search_tree para trazas grandes de A*:
+    - Layout iterativo sobre arrays enteros (_tree_layout).
+    - Dibujo por lotes: un LineCollection para aristas y un scatter para nodos.
+    - Etiquetas solo para eventos con importancia >= min_label_importance
+      (3=camino final, 2=expandido, 1=aceptado, 0=descartado), como máximo max_labels.
+    - path_subtree=True: solo el camino final y los hijos directos de sus eventos.
+    - Formato según la extensión de out_path: .png, .svg o .html (SVG embebido).
+
+    Devuelve un pequeño resumen (eventos dibujados, etiquetas...).
+    """
+    import io
+    from matplotlib.collections import LineCollection
+
+    required = {"event_id", "state", "parent_event_id", "g", "h", "f", "expansion_order"}
+    missing = required - set(event_info.columns)
+    if missing:
+        raise ValueError(f"event_info debe contener columnas {sorted(required)}. Faltan: {sorted(missing)}")
+
+    df = event_info.reset_index(drop=True)
+    parent, _ = _event_arrays(df)
+
+    importance = np.where(df["expansion_order"].notna().to_numpy(), 2, 0)
+    if "decision" in df.columns:
+        importance = np.where((importance == 0) & (df["decision"].to_numpy() == "accepted"), 1, importance)
+
+    goal_row = _goal_event(df, goal)
+    on_path = np.zeros(len(df), dtype=bool)
+    if goal_row is not None and pd.notna(df.at[goal_row, "expansion_order"]):
+        on_path[_ancestors(parent, goal_row)] = True
+    importance = np.where(on_path, 3, importance)
+
+    if path_subtree and on_path.any():
+        keep = on_path | ((parent >= 0) & on_path[np.maximum(parent, 0)])
+        rows = np.flatnonzero(keep)
+        remap = np.full(len(df), -1, dtype=np.int64)
+        remap[rows] = np.arange(rows.size)
+        parent = np.where(parent[rows] >= 0, remap[np.maximum(parent[rows], 0)], -1)
+        df = df.iloc[rows].reset_index(drop=True)
+        importance = importance[rows]
+        on_path = on_path[rows]
+
+    n = len(df)
+    pos = _tree_layout(parent, dx=3.0, dy=2.5)
+
+    width_units = float(np.ptp(pos[:, 0])) / 3.0 + 1.0 if n else 1.0
+    depth_units = float(np.ptp(pos[:, 1])) / 2.5 + 1.0 if n else 1.0
+    fig, ax = plt.subplots(figsize=(min(max(18.0, width_units * 0.25), 60.0), min(max(10.0, depth_units * 0.8), 60.0)))
+    ax.set_title(f"Árbol de expansión A*: {start} → {goal}")
+    ax.axis("off")
+
+    child = np.flatnonzero(parent >= 0)
+    if child.size:
+        segs = np.stack([pos[parent[child]], pos[child]], axis=1)
+        colors = np.where(on_path[child], "tab:red", "gray")
+        widths = np.where(on_path[child], 2.0, 0.6)
+        ax.add_collection(LineCollection(segs, colors=colors, linewidths=widths, zorder=1))
+
+    node_colors = [_STATUS_COLORS[int(i)] for i in importance]
+    node_size = 300.0 if n <= 200 else max(4.0, 60000.0 / n)
+    ax.scatter(pos[:, 0], pos[:, 1], s=node_size, c=node_colors, zorder=2, linewidths=0)
+    ax.autoscale_view()
+
+    # etiquetas: por importancia y después por orden de expansión
+    cand = np.flatnonzero(importance >= min_label_importance)
+    eo = df["expansion_order"].to_numpy(dtype=np.float64, na_value=np.inf)
+    cand = cand[np.lexsort((eo[cand], -importance[cand]))][:max_labels]
+    states = df["state"].astype(str).to_numpy()
+    g = df["g"].to_numpy(dtype=np.float64)
+    h = df["h"].to_numpy(dtype=np.float64)
+    f = df["f"].to_numpy(dtype=np.float64)
+    for i in cand:
+        x, y = pos[i]
+        ax.text(x, y, states[i], ha="center", va="center", fontsize=8, fontweight="bold", zorder=3)
+        txt = f"{_fmt_es(f[i])}={_fmt_es(g[i])}+{_fmt_es(h[i])}"
+        if np.isfinite(eo[i]):
+            txt = f"#{int(eo[i])} " + txt
+        ax.text(x, y - 0.6, txt, ha="center", va="top", fontsize=6, zorder=3)
+
+    fig.tight_layout()
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    ext = os.path.splitext(out_path)[1].lower()
+    if ext == ".html":
+        buf = io.StringIO()
+        fig.savefig(buf, format="svg")
+        with open(out_path, "w", encoding="utf-8") as fh:
+            fh.write(
+                "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+                f"<title>A* {start} → {goal}</title></head>\n<body>\n"
+                f"{buf.getvalue()}\n</body></html>\n"
+            )
+    elif ext == ".svg":
+        fig.savefig(out_path, format="svg")
+    else:
+        fig.savefig(out_path, dpi=dpi)
+    plt.close(fig)
+
+    return {"events": int(n), "labels": int(cand.size), "path_events": int(on_path.sum())}